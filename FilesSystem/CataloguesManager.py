@@ -35,6 +35,8 @@ class CatalogsManager:
 
             get_sub_catalogs_list() - получение списка подкаталогов в секции или опции
 
+            read_files() - параллельное чтение файлов секции или опции
+
             move_file() - перенос файла
 
             check_access() - проверка доступа
@@ -465,21 +467,49 @@ class CatalogsManager:
             path = self.get_option_path(section_name=section_name, option_name=option_name)
 
         export_list = []  # экспортынй лист
-        for element in os.listdir(path=path):
-            element_path = os.path.join(path, element)  # Делаем абсолютный путь
-            if os.path.isfile(element_path):  # Если это файл
+        with os.scandir(path) as elements:  # scandir отдаёт тип элемента без отдельного stat на каждый файл
+            for element in elements:
+                if element.is_file():  # Если это файл
 
-                if extension is not None:  # если учитываем расширение
-                    if self.extract_extension(element_path) != extension:
-                        continue
+                    if extension is not None:  # если учитываем расширение
+                        if self.extract_extension(element.name) != extension:
+                            continue
 
-                if full_path:  # если берём полный путь
-                    export_list.append(element_path)
-                else: # или берём только имя
-                    export_list.append(element)
+                    if full_path:  # если берём полный путь
+                        export_list.append(element.path)
+                    else: # или берём только имя
+                        export_list.append(element.name)
 
         return export_list  # отдаём результат
 
+    def read_files(self, reader: object,
+                   section_name: str or int,
+                   option_name: str or int = None,
+                   extension: str = None,
+                   max_workers: int = 16,
+                   as_stream: bool = False,
+                   **read_kwargs) -> tuple or object:
+        '''
+        Функция параллельно считывает файлы секции (или опции) объектом чтения (TXT, JSON, JSONL и т.п.) через его
+            read_many().
+
+        :param reader: объект чтения из FilesSystem.FilesReaders
+        :param section_name: имя секции
+        :param option_name: имя опции. Если не задано, берутся файлы секции.
+        :param extension: расширение файлов. Если не задано - берутся все.
+        :param max_workers: количество потоков
+        :param as_stream: False - вернуть словари после чтения всех файлов; True - вернуть генератор результатов
+        :param read_kwargs: параметры read()
+        :return: как у read_many(): кортеж (результаты {путь: данные}, ошибки {путь: исключение}) или генератор
+            кортежей (путь, данные или None, исключение или None)
+        '''
+        if not hasattr(reader, 'read_many'):
+            raise ValidationError(f'reader {type(reader)} have no "read_many" method.')
+
+        paths = self.get_files_list(section_name=section_name, option_name=option_name,
+                                    extension=extension, full_path=True)
+        return reader.read_many(paths, max_workers=max_workers, as_stream=as_stream, **read_kwargs)
+
     def get_sub_catalogs_list(self, section_name: str,
                               option_name: str = None,
                               full_path: bool = True) -> list:
@@ -0,0 +1,125 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Exceptions.ExceptionTypes import MethodPropertyError, ValidationError
+
+_executor = None
+_executor_workers = min(32, (os.cpu_count() or 1) + 4)
+_executor_mutex = threading.Lock()
+
+
+def get_async_executor() -> ThreadPoolExecutor:
+    '''
+    Функция отдаёт общий пул потоков, в котором выполняются блокирующие операции асинхронных методов.
+
+    :return: ThreadPoolExecutor
+    '''
+    global _executor
+    with _executor_mutex:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_executor_workers, thread_name_prefix='FilesReaders')
+        return _executor
+
+
+def set_async_executor_workers(max_workers: int):
+    '''
+    Функция задаёт размер общего пула потоков. Текущий пул завершается после выполнения уже поставленных задач,
+        новые задачи попадут в новый пул.
+
+    :param max_workers: количество потоков
+    :return: ничего
+    '''
+    global _executor, _executor_workers
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValidationError(f'max_workers must be positive int. {max_workers} was passed.')
+
+    with _executor_mutex:
+        executor, _executor = _executor, None
+        _executor_workers = max_workers
+    if executor is not None:
+        executor.shutdown(wait=False)
+    return
+
+
+async def run_blocking(function: object, *args, **kwargs) -> object:
+    '''
+    Выполнение блокирующей функции в общем пуле потоков.
+    Отмена ожидающей задачи отменяет вызов, если он ещё не начался; начавшийся вызов завершится в пуле, но его
+        результат будет отброшен.
+
+    :param function: функция
+    :return: результат функции
+    '''
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_async_executor(), functools.partial(function, *args, **kwargs))
+
+
+class AsyncMethods:
+    '''
+    Асинхронные аналоги методов чтения/записи. Блокирующий ввод-вывод выполняется в общем ограниченном пуле потоков
+        (get_async_executor), поэтому цикл событий не блокируется, а блокировки файлов работают так же, как при
+        синхронных вызовах.
+
+    Методы и свойства:
+        aread() - асинхронный read()
+
+        awrite() - асинхронный write()
+
+        awrite_line() - асинхронный write_line() (write_at_the_end() для TXT)
+
+        aread_by_lines() - асинхронный итератор по строкам (или пачкам строк при batch_size)
+
+        acall() - выполнить любой метод в пуле потоков
+    '''
+
+    async def acall(self, method_name: str, *args, **kwargs) -> object:
+        '''
+        Выполнение метода объекта в общем пуле потоков.
+
+        :param method_name: имя метода
+        :return: результат метода
+        '''
+        method = getattr(self, method_name, None)
+        if not callable(method):
+            raise MethodPropertyError(f'{type(self).__name__} have no "{method_name}" method.')
+        return await run_blocking(method, *args, **kwargs)
+
+    async def aread(self, *args, **kwargs) -> object:
+        return await self.acall('read', *args, **kwargs)
+
+    async def awrite(self, *args, **kwargs) -> bool or str:
+        return await self.acall('write', *args, **kwargs)
+
+    async def awrite_line(self, *args, **kwargs):
+        method_name = 'write_line' if hasattr(self, 'write_line') else 'write_at_the_end'
+        return await self.acall(method_name, *args, **kwargs)
+
+    async def aread_by_lines(self, *args, **kwargs):
+        '''
+        Асинхронный итератор по строкам: async for line in reader.aread_by_lines(...). Параметры - как у
+            read_by_lines(). Каждый шаг выполняется в пуле потоков, поэтому для больших файлов лучше задавать
+            batch_size. При отмене или досрочном выходе из цикла файл закрывается; если шаг в этот момент ещё
+            выполняется в пуле потоков, файл закрывается после его завершения.
+
+        :return: асинхронный генератор строк
+        '''
+        iterator = await self.acall('read_by_lines', *args, **kwargs)
+        stop = object()
+        pending = None  # шаг next() в пуле потоков
+        try:
+            while True:
+                pending = get_async_executor().submit(next, iterator, stop)
+                line = await asyncio.wrap_future(pending)
+                if line is stop:
+                    return
+                yield line
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                if pending is not None:  # Закроем после шага (сразу, если он завершён или отменён до начала)
+                    pending.add_done_callback(lambda future: close())
+                else:
+                    close()
@@ -1,8 +1,122 @@
-from .Common import CommonMethods
+from .Common import CommonMethods, split_file_ranges
+from .ColumnarCache import ColumnarCache
+from .DurableWriting import DurableWriter, SyncGroup
+from .Compression import compressed_expansion, open_stream, resolve_compression, strip_compression
 from Exceptions.ExceptionTypes import ProcessingError, ValidationError
 
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import chain
+from importlib.util import find_spec
+from warnings import warn
+import csv
+import io
+import mmap
+import os
 import pandas as pd
 
+# Имена сжатий для pandas
+pandas_compressions = {None: None, 'gz': 'gzip', 'xz': 'xz', 'bz2': 'bz2'}
+
+pyarrow_available = find_spec('pyarrow') is not None
+ENGINES = ('auto', 'c', 'pyarrow', 'python')
+
+
+def choose_engine(sep: str or None, engine: str = 'auto', nrows: int = None, chunksize: int = None) -> str:
+    '''
+    Функция выбирает парсер pandas.read_csv. При engine='auto': pyarrow (многопоточный), если он установлен и
+        параметры его допускают; иначе C; python - только для разделителей, которые не поддерживает C парсер
+        (несколько символов, регулярное выражение, автоопределение при sep=None).
+
+    :param sep: разделитель
+    :param engine: 'auto', 'c', 'pyarrow' или 'python'
+    :param nrows: количество строк (pyarrow не поддерживает)
+    :param chunksize: размер части (pyarrow не поддерживает)
+    :return: имя парсера
+    '''
+    if engine not in ENGINES:
+        raise ValidationError(f'engine must be one of {ENGINES}. {engine} was passed.')
+    if engine != 'auto':
+        return engine
+
+    if sep is None or (len(sep) > 1 and sep != r'\s+'):
+        return 'python'
+    if pyarrow_available and nrows is None and chunksize is None and sep != r'\s+':
+        return 'pyarrow'
+    return 'c'
+
+
+def parse_range(full_path: str, start: int, stop: int, encoding: str, sep: str, names: list, options: dict) -> \
+        pd.core.frame.DataFrame:
+    '''
+    Функция разбирает диапазон байт [start, stop) csv файла без заголовка. Диапазон должен быть выровнен по
+        границам строк (split_file_ranges). Функция выполняется в процессах пула при параллельном чтении.
+
+    :param full_path: полный путь к файлу
+    :param start: начало диапазона
+    :param stop: конец диапазона
+    :param encoding: кодировка
+    :param sep: разделитель
+    :param names: имена колонок из заголовка
+    :param options: параметры pandas.read_csv (index_col, usecols, dtype)
+    :return: DataFrame
+    '''
+    with open(full_path, mode='rb') as file:
+        file.seek(start)
+        data = file.read(stop - start)
+    return pd.read_csv(io.BytesIO(data), sep=sep, encoding=encoding, header=None, names=names,
+                       engine='c', **options)
+
+
+def contains_quotes(full_path: str, quote_char: bytes = b'"') -> bool:
+    '''
+    Функция проверяет, есть ли в файле кавычки. Поиск выполняется по отображению файла в память без чтения в
+        Python объекты.
+
+    :param full_path: полный путь к файлу
+    :param quote_char: символ кавычки
+    :return: True - кавычки есть
+    '''
+    with open(full_path, mode='rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return False
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped.find(quote_char) >= 0
+
+
+def estimate_rows(full_path: str, chunk_size: int, sep: str, encoding: str, compression: str or None,
+                  sample_size: int = 1 << 20) -> int:
+    '''
+    Функция переводит размер части в байтах в количество строк: chunk_size делится на средний размер строки в
+        выборке из начала файла (сжатый файл - по распакованным данным). Для разделителя из одного символа строки
+        считаются модулем csv (перевод строки в кавычках не начинает новую строку), иначе - по переводам строк.
+
+    :param full_path: полный путь к файлу
+    :param chunk_size: размер части в байтах
+    :param sep: разделитель в файле
+    :param encoding: кодировка
+    :param compression: сжатие файла
+    :param sample_size: размер выборки в байтах
+    :return: количество строк в части (не меньше 1)
+    '''
+    with open_stream(full_path, mode='rb', compression=compression) as file:
+        sample = file.read(sample_size)
+    if len(sample) >= sample_size:  # Отбросим неполную последнюю строку
+        sample = sample[:sample.rfind(b'\n') + 1] or sample
+
+    text = sample.decode(encoding, errors='replace')
+    rows = None
+    if len(sep) == 1:
+        try:
+            rows = sum(1 for _ in csv.reader(io.StringIO(text), delimiter=sep))
+        except csv.Error:
+            pass
+    if rows is None:
+        rows = text.count('\n')
+    if not rows:
+        return max(1, chunk_size)
+    return max(1, chunk_size * rows // len(sample))
+
 
 class CSV(CommonMethods):
     '''
@@ -26,6 +140,8 @@ class CSV(CommonMethods):
         Настройки считывания
             save_loaded - сохранять ли считанные файлы?
 
+            columnar_cache - колоночный кэш разобранных файлов (ColumnarCache)
+
             loaded - словарь сохранённых файлов
 
             _reset_loaded - обновить словарь сохранённых файлов
@@ -33,16 +149,37 @@ class CSV(CommonMethods):
         Чтение - запись
             write() - запись
 
+            write_rows() - потоковая запись строк или частей DataFrame
+
             read() - чтение
+
+            read_chunks() - чтение частями
+
+            read_parallel() - параллельное чтение в нескольких процессах
+
+            read_parallel_chunks() - параллельное чтение с выдачей результата частями
     '''
 
-    def __init__(self):
+    def __init__(self, columnar_cache: ColumnarCache = None):
         '''
+
+        :param columnar_cache: колоночный кэш для read(columnar_cache=True). None - ColumnarCache() рядом с файлами
         '''
 
         # Выполним стандартный init
         CommonMethods.__init__(self, save_loaded=False)
 
+        self.__columnar_cache = ColumnarCache() if columnar_cache is None else columnar_cache
+
+    @property
+    def columnar_cache(self) -> ColumnarCache:
+        return self.__columnar_cache
+
+    @columnar_cache.setter
+    def columnar_cache(self, new_value: ColumnarCache):
+        if not isinstance(new_value, ColumnarCache):
+            raise ValidationError(f'columnar_cache must be ColumnarCache. {type(new_value)} was passed.')
+        self.__columnar_cache = new_value
 
     # ------------------------------------------------------------------------------------------------
     # Чтение -----------------------------------------------------------------------------------------
@@ -50,7 +187,15 @@ class CSV(CommonMethods):
     def read(self, full_path: str, save_loaded: bool = None,
              encoding: str = 'utf-8',
              index_column_name: str = None,
-             sep: str = ';'
+             sep: str = ';',
+             compression: str or None = 'infer',
+             check_magic: bool = False,
+             background: bool = False,
+             usecols: list or tuple = None,
+             dtype: object = None,
+             nrows: int = None,
+             engine: str = 'auto',
+             columnar_cache: bool = False
              ) -> pd.core.frame.DataFrame:
         '''
         Функция считывания csv файла
@@ -61,40 +206,316 @@ class CSV(CommonMethods):
         :param encoding: строка, явно указывающая кодировку или None для её автоопределения
         :param index_column_name: имя колонки с названием индекса
         :param sep: - разделитель в файле
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'
+        :param check_magic: при compression='infer' определять сжатие файла без суффикса по сигнатуре в первых байтах
+            (например, gzip в файле без ".gz")
+        :param background: распаковывать сжатый файл в отдельном потоке
+        :param usecols: считывать только эти колонки (остальные не разбираются). None - все
+        :param dtype: типы колонок (тип или словарь {колонка: тип}): без вывода типов парсер работает быстрее
+        :param nrows: считать не больше nrows строк. None - все
+        :param engine: парсер pandas: 'auto' - самый быстрый из подходящих (choose_engine), 'c', 'pyarrow', 'python'
+        :param columnar_cache: использовать колоночный кэш (columnar_cache): если файл не менялся с прошлого чтения с
+            теми же параметрами, разобранный кадр загружается из бинарного файла рядом с источником без разбора
+            текста. Колонки numpy типов в формате npy отображаются в память только для чтения
         :return: считанный файл
         '''
-        if not full_path.endswith('.csv'):
-            raise ValidationError("Incorrect file extension. Only '.csv' is available.")
+        if not strip_compression(full_path).endswith('.csv'):
+            raise ValidationError("Incorrect file extension. Only '.csv' (also '.csv.gz', '.csv.xz', '.csv.bz2') " +
+                                  "is available.")
+
+        read_tag = ('read', encoding, index_column_name, sep, usecols, dtype, nrows)  # параметры чтения для кэша loaded
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
+
+        with self.read_lock(full_path=full_path):
+            state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
+            compression = resolve_compression(full_path=full_path, compression=compression, check_magic=check_magic)
 
-        with self.mutex:
             # определим кодировку файла
             if encoding is None:
-                encoding = self.get_encoding(full_path=full_path)
+                encoding = self.get_encoding(full_path=full_path, compression=compression)
 
 
-            try:  # Считаем
-                with open(full_path, 'r', encoding=encoding) as file:
-                    result = pd.read_csv(filepath_or_buffer=file,
-                                         sep=sep, encoding=encoding, index_col=index_column_name,
-                                         engine='python')  # считаем его
+            engine = choose_engine(sep=sep, engine=engine, nrows=nrows)
 
-            except BaseException as miss:  # Если не получилось считать файл
-                raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+            result = None
+            if columnar_cache:
+                cache_tag = ('CSV.read', encoding, index_column_name, sep, usecols, dtype, nrows, engine)
+                source_stat = os.stat(full_path)
+                result = self.__columnar_cache.load(full_path=full_path, tag=cache_tag)
+
+            if result is None:
+                try:  # Считаем
+                    with open_stream(full_path, mode='r' if engine == 'python' else 'rb', encoding=encoding,
+                                     compression=compression, background=background) as file:
+                        result = pd.read_csv(filepath_or_buffer=file,
+                                             sep=sep, encoding=encoding, index_col=index_column_name,
+                                             usecols=usecols, dtype=dtype, nrows=nrows,
+                                             engine=engine)  # считаем его
+
+                except BaseException as miss:  # Если не получилось считать файл
+                    raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') \
+                        from miss
+
+                if columnar_cache:
+                    try:
+                        self.__columnar_cache.save(full_path=full_path, tag=cache_tag, data=result, stat=source_stat)
+                    except ProcessingError as miss:  # Без кэша файл всё равно считан
+                        warn(f'Columnar cache saving failed: {miss.args[0]}', RuntimeWarning)
 
 
         if (save_loaded is None and self.save_loaded) or save_loaded is True:
             self._ad_loaded(full_path=full_path,
-                            data=result)
+                            data=result,
+                            tag=read_tag,
+                            state=state)
 
         return result
 
+    def read_chunks(self, full_path: str,
+                    chunksize: int = 100000,
+                    encoding: str = 'utf-8',
+                    index_column_name: str = None,
+                    sep: str = ';',
+                    compression: str or None = 'infer',
+                    check_magic: bool = False,
+                    background: bool = False,
+                    usecols: list or tuple = None,
+                    dtype: object = None,
+                    nrows: int = None,
+                    engine: str = 'auto'):
+        '''
+        Генератор чтения csv файла частями: отдаёт DataFrame по chunksize строк, поэтому в памяти одновременно
+            находится только одна часть. Параметры - как у read().
+
+        :param full_path: полный путь к файлу
+        :param chunksize: количество строк в части
+        :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param index_column_name: имя колонки с названием индекса
+        :param sep: - разделитель в файле
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'
+        :param check_magic: при compression='infer' определять сжатие файла без суффикса по сигнатуре в первых байтах
+            (например, gzip в файле без ".gz")
+        :param background: распаковывать сжатый файл в отдельном потоке
+        :param usecols: считывать только эти колонки. None - все
+        :param dtype: типы колонок (тип или словарь {колонка: тип})
+        :param nrows: считать не больше nrows строк. None - все
+        :param engine: парсер pandas: 'auto' (C или python - pyarrow не читает частями), 'c', 'python'
+        :return: генератор DataFrame
+        '''
+        if not strip_compression(full_path).endswith('.csv'):
+            raise ValidationError("Incorrect file extension. Only '.csv' (also '.csv.gz', '.csv.xz', '.csv.bz2') " +
+                                  "is available.")
+        if not isinstance(chunksize, int) or chunksize < 1:
+            raise ValidationError(f'chunksize must be positive int. {chunksize} was passed.')
+
+        with self.read_lock(full_path=full_path):
+            if not self.check_access(path=full_path):
+                raise ProcessingError('No access to file')
+
+            compression = resolve_compression(full_path=full_path, compression=compression, check_magic=check_magic)
+
+            # определим кодировку файла
+            if encoding is None:
+                encoding = self.get_encoding(full_path=full_path, compression=compression)
+
+            engine = choose_engine(sep=sep, engine=engine, nrows=nrows, chunksize=chunksize)
+
+        return self.__read_chunks(full_path=full_path, encoding=encoding, compression=compression,
+                                  background=background, engine=engine,
+                                  options={'chunksize': chunksize, 'sep': sep, 'index_col': index_column_name,
+                                           'usecols': usecols, 'dtype': dtype, 'nrows': nrows})
+
+    @staticmethod
+    def __read_chunks(full_path: str, encoding: str, compression: str or None, background: bool, engine: str,
+                      options: dict):
+        try:
+            with open_stream(full_path, mode='r' if engine == 'python' else 'rb', encoding=encoding,
+                             compression=compression, background=background) as file:
+                with pd.read_csv(filepath_or_buffer=file, encoding=encoding, engine=engine, **options) as reader:
+                    for chunk in reader:
+                        yield chunk
+        except GeneratorExit:
+            raise
+        except BaseException as miss:  # Если не получилось считать файл
+            raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+
+    def read_parallel(self, full_path: str, save_loaded: bool = None,
+                      encoding: str = 'utf-8',
+                      index_column_name: str = None,
+                      sep: str = ';',
+                      usecols: list or tuple = None,
+                      dtype: object = None,
+                      max_workers: int = None,
+                      chunk_size: int = 64 << 20,
+                      rows: int = None) -> pd.core.frame.DataFrame:
+        '''
+        Функция параллельного считывания csv файла: заголовок читается один раз, тело делится на диапазоны байт по
+            границам строк, каждый диапазон разбирается в отдельном процессе, части склеиваются в исходном порядке.
+
+        Если в файле есть кавычки (в кавычках может быть перевод строки, и граница диапазона попадёт внутрь поля),
+            сжатие или разделитель, который не поддерживает C парсер, файл читается частями read_chunks() по rows
+            строк в одном потоке.
+        Типы колонок выводятся по каждой части отдельно, поэтому для единообразия лучше задавать dtype.
+
+        :param full_path: полный путь к файлу
+        :param save_loaded: сохранить ли загруженный файл? True - да, False - нет, None - использовать стандартную
+            настройку (save_loaded)
+        :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param index_column_name: имя колонки с названием индекса
+        :param sep: - разделитель в файле
+        :param usecols: считывать только эти колонки. None - все
+        :param dtype: типы колонок (тип или словарь {колонка: тип})
+        :param max_workers: количество процессов. None - по количеству ядер
+        :param chunk_size: примерный размер диапазона в байтах
+        :param rows: количество строк в части при чтении через read_chunks(). None - chunk_size, переведённый в
+            строки по среднему размеру строки в выборке из начала файла (estimate_rows)
+        :return: считанный файл
+        '''
+        read_tag = ('read', encoding, index_column_name, sep, usecols, dtype, None)  # параметры чтения для кэша loaded
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
+
+        state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
+        chunks = list(self.read_parallel_chunks(full_path=full_path, encoding=encoding,
+                                                index_column_name=index_column_name, sep=sep,
+                                                usecols=usecols, dtype=dtype,
+                                                max_workers=max_workers, chunk_size=chunk_size, rows=rows))
+        try:
+            result = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+        except BaseException as miss:
+            raise ProcessingError(f'Parts concatenation failed.\nfull_path: {full_path}') from miss
+
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            self._ad_loaded(full_path=full_path,
+                            data=result,
+                            tag=read_tag,
+                            state=state)
+
+        return result
+
+    def read_parallel_chunks(self, full_path: str,
+                             encoding: str = 'utf-8',
+                             index_column_name: str = None,
+                             sep: str = ';',
+                             usecols: list or tuple = None,
+                             dtype: object = None,
+                             max_workers: int = None,
+                             chunk_size: int = 64 << 20,
+                             rows: int = None):
+        '''
+        Генератор параллельного считывания csv файла: отдаёт DataFrame по диапазонам файла в исходном порядке.
+            Одновременно в работе находится не более 2 * max_workers диапазонов, поэтому память ограничена. Без
+            index_column_name индекс частей сквозной, как при чтении файла целиком.
+            Ограничения и параметры - как у read_parallel(); в случае отката на обычное чтение части отдаёт
+            read_chunks() по rows строк (None - по оценке estimate_rows из chunk_size).
+
+        :return: генератор DataFrame
+        '''
+        if not strip_compression(full_path).endswith('.csv'):
+            raise ValidationError("Incorrect file extension. Only '.csv' (also '.csv.gz', '.csv.xz', '.csv.bz2') " +
+                                  "is available.")
+
+        if rows is not None and (not isinstance(rows, int) or rows < 1):
+            raise ValidationError(f'rows must be positive int or None. {rows} was passed.')
+
+        with self.read_lock(full_path=full_path):
+            if not self.check_access(path=full_path):
+                raise ProcessingError('No access to file')
+
+            # определим кодировку файла
+            if encoding is None:
+                encoding = self.get_encoding(full_path=full_path)
+
+            try:
+                compression = resolve_compression(full_path=full_path)
+                fallback = (compression is not None or
+                            choose_engine(sep=sep, chunksize=1) != 'c' or
+                            contains_quotes(full_path=full_path))
+                if fallback and rows is None:
+                    rows = estimate_rows(full_path=full_path, chunk_size=chunk_size, sep=sep, encoding=encoding,
+                                         compression=compression)
+                if not fallback:
+                    with open(full_path, mode='rb') as file:
+                        header = file.readline()
+                    names = list(pd.read_csv(io.BytesIO(header), sep=sep, encoding=encoding, nrows=0,
+                                             engine='c').columns)
+                    ranges = split_file_ranges(full_path=full_path, chunk_size=chunk_size, start=len(header))
+            except BaseException as miss:
+                raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+
+        if fallback:
+            return self.read_chunks(full_path=full_path, chunksize=rows, encoding=encoding,
+                                    index_column_name=index_column_name, sep=sep, usecols=usecols, dtype=dtype)
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        return self.__read_ranges(full_path=full_path, ranges=ranges, encoding=encoding, sep=sep, names=names,
+                                  options={'index_col': index_column_name, 'usecols': usecols, 'dtype': dtype},
+                                  max_workers=max_workers)
+
+    @staticmethod
+    def __read_ranges(full_path: str, ranges: list, encoding: str, sep: str, names: list, options: dict,
+                      max_workers: int):
+        position = 0  # Сквозной номер строки для индекса частей
+
+        def renumber(chunk: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
+            nonlocal position
+            if options['index_col'] is None:
+                chunk.index = pd.RangeIndex(position, position + len(chunk))
+            position += len(chunk)
+            return chunk
+
+        try:
+            if not ranges:  # Только заголовок
+                yield renumber(pd.DataFrame(columns=names if options['usecols'] is None else
+                                            [name for name in names if name in options['usecols']]))
+                return
+
+            if len(ranges) < 2 or max_workers < 2:  # Процессы не нужны
+                for start, stop in ranges:
+                    yield renumber(parse_range(full_path, start, stop, encoding, sep, names, options))
+                return
+
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(ranges))) as executor:
+                pending = deque()
+                ranges = iter(ranges)
+                for start, stop in ranges:
+                    pending.append(executor.submit(parse_range, full_path, start, stop, encoding, sep, names, options))
+                    if len(pending) >= 2 * max_workers:
+                        break
+
+                while pending:
+                    chunk = pending.popleft().result()
+                    for start, stop in ranges:  # Подкинем следующий диапазон
+                        pending.append(executor.submit(parse_range, full_path, start, stop, encoding, sep, names,
+                                                       options))
+                        break
+                    yield renumber(chunk)
+
+        except GeneratorExit:
+            raise
+        except BaseException as miss:  # Если не получилось считать файл
+            raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+
     # ------------------------------------------------------------------------------------------------
     # Запись -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
     def write(self, file_data: pd.core.frame.DataFrame or pd.core.series.Series,
               full_path: str, shift_name: bool or None = True,
               sep: str = ';', with_index: bool = True,
-              encoding: str = 'utf-8') -> bool or str:
+              encoding: str = 'utf-8',
+              atomic: bool = False,
+              durability: str or SyncGroup = 'none',
+              compression: str or None = 'infer') -> bool or str:
         '''
         Фнукия записывает данные в файл ".csv".
 
@@ -105,12 +526,18 @@ class CSV(CommonMethods):
         :param sep: разделитель в файле
         :param with_index: экспортировать ли индекс?
         :param encoding: кодировка файла
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"), None - без сжатия, 'gz',
+            'xz', 'bz2'
         :return: True - успешно экспортнуто, имя уникально
             False - отказ от экспорта
             str - успешно экспортнуто, имя изменено
         '''
-        if not full_path.endswith('.csv'):
-            raise ValidationError("Incorrect file extension. Only '.csv' is available.")
+        if not strip_compression(full_path).endswith('.csv'):
+            raise ValidationError("Incorrect file extension. Only '.csv' (also '.csv.gz', '.csv.xz', '.csv.bz2') " +
+                                  "is available.")
 
 
         if isinstance(file_data, pd.core.frame.DataFrame):
@@ -124,14 +551,20 @@ class CSV(CommonMethods):
             raise ValidationError(f'file_data type must be Series or DataFrame. {type(file_data)} was passed. ' +
                                   'File export failed.')
 
-        with self.mutex:
+        compression = resolve_compression(full_path=full_path, compression=compression)
+
+        with self.write_lock(full_path=full_path):
             name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
             if self.check_access(path=full_path):
                 if shift_name is None:
                     return False
                 elif shift_name is True:
-                    full_path = self.name_shifting(full_path=full_path, expansion='.json')
-                    name_shifted = True
+                    shifted_path = self.name_shifting(full_path=full_path,
+                                                      expansion=compressed_expansion(full_path, '.csv'))
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
 
             # Выполним экспорт
             try:
@@ -143,9 +576,12 @@ class CSV(CommonMethods):
                 else:
                     index_label=None
 
-                file_data.to_csv(path_or_buf=full_path, sep=sep, encoding=encoding,
-                                 index=with_index,
-                                 index_label=index_label)
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as durable_writer:
+                    file_data.to_csv(path_or_buf=durable_writer.path, sep=sep, encoding=encoding,
+                                     index=with_index,
+                                     index_label=index_label,
+                                     compression=pandas_compressions[compression])
 
             except BaseException as miss:
                 raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
@@ -154,3 +590,179 @@ class CSV(CommonMethods):
             return full_path
         else:
             return True
+
+    def write_rows(self, iterable: object, full_path: str, shift_name: bool or None = True,
+                   columns: list or tuple = None,
+                   sep: str = ';', with_index: bool = True,
+                   encoding: str = 'utf-8',
+                   chunk_size: int = 10000,
+                   append: bool = False,
+                   atomic: bool = False,
+                   durability: str or SyncGroup = 'none',
+                   compression: str or None = 'infer') -> bool or tuple:
+        '''
+        Функция потоково записывает в файл ".csv" строки или части DataFrame из итерируемого объекта (курсора,
+            генератора): строки собираются в пачки по chunk_size, каждая пачка или часть пишется одним блоком, поэтому
+            в памяти находится не больше одной пачки. Формат (заголовок, разделитель, индекс) - как у write():
+            DataFrame, записанный частями, даёт тот же файл, что и write().
+
+        Элементы iterable:
+            DataFrame - часть: колонки должны совпадать с columns (порядок приводится к columns); индекс части
+                пишется как есть;
+            dict или Series - строка {колонка: значение};
+            list или tuple - строка значений в порядке columns.
+        Индекс строк (не частей) - сквозной номер строки в пределах вызова, с нуля.
+
+        :param iterable: итерируемый объект со строками или частями
+        :param full_path: полное имя файла
+        :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
+            False - заменить файл, None - отказаться от экспорта в случае совпадения имён. При append не используется
+        :param columns: колонки. None - из заголовка файла при дозаписи, иначе из первого элемента (колонки части,
+            ключи словаря, номера значений)
+        :param sep: разделитель в файле
+        :param with_index: экспортировать ли индекс?
+        :param encoding: кодировка файла
+        :param chunk_size: количество строк в пачке
+        :param append: дописать в конец файла: заголовок не пишется, если файл не пуст, колонки сверяются с ним
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен.
+            Не совместим с append
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"), None - без сжатия, 'gz',
+            'xz', 'bz2'
+        :return: False - отказ от экспорта
+            (status, rows, bytes) - status: True - имя уникально, str - имя изменено; rows - количество строк;
+            bytes - количество записанных байт (до сжатия)
+        '''
+        if not strip_compression(full_path).endswith('.csv'):
+            raise ValidationError("Incorrect file extension. Only '.csv' (also '.csv.gz', '.csv.xz', '.csv.bz2') " +
+                                  "is available.")
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValidationError(f'chunk_size must be positive int. {chunk_size} was passed.')
+        if append and atomic:
+            raise ValidationError('atomic writing is not available in append mode.')
+
+        compression = resolve_compression(full_path=full_path, compression=compression)
+
+        with self.write_lock(full_path=full_path):
+            name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
+            header = None  # Колонки заголовка существующего файла при дозаписи
+            if append:
+                if self.check_access(path=full_path) and os.path.getsize(full_path):
+                    header = self.__read_header(full_path=full_path, sep=sep, encoding=encoding,
+                                                compression=compression, with_index=with_index)
+                    if columns is None:
+                        columns = header
+                    elif [str(column) for column in columns] != header:
+                        raise ValidationError(f'columns {list(columns)} do not match the file header {header}.')
+            elif self.check_access(path=full_path):
+                if shift_name is None:
+                    return False
+                elif shift_name is True:
+                    shifted_path = self.name_shifting(full_path=full_path,
+                                                      expansion=compressed_expansion(full_path, '.csv'))
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
+
+            rows = 0
+            written = 0
+            try:
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as writer:
+                    with open_stream(writer.path, mode='ab' if append else 'wb', compression=compression) as file:
+                        for frame in self.__frames(iterable=iterable, columns=columns, chunk_size=chunk_size):
+                            if with_index and frame.index.name is None:
+                                index_label = 'index'
+                            elif with_index:
+                                index_label = frame.index.name
+                            else:
+                                index_label = None
+
+                            block = frame.to_csv(sep=sep, index=with_index, index_label=index_label,
+                                                 header=header is None).encode(encoding)
+                            header = list(frame.columns)
+                            file.write(block)
+                            rows += len(frame)
+                            written += len(block)
+                        file.flush()
+
+            except ValidationError:
+                raise
+            except BaseException as miss:
+                raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+
+        return full_path if name_shifted else True, rows, written
+
+    @staticmethod
+    def __read_header(full_path: str, sep: str, encoding: str, compression: str or None, with_index: bool) -> list:
+        '''
+        Чтение колонок из заголовка существующего файла.
+
+        :return: список имён колонок (без колонки индекса при with_index)
+        '''
+        try:
+            with open_stream(full_path, mode='r', encoding=encoding, compression=compression) as file:
+                line = file.readline()
+            header = [str(column) for column in pd.read_csv(io.StringIO(line), sep=sep, nrows=0).columns]
+        except BaseException as miss:
+            raise ProcessingError(f'File header reading failed.\nfull_path: {full_path}\nencoding: {encoding}') \
+                from miss
+        return header[1:] if with_index else header
+
+    @staticmethod
+    def __frames(iterable: object, columns: list or None, chunk_size: int):
+        '''
+        Генератор DataFrame для write_rows(): строки собираются в пачки по chunk_size (индекс - сквозной номер строки),
+            части отдаются как есть с колонками в порядке columns. Если элементов нет, но колонки известны, отдаётся
+            пустой DataFrame (для заголовка).
+
+        :return: генератор DataFrame
+        '''
+        iterator = iter(iterable)
+        if columns is None:  # Колонки по первому элементу
+            for first in iterator:
+                if isinstance(first, pd.core.frame.DataFrame):
+                    columns = list(first.columns)
+                elif isinstance(first, (dict, pd.core.series.Series)):
+                    columns = list(first.keys())
+                else:
+                    columns = list(range(len(first)))
+                iterator = chain((first,), iterator)
+                break
+            else:
+                return
+        columns = list(columns)
+        names = [str(column) for column in columns]
+        position = 0
+
+        def rows_frame(pending: list) -> pd.core.frame.DataFrame:
+            frame = pd.DataFrame([row.to_dict() if isinstance(row, pd.core.series.Series) else row for row in pending],
+                                 columns=columns)
+            frame.index = pd.RangeIndex(position, position + len(frame))
+            return frame
+
+        pending = []
+        for item in iterator:
+            if isinstance(item, pd.core.frame.DataFrame):
+                if pending:
+                    yield rows_frame(pending)
+                    position += len(pending)
+                    pending = []
+                if [str(column) for column in item.columns] != names:
+                    if sorted(str(column) for column in item.columns) != sorted(names):
+                        raise ValidationError(f'DataFrame columns {list(item.columns)} do not match columns {columns}.')
+                    item = item[[dict(zip(map(str, item.columns), item.columns))[name] for name in names]]
+                yield item
+                position += len(item)
+                continue
+
+            pending.append(item)
+            if len(pending) >= chunk_size:
+                yield rows_frame(pending)
+                position += len(pending)
+                pending = []
+
+        if pending or not position:
+            yield rows_frame(pending)
@@ -0,0 +1,300 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+pyarrow_available = find_spec('pyarrow') is not None
+CACHE_FORMATS = ('auto', 'feather', 'npy')
+
+_meta_name = 'meta.json'
+_version = 1
+
+
+def _values(data: object) -> object:
+    '''
+    Значения колонки или уровня индекса: numpy массив для типов numpy, иначе массив pandas (ExtensionArray).
+
+    :param data: Series или Index
+    :return: массив
+    '''
+    if isinstance(data.dtype, np.dtype):
+        return data.to_numpy()
+    return data.array
+
+
+class ColumnarCache:
+    '''
+    Кэш разобранных DataFrame рядом с исходным файлом в колоночном бинарном формате: повторное чтение загружает
+        готовые колонки и не разбирает текст, не выводит типы.
+
+    Кэш лежит в каталоге ".<имя файла>.cache" рядом с файлом (или в directory), по подкаталогу на каждый набор
+        параметров чтения (tag). Запись действительна, пока у исходного файла не изменились размер и время
+        модификации; устаревшая запись перезаписывается при следующем чтении.
+
+    Форматы:
+        feather - Arrow IPC без сжатия (нужен pyarrow), читается с отображением в память;
+        npy - колонки с типами numpy (числа, bool, даты) - отдельные .npy файлы, читаются с отображением в память
+            (mmap_mode='r', только чтение); остальные колонки (строки, категории) - pickle;
+        auto - feather, если установлен pyarrow, иначе npy.
+    Кадры, которые нельзя разложить по колонкам (MultiIndex в колонках, повторяющиеся имена колонок),
+        сохраняются целиком в pickle.
+
+    Методы и свойства:
+        cache_format - формат кэша
+
+        directory - каталог кэша (None - рядом с файлом)
+
+        memory_map - отображать ли файлы кэша в память
+
+        cache_path() - путь к записи кэша
+
+        load() - загрузить запись
+
+        save() - сохранить запись
+
+        clear() - удалить кэш файла
+    '''
+
+    def __init__(self, cache_format: str = 'auto', directory: str = None, memory_map: bool = True):
+        '''
+
+        :param cache_format: 'auto', 'feather' или 'npy'
+        :param directory: каталог кэша. None - рядом с исходным файлом
+        :param memory_map: отображать файлы кэша в память: загрузка почти мгновенная, данные подгружаются с диска
+            по мере обращения, но колонки npy доступны только для чтения (изменение кадра на месте - ошибка).
+            False - колонки читаются в память целиком
+        '''
+        if cache_format not in CACHE_FORMATS:
+            raise ValidationError(f'cache_format must be one of {CACHE_FORMATS}. {cache_format} was passed.')
+        if cache_format == 'feather' and not pyarrow_available:
+            raise ValidationError('pyarrow is not installed. Feather cache is unavailable.')
+        if cache_format == 'auto':
+            cache_format = 'feather' if pyarrow_available else 'npy'
+
+        self.__cache_format = cache_format
+        self.__directory = directory
+        self.__memory_map = memory_map
+
+    @property
+    def cache_format(self) -> str:
+        return self.__cache_format
+
+    @property
+    def directory(self) -> str or None:
+        return self.__directory
+
+    @property
+    def memory_map(self) -> bool:
+        return self.__memory_map
+
+    # ------------------------------------------------------------------------------------------------
+    # Пути -------------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def __cache_root(self, full_path: str) -> str:
+        full_path = os.path.abspath(full_path)
+        name = os.path.basename(full_path)
+        if self.__directory is None:
+            return os.path.join(os.path.dirname(full_path), f'.{name}.cache')
+        # В общем каталоге имена файлов могут совпадать - добавим хэш пути
+        digest = hashlib.sha1(full_path.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.__directory, f'{name}.{digest}.cache')
+
+    def cache_path(self, full_path: str, tag: object) -> str:
+        '''
+        Путь к записи кэша.
+
+        :param full_path: путь к исходному файлу
+        :param tag: параметры чтения (должны иметь стабильный repr)
+        :return: путь к каталогу записи
+        '''
+        digest = hashlib.sha1(repr(tag).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.__cache_root(full_path), digest)
+
+    # ------------------------------------------------------------------------------------------------
+    # Загрузка ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def load(self, full_path: str, tag: object) -> pd.core.frame.DataFrame or None:
+        '''
+        Загрузка записи кэша.
+
+        :param full_path: путь к исходному файлу
+        :param tag: параметры чтения
+        :return: DataFrame или None - записи нет, она устарела или повреждена
+        '''
+        path = self.cache_path(full_path=full_path, tag=tag)
+        try:
+            stat = os.stat(full_path)
+            with open(os.path.join(path, _meta_name), mode='r', encoding='utf-8') as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if (meta.get('version') != _version or meta.get('tag') != repr(tag) or
+                meta.get('size') != stat.st_size or meta.get('mtime_ns') != stat.st_mtime_ns):
+            return None
+
+        try:
+            if meta['format'] == 'pickle':
+                return pd.read_pickle(os.path.join(path, 'frame.pkl'))
+            if meta['format'] == 'feather':
+                return self.__load_feather(path=path, meta=meta, memory_map=self.__memory_map)
+            return self.__load_npy(path=path, meta=meta, memory_map=self.__memory_map)
+        except BaseException:  # Повреждённая запись - считаем промахом
+            return None
+
+    @staticmethod
+    def __load_feather(path: str, meta: dict, memory_map: bool) -> pd.core.frame.DataFrame:
+        from pyarrow import feather
+
+        table = feather.read_table(os.path.join(path, 'frame.feather'), memory_map=memory_map)
+        result = table.to_pandas()
+        if meta['index_names'] is not None:
+            result = result.set_index(list(result.columns[:len(meta['index_names'])]))
+            result.index.names = meta['index_names']
+        result.columns = pd.Index(meta['columns'], name=meta['columns_name'])
+        return result
+
+    @staticmethod
+    def __load_npy(path: str, meta: dict, memory_map: bool) -> pd.core.frame.DataFrame:
+        def load_column(entry: dict) -> object:
+            file_path = os.path.join(path, entry['file'])
+            if entry['kind'] == 'npy':
+                return np.load(file_path, mmap_mode='r' if memory_map else None, allow_pickle=False)
+            return pd.read_pickle(file_path)
+
+        if isinstance(meta['index'], dict):
+            index = pd.RangeIndex(**meta['index'], name=meta['index_names'][0])
+        elif len(meta['index']) == 1:
+            index = pd.Index(load_column(meta['index'][0]), name=meta['index_names'][0])
+        else:
+            index = pd.MultiIndex.from_arrays([load_column(entry) for entry in meta['index']],
+                                              names=meta['index_names'])
+
+        data = {number: load_column(entry) for number, entry in enumerate(meta['data'])}
+        result = pd.DataFrame(data, index=index, copy=False)
+        result.columns = pd.Index(meta['columns'], name=meta['columns_name'])
+        return result
+
+    # ------------------------------------------------------------------------------------------------
+    # Сохранение -------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def save(self, full_path: str, tag: object, data: pd.core.frame.DataFrame, stat: os.stat_result = None) -> bool:
+        '''
+        Сохранение записи кэша. Запись собирается во временном каталоге и подменяет прежнюю переименованием, поэтому
+            читатели не видят недописанную запись.
+
+        :param full_path: путь к исходному файлу
+        :param tag: параметры чтения
+        :param data: разобранный DataFrame
+        :param stat: os.stat исходного файла до чтения. Если файл изменился во время чтения, запись не сохраняется
+        :return: True - сохранено, False - файл изменился во время чтения
+        '''
+        if not isinstance(data, pd.core.frame.DataFrame):
+            raise ValidationError(f'data type must be DataFrame. {type(data)} was passed.')
+
+        current = os.stat(full_path)
+        if stat is not None and (stat.st_size, stat.st_mtime_ns) != (current.st_size, current.st_mtime_ns):
+            return False
+
+        path = self.cache_path(full_path=full_path, tag=tag)
+        temp_path = f'{path}.tmp-{uuid.uuid4().hex}'
+        meta = {'version': _version,
+                'tag': repr(tag),
+                'size': current.st_size,
+                'mtime_ns': current.st_mtime_ns}
+        try:
+            os.makedirs(temp_path)
+            if not self.__decomposable(data):
+                data.to_pickle(os.path.join(temp_path, 'frame.pkl'))
+                meta['format'] = 'pickle'
+            elif self.__cache_format == 'feather':
+                meta.update(self.__save_feather(path=temp_path, data=data))
+            else:
+                meta.update(self.__save_npy(path=temp_path, data=data))
+
+            with open(os.path.join(temp_path, _meta_name), mode='w', encoding='utf-8') as file:
+                json.dump(meta, file)
+
+            shutil.rmtree(path, ignore_errors=True)
+            os.rename(temp_path, path)
+        except BaseException as miss:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            if os.path.isdir(path):  # Запись успел сохранить другой процесс
+                return True
+            raise ProcessingError(f'Columnar cache saving failed.\nfull_path: {full_path}\npath: {path}') from miss
+        return True
+
+    @staticmethod
+    def __decomposable(data: pd.core.frame.DataFrame) -> bool:
+        '''
+        Можно ли разложить кадр по колонкам: простые уникальные имена колонок, которые переживают json.
+
+        :param data: DataFrame
+        :return: True - можно
+        '''
+        if isinstance(data.columns, pd.MultiIndex) or not data.columns.is_unique:
+            return False
+        labels = [list(data.columns), data.columns.name, list(data.index.names)]
+        try:
+            return json.loads(json.dumps(labels)) == labels
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def __save_feather(path: str, data: pd.core.frame.DataFrame) -> dict:
+        from pyarrow import feather
+
+        meta = {'format': 'feather',
+                'columns': list(data.columns),
+                'columns_name': data.columns.name,
+                'index_names': None}
+        frame = data.copy(deep=False)
+        frame.columns = [str(number) for number in range(len(frame.columns))]
+        if not isinstance(data.index, pd.RangeIndex) or data.index.name is not None:
+            meta['index_names'] = list(data.index.names)
+            frame.index = frame.index.set_names([f'__index_{number}' for number in range(data.index.nlevels)])
+            frame = frame.reset_index()
+        else:
+            frame = frame.reset_index(drop=True)
+        feather.write_feather(frame, os.path.join(path, 'frame.feather'), compression='uncompressed')
+        return meta
+
+    @staticmethod
+    def __save_npy(path: str, data: pd.core.frame.DataFrame) -> dict:
+        def save_column(values: object, name: str) -> dict:
+            if isinstance(values, np.ndarray) and values.dtype.kind in 'biufcmM':
+                np.save(os.path.join(path, f'{name}.npy'), values, allow_pickle=False)
+                return {'file': f'{name}.npy', 'kind': 'npy'}
+            pd.to_pickle(values, os.path.join(path, f'{name}.pkl'))
+            return {'file': f'{name}.pkl', 'kind': 'pickle'}
+
+        if isinstance(data.index, pd.RangeIndex):  # Диапазон не храним
+            index = {'start': data.index.start, 'stop': data.index.stop, 'step': data.index.step}
+        else:
+            index = [save_column(_values(data.index.get_level_values(level)), f'index_{level}')
+                     for level in range(data.index.nlevels)]
+
+        return {'format': 'npy',
+                'columns': list(data.columns),
+                'columns_name': data.columns.name,
+                'index_names': list(data.index.names),
+                'index': index,
+                'data': [save_column(_values(data.iloc[:, number]), f'column_{number}')
+                         for number in range(len(data.columns))]}
+
+    def clear(self, full_path: str):
+        '''
+        Удаление всех записей кэша файла.
+
+        :param full_path: путь к исходному файлу
+        :return: ничего
+        '''
+        shutil.rmtree(self.__cache_root(full_path), ignore_errors=True)
+        return
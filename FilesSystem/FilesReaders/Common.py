@@ -1,22 +1,114 @@
+import io
 import os
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+
+from .AsyncMethods import AsyncMethods
+from .Compression import open_stream
+from .EncodingDetector import default_detector
+from .LinesCounter import default_counter
+from .LinesIndex import LinesIndex, get_lines_index
+from .LoadedCache import LoadedCache
+from .NamesAllocator import default_allocator
+from .PathLocks import PathLocks, default_path_locks
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
 
+skip_line = object()  # Результат функции "пост обработки" FileIterator: строка пропускается
 
-from chardet.universaldetector import UniversalDetector
-from Exceptions.ExceptionTypes import ProcessingError, ValidationError
 
 def count_lines(full_path: str) -> int:
     '''
-    Функция проверяет количество строк в файле.
+    Функция проверяет количество строк в файле. Строки считаются по b'\\n' в бинарном режиме без декодирования
+        (LinesCounter), результат кэшируется по inode, размеру и времени модификации файла.
 
     :param full_path: имя файла
     :return: количество строк
     '''
-    with open(full_path) as file:
-        lines = 0
-        for line in file:
-            lines += 1
-    return lines
+    return default_counter.count(full_path=full_path)
+
+
+def open_lines(full_path: str, encoding: str = 'utf-8',
+               start: int = 0, lines_index: LinesIndex = None,
+               buffering: int = -1,
+               compression: str = None,
+               background: bool = False) -> io.TextIOWrapper:
+    '''
+    Функция открывает файл на чтение в текстовом режиме и устанавливает его на начало строки start.
+
+    :param full_path: полный путь к файлу
+    :param encoding: кодировка
+    :param start: первая строка
+    :param lines_index: индекс строк файла (LinesIndex). Если передан, переход к строке start выполняется без
+        чтения предыдущих строк.
+    :param buffering: размер буфера чтения в байтах (-1 - стандартный)
+    :param compression: сжатие файла ('gz', 'xz', 'bz2') или None. Сжатый файл читается потоково, индекс строк
+        для него не поддерживается.
+    :param background: распаковывать сжатый файл в отдельном потоке
+    :return: открытый файл
+    '''
+    if compression is not None and lines_index is not None:
+        raise ValidationError('Lines index is not available for compressed files.')
+
+    try:
+        if compression is not None:
+            file = open_stream(full_path, mode='r', encoding=encoding, compression=compression,
+                               background=background,
+                               buffer_size=buffering if buffering > 0 else 1 << 20)
+            for _ in range(start):  # Пропустим строки до start
+                if not file.readline():
+                    break
+        elif lines_index is None:
+            file = open(full_path, mode='r', encoding=encoding, buffering=buffering)
+            for _ in range(start):  # Пропустим строки до start
+                if not file.readline():
+                    break
+        else:
+            binary_file = open(full_path, mode='rb', buffering=buffering)
+            try:
+                lines_index.seek(file=binary_file, line=start)
+                file = io.TextIOWrapper(binary_file, encoding=encoding)
+            except BaseException:
+                binary_file.close()
+                raise
+    except BaseException as miss:  # Если не получилось считать файл
+        raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+    return file
+
+
+def split_file_ranges(full_path: str, chunk_size: int = 64 << 20, start: int = 0) -> list:
+    '''
+    Функция делит файл на диапазоны байт примерно по chunk_size, выровненные по границам строк: каждый диапазон
+        начинается с начала строки и заканчивается сразу после b'\\n' (последний - концом файла).
+
+    :param full_path: полный путь к файлу
+    :param chunk_size: примерный размер диапазона в байтах
+    :param start: смещение, с которого начинается деление (например, после заголовка)
+    :return: список кортежей (начало, конец) - диапазоны [начало, конец)
+    '''
+    if chunk_size < 1:
+        raise ValidationError(f'chunk_size must be positive int. {chunk_size} was passed.')
+
+    try:
+        size = os.path.getsize(full_path)
+        bounds = [start]
+        with open(full_path, mode='rb') as file:
+            position = start + chunk_size
+            while position < size:
+                file.seek(position - 1)
+                file.readline()  # Дочитаем до конца строки, в которую попала граница
+                position = file.tell()
+                if position >= size:
+                    break
+                bounds.append(position)
+                position += chunk_size
+    except BaseException as miss:
+        raise ProcessingError(f'File splitting failed.\nfull_path: {full_path}') from miss
+
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
 
 
 class FileIterator:
@@ -31,7 +123,10 @@ class FileIterator:
     def __init__(self, full_path: str,
                  encoding: str = 'utf-8',
                  start: int = 0, stop: int = None,
-                 post_process_function: object = None):
+                 post_process_function: object = None,
+                 lines_index: LinesIndex = None,
+                 compression: str = None,
+                 background: bool = False):
         '''
         Функция отдаёт иттератор для чтения по строкам.
 
@@ -39,41 +134,169 @@ class FileIterator:
         :param encoding: строка, явно указывающая кодировку или None для её автоопределения
         :param start: первая строка
         :param stop: последняя строка
-        :param post_process_function: функция для "пост обрботки" строки. Функция виде func(str)->str.
+        :param post_process_function: функция для "пост обрботки" строки. Функция виде func(str)->str. Если функция
+            вернула skip_line, строка пропускается (фильтрация).
+        :param lines_index: индекс строк файла (LinesIndex). Если передан, чтение начнётся сразу со строки start, а
+            количество строк будет взято из индекса без пересчёта.
+        :param compression: сжатие файла ('gz', 'xz', 'bz2') или None. Для сжатого файла при stop=None строки не
+            подсчитываются заранее, чтение идёт до конца файла.
+        :param background: распаковывать сжатый файл в отдельном потоке
         :return: итератор по строкам itertools.islice
         '''
         self.__full_path = full_path
         self.__encoding = encoding
 
-        try:
-            self.__file = open(full_path, mode='r', encoding=encoding)
-        except BaseException as miss:  # Если не получилось считать файл
-            raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+        self.__file = open_lines(full_path=full_path, encoding=encoding,
+                                 start=start, lines_index=lines_index,
+                                 compression=compression, background=background)
 
         self.__post_process_function = post_process_function
 
         self.__counter = start
-        if stop is None:
+        if lines_index is not None:
+            lines_count = lines_index.lines_count
+            stop = lines_count if stop is None else min(stop, lines_count)
+        elif stop is None and compression is None:
             stop = count_lines(full_path=full_path)
         self.__stop = stop
 
+    @property
+    def stop(self) -> int or None:
+        '''
+        Номер строки, на которой чтение будет остановлено.
+
+        :return: номер строки; None - до конца файла (сжатый файл)
+        '''
+        return self.__stop
+
+    def close(self):
+        '''
+        Закрытие файла, если чтение прекращено досрочно.
+
+        :return: ничего
+        '''
+        self.__file.close()
+        return
+
     def __next__(self):
-        if self.__counter < self.__stop:
+        while self.__stop is None or self.__counter < self.__stop:
             self.__counter += 1
             try:
                 line = self.__file.readline()
             except BaseException as miss:  # Если не получилось считать файл
                 raise ProcessingError(f'Reading the next line failed.\nfull_path: {self.__full_path}\nencoding: {self.__encoding}') from miss
 
+            if not line:  # Файл закончился раньше stop
+                self.__file.close()
+                raise StopIteration
+
             if self.__post_process_function is not None:
                 line = self.__post_process_function(line)
+                if line is skip_line:
+                    continue
             return line
-        else:
-            self.__file.close()
-            raise StopIteration
+
+        self.__file.close()
+        raise StopIteration
+
+
+class FileBatchIterator:
+    '''
+    Иттератор для чтения файла пачками строк: каждый шаг отдаёт список из batch_size строк (последний - меньше).
+    Файл читается крупными буферами, строки выделяются из буфера пачкой, а функция "пост обработки" вызывается один
+        раз на всю пачку, что убирает накладные расходы Python на каждую строку.
+    Лучше использовать "next", чтобы файл закрылся после работы.
+    '''
+
+    def __iter__(self, ):
+        return self
+
+    def __init__(self, full_path: str,
+                 batch_size: int,
+                 encoding: str = 'utf-8',
+                 start: int = 0, stop: int = None,
+                 post_process_function: object = None,
+                 lines_index: LinesIndex = None,
+                 buffer_size: int = 1 << 20,
+                 compression: str = None,
+                 background: bool = False):
+        '''
+        Функция отдаёт иттератор для чтения пачками строк.
+
+        :param full_path: полный путь к файлу
+        :param batch_size: количество строк в пачке
+        :param encoding: строка, явно указывающая кодировку
+        :param start: первая строка
+        :param stop: последняя строка
+        :param post_process_function: функция для "пост обрботки" пачки строк. Функция виде func(list)->list. Функция
+            может отбросить часть строк (фильтрация); пустые после обработки пачки не отдаются.
+        :param lines_index: индекс строк файла (LinesIndex). Если передан, чтение начнётся сразу со строки start, а
+            количество строк будет взято из индекса без пересчёта.
+        :param buffer_size: размер буфера чтения в байтах
+        :param compression: сжатие файла ('gz', 'xz', 'bz2') или None
+        :param background: распаковывать сжатый файл в отдельном потоке
+        '''
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValidationError(f'batch_size must be positive int. {batch_size} was passed.')
+
+        self.__full_path = full_path
+        self.__encoding = encoding
+        self.__batch_size = batch_size
+
+        self.__file = open_lines(full_path=full_path, encoding=encoding,
+                                 start=start, lines_index=lines_index,
+                                 buffering=buffer_size,
+                                 compression=compression, background=background)
+
+        self.__post_process_function = post_process_function
+
+        self.__counter = start
+        if lines_index is not None:
+            lines_count = lines_index.lines_count
+            stop = lines_count if stop is None else min(stop, lines_count)
+        self.__stop = stop  # None - читать до конца файла
+
+    @property
+    def batch_size(self) -> int:
+        return self.__batch_size
+
+    def close(self):
+        '''
+        Закрытие файла, если чтение прекращено досрочно.
+
+        :return: ничего
+        '''
+        self.__file.close()
+        return
+
+    def __next__(self) -> list:
+        while True:
+            if self.__stop is None:
+                count = self.__batch_size
+            else:
+                count = min(self.__batch_size, self.__stop - self.__counter)
+
+            if count > 0:
+                try:
+                    lines = list(islice(self.__file, count))
+                except BaseException as miss:  # Если не получилось считать файл
+                    raise ProcessingError(f'Reading the next batch failed.\nfull_path: {self.__full_path}\nencoding: {self.__encoding}') from miss
+            else:
+                lines = []
+
+            if not lines:
+                self.__file.close()
+                raise StopIteration
+
+            self.__counter += len(lines)
+            if self.__post_process_function is not None:
+                lines = self.__post_process_function(lines)
+                if not lines:  # Вся пачка отфильтрована
+                    continue
+            return lines
 
 
-class CommonMethods:
+class CommonMethods(AsyncMethods):
     '''
     Класс, реализующий каркас для объектов чтения/записи.
 
@@ -92,30 +315,82 @@ class CommonMethods:
 
             get_encoding() - получить кодировку файла
 
+        Индекс строк
+            get_lines_index() - получить индекс смещений строк файла
+
+            get_lines_count() - получить количество строк файла
+
+        Блокировки
+            read_lock() - блокировка файла на чтение
+
+            write_lock() - блокировка файла на запись
+
         Настройки считывания
             save_loaded - сохранять ли считанные файлы?
 
             loaded - словарь сохранённых файлов
 
+            loaded_cache - кэш сохранённых файлов (бюджет памяти, статистика)
+
             _reset_loaded - обновить словарь сохранённых файлов
 
+        Пакетное чтение
+            read_many() - параллельное чтение набора файлов
+
+        Асинхронные методы (AsyncMethods)
+            aread(), awrite(), awrite_line(), aread_by_lines() - выполняются в общем пуле потоков
+
     '''
 
     def __init__(self,
-                 save_loaded: bool = False):
+                 save_loaded: bool = False,
+                 path_locks: PathLocks = None,
+                 loaded_max_bytes: int or None = 256 << 20):
         '''
 
         :param save_loaded: сохоанять ли считанные файлы?
+        :param loaded_max_bytes: бюджет памяти для сохранённых файлов в байтах. None - без ограничения
+        :param path_locks: блокировки файлов (PathLocks). None - общие для всех объектов блокировки.
         '''
 
         self.__save_loaded = save_loaded
-        self._reset_loaded()  # "сбрасываем" словарь загруженных файлов.
+        self.__loaded = LoadedCache(max_bytes=loaded_max_bytes)
         self.__mutex = threading.RLock()
+        self.__path_locks = default_path_locks if path_locks is None else path_locks
 
     @property
     def mutex(self) -> threading.RLock:
+        '''
+        Мьютекс объекта. Чтение и запись файлов используют блокировки путей (read_lock, write_lock), мьютекс оставлен
+            для внешней синхронизации.
+
+        :return: threading.RLock
+        '''
         return self.__mutex
 
+    @property
+    def path_locks(self) -> PathLocks:
+        return self.__path_locks
+
+    def read_lock(self, full_path: str):
+        '''
+        Блокировка файла на чтение: читать файл одновременно могут несколько потоков, запись на это время
+            запрещена. Операции с другими файлами не блокируются.
+
+        :param full_path: полный путь к файлу
+        :return: контекстный менеджер
+        '''
+        return self.__path_locks.read(full_path=full_path)
+
+    def write_lock(self, full_path: str):
+        '''
+        Блокировка файла на запись: исключительный доступ к файлу. Операции с другими файлами не блокируются.
+
+        :param full_path: полный путь к файлу
+        :return: контекстный менеджер
+        '''
+        return self.__path_locks.write(full_path=full_path)
+
     @staticmethod
     def concat_path(directory: str, file_name: str) -> str or None:
         '''
@@ -194,11 +469,21 @@ class CommonMethods:
     @property
     def loaded(self) -> dict:
         '''
-        Отдаёт копию словаря с загруженными файлами
+        Отдаёт словарь с загруженными файлами {путь: данные} (копия словаря, данные не копируются)
 
         :return:
         '''
-        return self.__loaded.copy()
+        return self.__loaded.snapshot()
+
+    @property
+    def loaded_cache(self) -> LoadedCache:
+        '''
+        Кэш загруженных файлов (LoadedCache). Через него настраивается бюджет памяти (max_bytes, max_items) и
+            доступны счётчики попаданий, промахов и вытеснений (statistics).
+
+        :return: LoadedCache
+        '''
+        return self.__loaded
 
     def _reset_loaded(self):
         '''
@@ -206,40 +491,110 @@ class CommonMethods:
 
         :return:
         '''
-        self.__loaded = {}
+        self.__loaded.clear()
         return
 
     def get_loaded(self, full_path: str) -> object or None:
         '''
-        Функция отдаёт объект по полному имени файла.
+        Функция отдаёт объект по полному имени файла. Если файл изменился после считывания, запись считается
+            устаревшей и удаляется.
 
         :param full_path: полный путь к файлу
-        :return: объект из файла или None, если таковой отсутствует
+        :return: объект из файла; KeyError, если таковой отсутствует или устарел
         '''
-        return self.__loaded[full_path]
+        return self.__loaded.get(full_path=full_path)
 
-    def _ad_loaded(self, full_path: str, data: object) -> bool:
+    def _get_loaded(self, full_path: str, tag: object = None) -> object:
         '''
-        Добавление считанных данных в словарь
+        Функция отдаёт актуальный объект, считанный с теми же параметрами чтения (tag).
 
         :param full_path: полный путь к файлу
-        :param data: данные
-        :return: True - имя было уникально, добавлено (или данные совпали); False - имя было занято (данные не совпали),
-            объект заменён.
+        :param tag: параметры чтения
+        :return: объект из файла; KeyError, если таковой отсутствует, устарел или считан с другими параметрами
         '''
-        try:
-            a = self.__loaded[full_path]
+        return self.__loaded.get(full_path=full_path, tag=tag)
 
-            if a == data:  # проверим идентичность
-                return True  # Если данные идентичны, замена не делается!
+    @staticmethod
+    def _loaded_state(full_path: str) -> tuple or None:
+        '''
+        Состояние файла для кэша loaded. Снимается под блокировкой чтения до чтения файла и передаётся в
+            _ad_loaded(): запись не получит состояние файла, заменённого после чтения.
+
+        :param full_path: полный путь к файлу
+        :return: (размер, mtime) или None - файла нет
+        '''
+        return LoadedCache.file_state(full_path)
+
+    def _ad_loaded(self, full_path: str, data: object, tag: object = None, state: tuple or None = False) -> bool:
+        '''
+        Добавление считанных данных в кэш. При превышении бюджета памяти вытесняются давно не использованные файлы.
 
-            else:  # если данные отличаются
-                self.__loaded[full_path] = data  # установим данные
-                return False
+        :param full_path: полный путь к файлу
+        :param data: данные
+        :param tag: параметры чтения, с которыми получены данные
+        :param state: состояние файла до чтения (_loaded_state()). False - снять при добавлении
+        :return: True - имя было уникально, добавлено; False - имя было занято, объект заменён.
+        '''
+        return self.__loaded.put(full_path=full_path, data=data, tag=tag, state=state)
 
-        except KeyError:  # Если данных нет
-            self.__loaded[full_path] = data
-            return True
+    # ------------------------------------------------------------------------------------------------
+    # Пакетное чтение --------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def read_many(self, paths: list,
+                  max_workers: int = 16,
+                  as_stream: bool = False,
+                  **read_kwargs) -> tuple or object:
+        '''
+        Функция считывает набор файлов параллельно в пуле потоков (read() для каждого пути). Ошибка чтения одного
+            файла не прерывает чтение остальных.
+
+        :param paths: список путей
+        :param max_workers: количество потоков
+        :param as_stream: False - вернуть словари после чтения всех файлов; True - вернуть генератор, отдающий
+            результаты в порядке paths по мере готовности (в работе не более 2 * max_workers файлов).
+        :param read_kwargs: параметры read() (encoding, save_loaded и т.п.)
+        :return: as_stream=False - кортеж (результаты {путь: данные}, ошибки {путь: исключение});
+            as_stream=True - генератор кортежей (путь, данные или None, исключение или None)
+        '''
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValidationError(f'max_workers must be positive int. {max_workers} was passed.')
+
+        stream = self.__read_many_stream(paths=paths, max_workers=max_workers, read_kwargs=read_kwargs)
+        if as_stream:
+            return stream
+
+        results = {}
+        errors = {}
+        for full_path, result, error in stream:
+            if error is None:
+                results[full_path] = result
+            else:
+                errors[full_path] = error
+        return results, errors
+
+    def __read_many_stream(self, paths: list, max_workers: int, read_kwargs: dict):
+        '''
+        Генератор параллельного чтения файлов в порядке paths.
+
+        :param paths: список путей
+        :param max_workers: количество потоков
+        :param read_kwargs: параметры read()
+        :return: генератор кортежей (путь, данные или None, исключение или None)
+        '''
+        def read(full_path: str) -> tuple:
+            try:
+                return full_path, self.read(full_path, **read_kwargs), None
+            except Exception as miss:
+                return full_path, None, miss
+
+        paths = iter(paths)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque(executor.submit(read, full_path) for full_path in islice(paths, 2 * max_workers))
+            while pending:
+                result = pending.popleft().result()
+                for full_path in islice(paths, 1):  # Подкинем следующий файл
+                    pending.append(executor.submit(read, full_path))
+                yield result
 
     # ------------------------------------------------------------------------------------------------
     # Проверки ---------------------------------------------------------------------------------------
@@ -255,64 +610,70 @@ class CommonMethods:
         return os.access(path, mode=os.F_OK)
 
     @staticmethod
-    def get_encoding(full_path: str) -> str:
+    def get_encoding(full_path: str,
+                     sample_size: int or None = None,
+                     use_cache: bool = True,
+                     return_statistics: bool = False,
+                     compression: str or None = 'infer') -> str or tuple:
         '''
-        Проверка кодировки файла
+        Проверка кодировки файла (EncodingDetector): по умолчанию chardet читает файл, пока не примет решение; по
+            запросу - по ограниченной выборке (сначала строгая проверка utf-8, затем chardet). Результат кэшируется
+            по пути, размеру и времени модификации файла.
 
         :param full_path: полный путь к файлу
-        :return: кодировка или None в случае ошибки
-        '''
-        try:
-            detector = UniversalDetector()
-            with open(full_path, 'rb') as fh:
-                for line in fh:
-                    detector.feed(line)
-                    if detector.done:
-                        break
-                detector.close()
-            encoding = detector.result['encoding']  # Получили кодировку
-            return encoding
-        except BaseException as miss:
-            raise ProcessingError('Encoding detection error') from miss
+        :param sample_size: максимальный размер выборки в байтах. None - без ограничения (по умолчанию),
+            False - стандартная настройка (1 Мб). Выборка быстрее, но текст за её пределами не проверяется.
+        :param use_cache: использовать ли кэш
+        :param return_statistics: вернуть ли статистику вызова (DetectionStatistics) вместе с кодировкой
+        :param compression: сжатие файла (проверяются распакованные данные): 'infer' - по суффиксу, None - без
+            сжатия, 'gz', 'xz', 'bz2'
+        :return: кодировка или кортеж (кодировка, DetectionStatistics)
+        '''
+        return default_detector.detect(full_path=full_path, sample_size=sample_size,
+                                       use_cache=use_cache, return_statistics=return_statistics,
+                                       compression=compression)
 
+    # ------------------------------------------------------------------------------------------------
+    # Индекс строк -----------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
     @staticmethod
-    def __shift_name(full_path: str, expansion: str, number: int) -> str:
+    def get_lines_index(full_path: str, step: int = 1000, persist: bool = True) -> LinesIndex:
         '''
-        Функция для коррекции имени файла (для единообразия).
+        Функция отдаёт индекс смещений строк файла. Индекс строится один раз и хранится рядом с файлом
+            (full_path + '.lidx'), при изменении файла он будет перестроен.
 
-        :param full_path: полный путь файла
-        :param expansion: расширение файла
-        :param number: номер "попытки". При number=0 модификация не происходит.
-        :return:
+        :param full_path: полный путь к файлу
+        :param step: шаг индекса: сохраняется смещение каждой step-ой строки
+        :param persist: сохранять ли индекс на диск
+        :return: LinesIndex
         '''
-        if number:
-            export_name = full_path.replace(expansion, f' ({number})' + expansion)
-            return export_name
-        else:
-            return full_path
+        return get_lines_index(full_path=full_path, step=step, persist=persist)
+
+    def get_lines_count(self, full_path: str, use_index: bool = True) -> int:
+        '''
+        Функция отдаёт количество строк в файле.
+
+        :param full_path: полный путь к файлу
+        :param use_index: взять количество строк из индекса (LinesIndex) - True, или посчитать строки - False
+        :return: количество строк
+        '''
+        if not self.check_access(path=full_path):
+            raise ProcessingError('No access to file')
+
+        if use_index:
+            return self.get_lines_index(full_path=full_path).lines_count
+        return count_lines(full_path=full_path)
 
     def name_shifting(self, full_path: str, expansion: str) -> str:
         '''
         Функция, позволяющая сдвинуть имя файла на уникальное. Если имя заведомо является уникальным, сдвига не
             произойдёт.
+        Имя занимается атомарно (NamesAllocator): файл с выбранным именем создаётся пустым, поэтому параллельные
+            потоки и процессы не получат одно и то же имя. Каталог сканируется один раз, далее номера берутся из
+            счётчика. Если запись не удалась, заглушку удаляет DurableWriter(claimed=True).
 
         :param full_path: полное имя файла
         :param expansion: расширение файла
         :return: новое имя файла
         '''
-        retries = 0  # счётчик
-        if not expansion.startswith('.'):  # Если расширение без точки
-            expansion = '.' + expansion  # добавим её
-
-        while self.check_access(path=self.__shift_name(full_path=full_path,
-                                                       expansion=expansion,
-                                                       number=retries)
-                                ):  # Делаем цикл, который прервётся на уникальном имени файла
-            retries += 1
-
-        # Цикл закончится, когда имя файла не будет найдено
-        export_name = self.__shift_name(full_path=full_path,
-                                        expansion=expansion,
-                                        number=retries)
-
-        return export_name  # Вернём имя "после сдвига"
+        return default_allocator.claim(full_path=full_path, expansion=expansion)  # Вернём имя "после сдвига"
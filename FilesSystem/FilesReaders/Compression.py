@@ -0,0 +1,235 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import re
+import threading
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+# Поддерживаемые сжатия: {имя: функция открытия}
+COMPRESSIONS = {'gz': gzip.open,
+                'xz': lzma.open,
+                'bz2': bz2.open}
+
+_suffixes = {'.gz': 'gz', '.gzip': 'gz', '.xz': 'xz', '.lzma': 'xz', '.bz2': 'bz2'}
+# Строгие сигнатуры сжатых файлов (текст, случайно начинающийся с "BZh", не считается сжатым):
+#   gz - заголовок и метод deflate; xz - заголовок потока; bz2 - "BZh", размер блока 1-9 и магия первого блока
+#   (или конца потока у пустого файла)
+_magic = ((re.compile(b'\x1f\x8b\x08'), 'gz'),
+          (re.compile(b'\xfd7zXZ\x00'), 'xz'),
+          (re.compile(b'BZh[1-9](?:\x31\x41\x59\x26\x53\x59|\x17\x72\x45\x38\x50\x90)'), 'bz2'))
+
+
+def split_compression(full_path: str) -> tuple:
+    '''
+    Функция отделяет от пути суффикс сжатия: "data.jsonl.gz" -> ("data.jsonl", "gz").
+
+    :param full_path: путь к файлу
+    :return: кортеж (путь без суффикса сжатия, сжатие или None)
+    '''
+    stem, suffix = os.path.splitext(full_path)
+    compression = _suffixes.get(suffix.lower())
+    if compression is None:
+        return full_path, None
+    return stem, compression
+
+
+def strip_compression(full_path: str) -> str:
+    '''
+    Функция отдаёт путь без суффикса сжатия (для проверки расширения файла).
+
+    :param full_path: путь к файлу
+    :return: путь
+    '''
+    return split_compression(full_path)[0]
+
+
+def detect_compression(full_path: str, check_magic: bool = False) -> str or None:
+    '''
+    Функция определяет сжатие файла по суффиксу. Если суффикса нет и check_magic=True - по сигнатуре в первых байтах
+        существующего файла (только по запросу: текстовый файл без суффикса не проверяется).
+
+    :param full_path: путь к файлу
+    :param check_magic: проверять ли первые байты файла без суффикса сжатия
+    :return: 'gz', 'xz', 'bz2' или None - файл не сжат
+    '''
+    compression = split_compression(full_path)[1]
+    if compression is not None or not check_magic:
+        return compression
+
+    try:
+        with open(full_path, mode='rb') as file:
+            head = file.read(10)
+    except OSError:
+        return None
+
+    for magic, compression in _magic:
+        if magic.match(head):
+            return compression
+    return None
+
+
+def compressed_expansion(full_path: str, expansion: str) -> str:
+    '''
+    Функция дополняет расширение суффиксом сжатия из пути: ("data.jsonl.gz", ".jsonl") -> ".jsonl.gz".
+
+    :param full_path: путь к файлу
+    :param expansion: расширение файла
+    :return: расширение
+    '''
+    stem = strip_compression(full_path)
+    return expansion + full_path[len(stem):]
+
+
+def resolve_compression(full_path: str, compression: str or None = 'infer', check_magic: bool = False) -> str or None:
+    '''
+    Функция проверяет и определяет параметр сжатия.
+
+    :param full_path: путь к файлу
+    :param compression: 'infer' - определить (detect_compression), None - без сжатия, 'gz', 'xz', 'bz2'
+    :param check_magic: при 'infer' проверять ли сигнатуру в первых байтах файла без суффикса сжатия
+    :return: 'gz', 'xz', 'bz2' или None
+    '''
+    if compression == 'infer':
+        return detect_compression(full_path=full_path, check_magic=check_magic)
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValidationError(f"compression must be 'infer', None or one of {tuple(COMPRESSIONS)}. " +
+                              f'{compression} was passed.')
+    return compression
+
+
+def open_stream(full_path: str, mode: str = 'r',
+                encoding: str = None,
+                compression: str or None = 'infer',
+                background: bool = False,
+                buffer_size: int = 1 << 20,
+                compresslevel: int = None,
+                check_magic: bool = False) -> object:
+    '''
+    Функция открывает файл с прозрачным сжатием/распаковкой. Несжатый файл открывается обычным open().
+
+    :param full_path: путь к файлу
+    :param mode: режим: 'r', 'w', 'a' (текстовый) или 'rb', 'wb', 'ab' (бинарный)
+    :param encoding: кодировка для текстового режима
+    :param compression: 'infer' - по суффиксу, None - без сжатия, 'gz', 'xz', 'bz2'
+    :param background: распаковывать в отдельном потоке (только чтение сжатого файла): распаковка идёт параллельно
+        с разбором строк
+    :param buffer_size: размер буфера (блока распаковки) в байтах
+    :param compresslevel: уровень сжатия при записи. None - стандартный для сжатия
+    :param check_magic: при 'infer' и чтении проверять ли сигнатуру в первых байтах файла без суффикса сжатия. При
+        записи и дозаписи не проверяется никогда
+    :return: файловый объект
+    '''
+    binary = 'b' in mode
+    base_mode = mode.replace('b', '').replace('t', '')
+    if base_mode not in ('r', 'w', 'a', 'x'):
+        raise ValidationError(f"mode must be one of 'r', 'w', 'a', 'x' (+ 'b'). {mode} was passed.")
+
+    compression = resolve_compression(full_path=full_path, compression=compression,
+                                      check_magic=check_magic and base_mode == 'r')
+    if compression is None:
+        if binary:
+            return open(full_path, mode=base_mode + 'b', buffering=buffer_size)
+        return open(full_path, mode=base_mode, encoding=encoding, buffering=buffer_size)
+
+    opener = COMPRESSIONS[compression]
+    if base_mode == 'r':
+        raw = opener(full_path, mode='rb')
+        if background:
+            raw = io.BufferedReader(BackgroundReader(raw, block_size=buffer_size), buffer_size=buffer_size)
+    elif compresslevel is not None and compression != 'xz':
+        raw = opener(full_path, mode=base_mode + 'b', compresslevel=compresslevel)
+    elif compresslevel is not None:
+        raw = opener(full_path, mode=base_mode + 'b', preset=compresslevel)
+    else:
+        raw = opener(full_path, mode=base_mode + 'b')
+
+    if binary:
+        return raw
+    return io.TextIOWrapper(raw, encoding=encoding)
+
+
+class BackgroundReader(io.RawIOBase):
+    '''
+    Чтение потока в отдельном потоке: блоки заранее читаются (распаковываются) из исходного объекта и складываются
+        в ограниченную очередь, из которой их забирает читатель. Используется в open_stream(background=True).
+
+    Методы и свойства:
+        readinto() - прочитать данные в буфер
+
+        close() - остановить поток и закрыть исходный объект
+    '''
+
+    __end = object()
+
+    def __init__(self, source: object, block_size: int = 1 << 20, prefetch: int = 4):
+        '''
+
+        :param source: бинарный файловый объект
+        :param block_size: размер блока в байтах
+        :param prefetch: сколько блоков читать заранее
+        '''
+        io.RawIOBase.__init__(self)
+        self.__source = source
+        self.__block_size = block_size
+        self.__queue = queue.Queue(maxsize=max(1, prefetch))
+        self.__stopped = threading.Event()
+        self.__buffer = memoryview(b'')
+        self.__finished = False
+
+        self.__thread = threading.Thread(target=self.__work, name='BackgroundReader', daemon=True)
+        self.__thread.start()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: object) -> int:
+        if not self.__buffer and not self.__finished:
+            block = self.__queue.get()
+            if block is self.__end:
+                self.__finished = True
+            elif isinstance(block, BaseException):
+                self.__finished = True
+                raise ProcessingError('Background reading failed.') from block
+            else:
+                self.__buffer = memoryview(block)
+
+        size = min(len(buffer), len(self.__buffer))
+        buffer[:size] = self.__buffer[:size]
+        self.__buffer = self.__buffer[size:]
+        return size
+
+    def close(self):
+        if self.closed:
+            return
+        self.__stopped.set()
+        try:  # Освободим место в очереди, если поток ждёт
+            while True:
+                self.__queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.__thread.join()
+        self.__source.close()
+        io.RawIOBase.close(self)
+
+    def __work(self):
+        try:
+            while not self.__stopped.is_set():
+                block = self.__source.read(self.__block_size)
+                if not block:
+                    break
+                self.__put(block)
+            self.__put(self.__end)
+        except BaseException as miss:
+            self.__put(miss)
+
+    def __put(self, item: object):
+        while not self.__stopped.is_set():
+            try:
+                self.__queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
@@ -0,0 +1,253 @@
+import os
+import threading
+import uuid
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+# Политики надёжности записи
+DURABILITY_NONE = 'none'  # без fsync: данные попадут на диск, когда решит ОС
+DURABILITY_FILE = 'file'  # fsync каждого файла (и каталога после переименования)
+DURABILITY_POLICIES = (DURABILITY_NONE, DURABILITY_FILE)
+
+
+def fsync_path(path: str):
+    '''
+    Функция сбрасывает на диск файл или каталог по пути.
+
+    :param path: путь к файлу или каталогу
+    :return: ничего
+    '''
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+    return
+
+
+def remove_file(path: str):
+    '''
+    Функция удаляет файл, если он есть (ошибки удаления игнорируются).
+
+    :param path: путь к файлу
+    :return: ничего
+    '''
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return
+
+
+def fsync_directory(directory: str):
+    '''
+    Функция сбрасывает на диск каталог (запись о переименовании файла). В Windows каталоги не сбрасываются.
+
+    :param directory: каталог
+    :return: ничего
+    '''
+    if os.name == 'nt':
+        return
+    fsync_path(directory or '.')
+    return
+
+
+class SyncGroup:
+    '''
+    Групповой сброс на диск (group commit): файлы нескольких экспортов сбрасываются одним проходом, каждый каталог -
+        один раз. Используется как политика durability в write(): durability=group.
+
+    При атомарной записи (atomic=True) файлы группы остаются во временных файлах и появляются под своими именами
+        только в commit(): сначала выполняется fsync всех временных файлов, затем переименование, затем fsync
+        каталогов. При обычной записи файлы пишутся на место, а commit() выполняет их fsync.
+
+    Удобно использовать как контекстный менеджер: commit() при успешном выходе, discard() при исключении.
+
+    Методы и свойства:
+        pending - количество файлов, ожидающих commit()
+
+        add() - добавить файл в группу
+
+        commit() - сбросить файлы группы на диск
+
+        discard() - отменить атомарные записи группы
+    '''
+
+    def __init__(self):
+        self.__pending = []  # [(временный путь, итоговый путь, занято ли имя заглушкой)]
+        self.__mutex = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self.__pending)
+
+    def add(self, temp_path: str, full_path: str, claimed: bool = False):
+        '''
+        Добавление файла в группу.
+
+        :param temp_path: путь, по которому записаны данные
+        :param full_path: итоговый путь (совпадает с temp_path при записи на место)
+        :param claimed: итоговый путь занят пустой заглушкой (name_shifting): при discard() она удаляется
+        :return: ничего
+        '''
+        with self.__mutex:
+            self.__pending.append((temp_path, full_path, claimed))
+        return
+
+    def commit(self):
+        '''
+        Сброс файлов группы на диск и переименование атомарных записей.
+
+        :return: ничего
+        '''
+        with self.__mutex:
+            pending, self.__pending = self.__pending, []
+
+        try:
+            for temp_path, _, _ in pending:
+                fsync_path(temp_path)
+
+            directories = set()
+            for temp_path, full_path, _ in pending:
+                if temp_path != full_path:
+                    os.replace(temp_path, full_path)
+                directories.add(os.path.dirname(os.path.abspath(full_path)))
+
+            for directory in directories:
+                fsync_directory(directory)
+        except BaseException as miss:
+            raise ProcessingError('Group commit failed.') from miss
+        return
+
+    def discard(self):
+        '''
+        Отмена: временные файлы атомарных записей (и заглушки их имён) удаляются, записанные на место файлы остаются
+            без fsync.
+
+        :return: ничего
+        '''
+        with self.__mutex:
+            pending, self.__pending = self.__pending, []
+
+        for temp_path, full_path, claimed in pending:
+            if temp_path != full_path:
+                remove_file(temp_path)
+                if claimed:
+                    remove_file(full_path)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+class DurableWriter:
+    '''
+    Запись файла с выбранной политикой надёжности.
+
+    atomic=True - данные пишутся во временный файл в том же каталоге (".name.XXXX.tmp.ext"), который после успешной
+        записи переименовывается на место итогового (os.replace). При сбое итоговый файл остаётся прежним, а не
+        обрезанным.
+    durability - 'none' (без fsync), 'file' (fsync файла и каталога) или SyncGroup (отложенный групповой fsync).
+    claimed=True - итоговый путь занят пустой заглушкой (name_shifting): при сбое записи заглушка (или недописанный
+        файл) удаляется, чтобы на диске не оставался пустой файл с занятым именем.
+
+    Используется как контекстный менеджер: запись в path (или через open()), фиксация при выходе без исключения.
+
+    Методы и свойства:
+        full_path - итоговый путь
+
+        path - путь, по которому надо писать данные
+
+        open() - открыть path на запись
+
+        discard() - отменить запись
+    '''
+
+    def __init__(self, full_path: str,
+                 atomic: bool = False,
+                 durability: str or SyncGroup = DURABILITY_NONE,
+                 claimed: bool = False):
+        '''
+
+        :param full_path: итоговый путь
+        :param atomic: писать ли через временный файл с переименованием
+        :param durability: политика надёжности: 'none', 'file' или объект SyncGroup
+        :param claimed: итоговый путь занят заглушкой, которую надо удалить при сбое
+        '''
+        if not isinstance(durability, SyncGroup) and durability not in DURABILITY_POLICIES:
+            if claimed:
+                remove_file(full_path)
+            raise ValidationError(f'durability must be one of {DURABILITY_POLICIES} or SyncGroup. ' +
+                                  f'{durability} was passed.')
+
+        self.__full_path = full_path
+        self.__atomic = atomic
+        self.__durability = durability
+        self.__claimed = claimed
+        self.__path = full_path
+
+        if atomic:
+            directory, file_name = os.path.split(full_path)
+            expansion = os.path.splitext(file_name)[1]
+            self.__path = os.path.join(directory, f'.{file_name}.{uuid.uuid4().hex[:8]}.tmp{expansion}')
+
+    @property
+    def full_path(self) -> str:
+        return self.__full_path
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def open(self, mode: str = 'w', encoding: str = None) -> object:
+        '''
+        Открытие path на запись.
+
+        :param mode: режим открытия
+        :param encoding: кодировка (для текстового режима)
+        :return: файловый объект
+        '''
+        return open(self.__path, mode=mode, encoding=encoding)
+
+    def __enter__(self):
+        return self
+
+    def discard(self):
+        '''
+        Отмена записи: удаляется временный файл и заглушка занятого имени.
+
+        :return: ничего
+        '''
+        if self.__atomic:
+            remove_file(self.__path)
+        if self.__claimed:
+            remove_file(self.__full_path)
+        return
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.discard()
+            return
+
+        if isinstance(self.__durability, SyncGroup):
+            self.__durability.add(temp_path=self.__path, full_path=self.__full_path, claimed=self.__claimed)
+            return
+
+        try:
+            if self.__durability == DURABILITY_FILE:
+                fsync_path(self.__path)
+            if self.__atomic:
+                os.replace(self.__path, self.__full_path)
+        except BaseException:
+            self.discard()
+            raise
+
+        if self.__atomic and self.__durability == DURABILITY_FILE:
+            fsync_directory(os.path.dirname(os.path.abspath(self.__full_path)))
+        return
@@ -0,0 +1,214 @@
+import codecs
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from itertools import chain
+
+from chardet.universaldetector import UniversalDetector
+from .Compression import open_stream
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+# Статистика одного определения кодировки.
+#   method: 'cache' - взято из кэша, 'utf-8' - строгая проверка utf-8, 'chardet' - UniversalDetector
+DetectionStatistics = namedtuple('DetectionStatistics',
+                                 ['full_path', 'encoding', 'method', 'bytes_sampled', 'seconds'])
+
+
+class EncodingDetector:
+    '''
+    Определение кодировки файла по ограниченной выборке.
+
+    Порядок определения:
+        1. Кэш по (путь, размер, mtime, размер выборки, сжатие) - повторное определение для неизменённого файла не читает его.
+        2. Строгая проверка utf-8 на выборке (первые sample_size байт файла): если выборка декодируется без ошибок,
+            кодировка - utf-8 (или UTF-8-SIG при наличии BOM). Файлы только из ASCII символов поэтому определяются
+            как utf-8 (надмножество ASCII), а не как 'ascii', который вернул бы chardet.
+            При sample_size=None (полная проверка chardet) не выполняется.
+        3. chardet.UniversalDetector по той же выборке.
+
+    По каждому вызову сохраняется статистика (DetectionStatistics): сколько байт было прочитано и сколько времени
+        заняло определение.
+
+    Методы и свойства:
+        sample_size - максимальный размер выборки в байтах (None - без ограничения)
+
+        utf8_fast_path - выполнять ли строгую проверку utf-8 перед chardet
+
+        detect() - определить кодировку
+
+        statistics - статистика последних вызовов
+
+        reset_cache() - сбросить кэш
+    '''
+
+    __block_size = 64 << 10  # размер блока, которым выборка подаётся в UniversalDetector
+
+    def __init__(self,
+                 sample_size: int or None = 1 << 20,
+                 utf8_fast_path: bool = True,
+                 cache_size: int = 4096,
+                 statistics_size: int = 1000):
+        '''
+
+        :param sample_size: максимальный размер выборки в байтах. None - читать файл, пока UniversalDetector не
+            примет решение (поведение без ограничения).
+        :param utf8_fast_path: выполнять ли строгую проверку utf-8 перед chardet (кроме sample_size=None)
+        :param cache_size: максимальное количество файлов в кэше. 0 - не кэшировать
+        :param statistics_size: сколько последних вызовов хранить в статистике
+        '''
+        if sample_size is not None and sample_size < 1:
+            raise ValidationError(f'sample_size must be positive int or None. {sample_size} was passed.')
+
+        self.__sample_size = sample_size
+        self.__utf8_fast_path = utf8_fast_path
+        self.__cache_size = cache_size
+
+        self.__cache = {}
+        self.__statistics = deque(maxlen=statistics_size)
+        self.__mutex = threading.Lock()
+
+    # ------------------------------------------------------------------------------------------------
+    # Свойства ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @property
+    def sample_size(self) -> int or None:
+        return self.__sample_size
+
+    @property
+    def utf8_fast_path(self) -> bool:
+        return self.__utf8_fast_path
+
+    @property
+    def statistics(self) -> list:
+        '''
+        Статистика последних вызовов detect() (от старых к новым).
+
+        :return: список DetectionStatistics
+        '''
+        with self.__mutex:
+            return list(self.__statistics)
+
+    def reset_cache(self):
+        '''
+        Сброс кэша кодировок.
+
+        :return: ничего
+        '''
+        with self.__mutex:
+            self.__cache = {}
+        return
+
+    # ------------------------------------------------------------------------------------------------
+    # Определение кодировки --------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def detect(self, full_path: str,
+               sample_size: int or None = False,
+               use_cache: bool = True,
+               return_statistics: bool = False,
+               compression: str or None = 'infer') -> str or tuple:
+        '''
+        Определение кодировки файла.
+
+        :param full_path: полный путь к файлу
+        :param sample_size: размер выборки для этого вызова. False - использовать настройку объекта,
+            None - без ограничения.
+        :param use_cache: использовать ли кэш
+        :param return_statistics: вернуть ли статистику вызова вместе с кодировкой
+        :param compression: сжатие файла (проверяются распакованные данные): 'infer' - по суффиксу, None - без
+            сжатия, 'gz', 'xz', 'bz2'
+        :return: кодировка или кортеж (кодировка, DetectionStatistics)
+        '''
+        started = time.perf_counter()
+        if sample_size is False:
+            sample_size = self.__sample_size
+
+        try:
+            stat = os.stat(full_path)
+            key = (os.path.abspath(full_path), stat.st_size, stat.st_mtime_ns, sample_size, compression)
+
+            encoding = None
+            if use_cache:
+                with self.__mutex:
+                    encoding = self.__cache.get(key)
+
+            if encoding is not None:
+                method, sampled = 'cache', 0
+            else:
+                encoding, method, sampled = self.__detect(full_path=full_path, sample_size=sample_size,
+                                                          compression=compression)
+                if self.__cache_size:
+                    with self.__mutex:
+                        if len(self.__cache) >= self.__cache_size:  # Выкинем самый старый результат
+                            self.__cache.pop(next(iter(self.__cache)))
+                        self.__cache[key] = encoding
+        except BaseException as miss:
+            raise ProcessingError('Encoding detection error') from miss
+
+        statistics = DetectionStatistics(full_path=full_path, encoding=encoding, method=method,
+                                         bytes_sampled=sampled, seconds=time.perf_counter() - started)
+        with self.__mutex:
+            self.__statistics.append(statistics)
+
+        if return_statistics:
+            return encoding, statistics
+        return encoding
+
+    def __detect(self, full_path: str, sample_size: int or None, compression: str or None) -> tuple:
+        '''
+        Определение кодировки по выборке без кэша.
+
+        :param full_path: полный путь к файлу
+        :param sample_size: размер выборки или None
+        :param compression: сжатие файла
+        :return: кортеж (кодировка, метод, прочитано байт)
+        '''
+        with open_stream(full_path, mode='rb', compression=compression) as file:  # сжатые файлы проверяются по распакованным данным
+            limit = self.__block_size if sample_size is None else sample_size
+            sample = file.read(limit + 1)
+            complete = len(sample) <= limit  # выборка покрывает весь файл
+            sample, tail = sample[:limit], sample[limit:]
+
+            if self.__utf8_fast_path and sample_size is not None and self.__check_utf8(sample=sample, final=complete):
+                encoding = 'UTF-8-SIG' if sample.startswith(codecs.BOM_UTF8) else 'utf-8'
+                return encoding, 'utf-8', len(sample)
+
+            detector = UniversalDetector()
+            sampled = 0
+            for start in range(0, len(sample), self.__block_size):
+                block = sample[start:start + self.__block_size]
+                detector.feed(block)
+                sampled += len(block)
+                if detector.done:
+                    break
+
+            if sample_size is None and not detector.done:  # Без ограничения - читаем дальше
+                for block in chain((tail,), iter(lambda: file.read(self.__block_size), b'')):
+                    detector.feed(block)
+                    sampled += len(block)
+                    if detector.done:
+                        break
+            detector.close()
+
+        return detector.result['encoding'], 'chardet', sampled
+
+    @staticmethod
+    def __check_utf8(sample: bytes, final: bool) -> bool:
+        '''
+        Строгая проверка выборки на utf-8. Если выборка не покрывает весь файл, обрезанный в конце символ ошибкой не
+            считается.
+
+        :param sample: выборка
+        :param final: выборка покрывает весь файл
+        :return: True - выборка является корректным utf-8
+        '''
+        if not sample:
+            return False  # Пустой файл - решение остаётся за chardet
+        try:
+            codecs.getincrementaldecoder('utf-8')(errors='strict').decode(sample, final=final)
+            return True
+        except UnicodeDecodeError:
+            return False
+
+
+default_detector = EncodingDetector()
@@ -0,0 +1,258 @@
+import json
+import os
+import threading
+import time
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+
+class FileFollower:
+    '''
+    Чтение растущего файла (tail -F): отдаются только новые полностью дописанные строки (заканчивающиеся '\\n').
+
+    Позиция чтения - смещение в байтах от начала файла, строки ищутся по b'\\n', поэтому кодировка должна быть
+        совместима с ASCII (utf-8, cp1251 и т.п.). Файл отслеживается по (устройство, inode):
+        усечение - размер файла стал меньше смещения: чтение начинается с начала файла;
+        ротация - по пути появился другой файл: сначала дочитывается прежний файл (он остаётся открытым), затем
+            чтение продолжается с начала нового.
+
+    Контрольная точка (checkpoint_path) - json файл с inode и смещением. Она записывается атомарно в commit() (в
+        follow() - автоматически после выдачи каждой пачки строк), поэтому после перезапуска чтение продолжится с
+        последней сохранённой позиции (доставка "хотя бы один раз").
+
+    Методы и свойства:
+        full_path - путь к файлу
+
+        offset - смещение первой непрочитанной строки
+
+        poll() - получить новые строки
+
+        follow() - генератор новых строк с ожиданием
+
+        commit() - сохранить контрольную точку
+
+        close() - закрыть файл
+    '''
+
+    def __init__(self, full_path: str,
+                 encoding: str = 'utf-8',
+                 checkpoint_path: str = None,
+                 start: str = 'begin',
+                 post_process_function: object = None,
+                 max_bytes: int = 8 << 20):
+        '''
+
+        :param full_path: полный путь к файлу
+        :param encoding: кодировка
+        :param checkpoint_path: путь к файлу контрольной точки. None - позиция не сохраняется
+        :param start: откуда читать, если контрольной точки нет: 'begin' - с начала файла, 'end' - только новые
+            строки
+        :param post_process_function: функция для "пост обработки" строки. Функция виде func(str)->object.
+        :param max_bytes: сколько байт читать за один poll() (длинная строка читается целиком, прежний файл при
+            ротации дочитывается целиком)
+        '''
+        if start not in ('begin', 'end'):
+            raise ValidationError(f"start must be 'begin' or 'end'. {start} was passed.")
+        if max_bytes < 1:
+            raise ValidationError(f'max_bytes must be positive int. {max_bytes} was passed.')
+
+        self.__full_path = full_path
+        self.__encoding = encoding
+        self.__checkpoint_path = checkpoint_path
+        self.__post_process_function = post_process_function
+        self.__max_bytes = max_bytes
+        self.__mutex = threading.RLock()
+
+        self.__file = None
+        self.__identity = None  # (устройство, inode) открытого файла
+        self.__offset = 0
+        self.__closed = False
+
+        checkpoint = self.__load_checkpoint()
+        self.__open()
+        if checkpoint is not None and checkpoint['identity'] == self.__identity:
+            self.__offset = checkpoint['offset']
+        elif checkpoint is None and start == 'end' and self.__file is not None:
+            self.__offset = os.fstat(self.__file.fileno()).st_size
+        # Контрольная точка от другого файла (ротация во время остановки) - читаем новый файл с начала
+
+    # ------------------------------------------------------------------------------------------------
+    # Свойства ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @property
+    def full_path(self) -> str:
+        return self.__full_path
+
+    @property
+    def offset(self) -> int:
+        return self.__offset
+
+    @property
+    def checkpoint_path(self) -> str or None:
+        return self.__checkpoint_path
+
+    # ------------------------------------------------------------------------------------------------
+    # Файл и контрольная точка -----------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def __open(self) -> bool:
+        '''
+        Открытие файла по пути.
+
+        :return: True - файл открыт; False - файла нет
+        '''
+        try:
+            file = open(self.__full_path, mode='rb')
+        except FileNotFoundError:
+            return False
+        except OSError as miss:
+            raise ProcessingError(f'File opening failed.\nfull_path: {self.__full_path}') from miss
+
+        stat = os.fstat(file.fileno())
+        if self.__file is not None:
+            self.__file.close()
+        self.__file = file
+        self.__identity = (stat.st_dev, stat.st_ino)
+        return True
+
+    def __load_checkpoint(self) -> dict or None:
+        if self.__checkpoint_path is None or not os.path.exists(self.__checkpoint_path):
+            return None
+        try:
+            with open(self.__checkpoint_path, mode='r', encoding='utf-8') as file:
+                data = json.load(file)
+            return {'identity': tuple(data['identity']), 'offset': int(data['offset'])}
+        except BaseException as miss:
+            raise ProcessingError(f'Checkpoint reading failed.\ncheckpoint_path: {self.__checkpoint_path}') from miss
+
+    def commit(self):
+        '''
+        Атомарное сохранение контрольной точки (временный файл и os.replace).
+
+        :return: ничего
+        '''
+        if self.__checkpoint_path is None:
+            return
+        with self.__mutex:
+            data = {'full_path': self.__full_path,
+                    'identity': self.__identity,
+                    'offset': self.__offset}
+        temp_path = f'{self.__checkpoint_path}.tmp'
+        try:
+            with open(temp_path, mode='w', encoding='utf-8') as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.__checkpoint_path)
+        except BaseException as miss:
+            raise ProcessingError(f'Checkpoint saving failed.\ncheckpoint_path: {self.__checkpoint_path}') from miss
+        return
+
+    def close(self):
+        with self.__mutex:
+            self.__closed = True
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ------------------------------------------------------------------------------------------------
+    # Чтение -----------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def __read_lines(self) -> list:
+        '''
+        Чтение полных строк открытого файла от смещения. Неполная последняя строка остаётся непрочитанной.
+
+        :return: список строк
+        '''
+        self.__file.seek(self.__offset)
+        data = self.__file.read(self.__max_bytes)
+        end = data.rfind(b'\n')
+        while end < 0 and len(data) >= self.__max_bytes:  # Длинная строка - дочитаем до её конца
+            block = self.__file.read(self.__max_bytes)
+            if not block:
+                break
+            found = block.find(b'\n')
+            data += block
+            if found >= 0:
+                end = len(data) - len(block) + found
+
+        if end < 0:
+            return []
+        data = data[:end + 1]
+        self.__offset += len(data)
+        return [line + '\n' for line in data.decode(self.__encoding).split('\n')[:-1]]
+
+    def poll(self) -> list:
+        '''
+        Получение новых полных строк без ожидания. Смещение сдвигается в памяти; для сохранения - commit().
+
+        :return: список строк (после post_process_function)
+        '''
+        with self.__mutex:
+            if self.__closed:
+                raise ProcessingError(f'Follower is closed.\nfull_path: {self.__full_path}')
+            try:
+                if self.__file is None:  # Файла ещё не было
+                    if not self.__open():
+                        return []
+                    self.__offset = 0
+
+                lines = []
+                try:
+                    stat = os.stat(self.__full_path)
+                    identity = (stat.st_dev, stat.st_ino)
+                except FileNotFoundError:  # Файл переименован, новый ещё не создан
+                    identity = self.__identity
+
+                if identity != self.__identity:  # Ротация: дочитаем прежний файл целиком и перейдём на новый
+                    chunk = self.__read_lines()
+                    while chunk:  # За один вызов читается не больше max_bytes
+                        lines.extend(chunk)
+                        chunk = self.__read_lines()
+                    if self.__open():
+                        self.__offset = 0
+                elif os.fstat(self.__file.fileno()).st_size < self.__offset:  # Усечение
+                    self.__offset = 0
+
+                lines.extend(self.__read_lines())
+            except ProcessingError:
+                raise
+            except BaseException as miss:
+                raise ProcessingError(f'Following the file failed.\nfull_path: {self.__full_path}') from miss
+
+        if self.__post_process_function is not None:
+            lines = [self.__post_process_function(line) for line in lines]
+        return lines
+
+    def follow(self, poll_interval: float = 0.5,
+               timeout: float = None,
+               stop_event: threading.Event = None):
+        '''
+        Генератор новых строк: ждёт появления строк, опрашивая файл раз в poll_interval секунд. Контрольная точка
+            сохраняется после выдачи каждой пачки строк.
+
+        :param poll_interval: интервал опроса в секундах
+        :param timeout: завершить, если новых строк нет столько секунд. None - без ограничения
+        :param stop_event: событие для остановки из другого потока
+        :return: генератор строк
+        '''
+        idle_since = time.monotonic()
+        while stop_event is None or not stop_event.is_set():
+            lines = self.poll()
+            if lines:
+                for line in lines:
+                    yield line
+                self.commit()
+                idle_since = time.monotonic()
+                continue
+
+            if timeout is not None and time.monotonic() - idle_since >= timeout:
+                return
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
@@ -1,7 +1,10 @@
 from .Common import CommonMethods
+from .DurableWriting import DurableWriter, SyncGroup
+from .JSONCodec import JSONCodec, get_codec
+from .JSONStream import JSONArrayStream
 from Exceptions.ExceptionTypes import ProcessingError, ValidationError
 
-import json
+from itertools import islice
 
 
 class JSON(CommonMethods):
@@ -30,21 +33,42 @@ class JSON(CommonMethods):
 
             _reset_loaded - обновить словарь сохранённых файлов
 
+            codec - кодек json (JSONCodec)
+
         Чтение - запись
             write() - запись
 
             read() - чтение
+
+            read_array() - потоковое чтение элементов большого массива
+
+            write_array() - потоковая запись массива из итерируемого объекта
     '''
 
 
-    def __init__(self, save_loaded: bool = False):
+    def __init__(self, save_loaded: bool = False,
+                 loaded_max_bytes: int or None = 256 << 20,
+                 codec: str or JSONCodec = None):
         '''
 
         :param save_loaded: сохоанять ли считанные файлы?
+        :param loaded_max_bytes: бюджет памяти для сохранённых файлов в байтах. None - без ограничения
+        :param codec: кодек json: None - кодек по умолчанию (JSONCodec.set_default_codec, изначально 'json'),
+            'auto', 'json', 'orjson', 'ujson' или объект JSONCodec. Быстрые кодеки меняют вывод (см. JSONCodec)
         '''
 
         # Выполним стандартный init
-        CommonMethods.__init__(self, save_loaded=save_loaded)
+        CommonMethods.__init__(self, save_loaded=save_loaded, loaded_max_bytes=loaded_max_bytes)
+
+        self.__codec = None if codec is None else get_codec(codec=codec)
+
+    @property
+    def codec(self) -> JSONCodec:
+        return get_codec(codec=self.__codec)
+
+    @codec.setter
+    def codec(self, value: str or JSONCodec or None):
+        self.__codec = None if value is None else get_codec(codec=value)
 
     # ------------------------------------------------------------------------------------------------
     # Чтение -----------------------------------------------------------------------------------------
@@ -63,7 +87,15 @@ class JSON(CommonMethods):
         if not full_path.endswith('.json'):
             raise ValidationError("Incorrect file extension. Only '.json' is available.")
 
-        with self.mutex:
+        read_tag = ('read', encoding)  # параметры чтения для кэша loaded
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
+
+        with self.read_lock(full_path=full_path):
+            state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
             if not self.check_access(path=full_path):
                 raise ProcessingError('No access to file')
 
@@ -74,21 +106,63 @@ class JSON(CommonMethods):
             # читаем
             try:
                 with open(full_path, mode='r', encoding=encoding) as file:
-                    result = json.load(file)
+                    result = self.codec.loads(file.read())
             except BaseException as miss:  # Если не получилось считать файл
                 raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
 
         if (save_loaded is None and self.save_loaded) or save_loaded is True:
             self._ad_loaded(full_path=full_path,
-                            data=result)
+                            data=result,
+                            tag=read_tag,
+                            state=state)
 
         return result
 
+    def read_array(self, full_path: str,
+                   encoding: str = None,
+                   path: str or list or tuple = None,
+                   buffer_size: int = 1 << 16):
+        '''
+        Функция отдаёт итератор по элементам большого json массива (JSONArrayStream): элементы декодируются по
+            одному из буфера фиксированного размера, файл целиком в память не считывается.
+
+        :param full_path: полный путь к файлу
+        :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param path: путь к массиву: None - массив верхнего уровня; строка "data.items" или список ключей
+            ["data", "items"] - массив внутри вложенных объектов
+        :param buffer_size: размер блока чтения в символах
+        :return: генератор элементов массива
+        '''
+        if not full_path.endswith('.json'):
+            raise ValidationError("Incorrect file extension. Only '.json' is available.")
+
+        with self.read_lock(full_path=full_path):
+            if not self.check_access(path=full_path):
+                raise ProcessingError('No access to file')
+
+            # определим кодировку файла
+            if encoding is None:
+                encoding = self.get_encoding(full_path=full_path)
+
+        return self.__iter_array(full_path=full_path, encoding=encoding, path=path, buffer_size=buffer_size)
+
+    @staticmethod
+    def __iter_array(full_path: str, encoding: str, path: str or list or tuple, buffer_size: int):
+        try:
+            with open(full_path, mode='r', encoding=encoding) as file:
+                yield from JSONArrayStream(file=file, path=path, buffer_size=buffer_size)
+        except (GeneratorExit, ProcessingError, ValidationError):
+            raise
+        except BaseException as miss:  # Если не получилось считать файл
+            raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+
     # ------------------------------------------------------------------------------------------------
     # Запись -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
     def write(self, file_data: object, full_path: str, shift_name: bool or None = True,
-              encoding: str = 'utf-8') -> bool or str:
+              encoding: str = 'utf-8',
+              atomic: bool = False,
+              durability: str or SyncGroup = 'none') -> bool or str:
         '''
         Фнукия записывает данные в json файл
 
@@ -96,6 +170,9 @@ class JSON(CommonMethods):
         :param full_path: полное имя файла
         :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
             False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
         :return: True - успешно экспортнуто, имя уникально
             False - отказ от экспорта
             str - успешно экспортнуто, имя изменено
@@ -103,20 +180,25 @@ class JSON(CommonMethods):
         if not full_path.endswith('.json'):
             raise ValidationError("Incorrect file extension. Only '.json' is available.")
 
-        with self.mutex:
+        with self.write_lock(full_path=full_path):
             name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
             if self.check_access(path=full_path):
                 if shift_name is None:
                     return False
                 elif shift_name is True:
-                    full_path = self.name_shifting(full_path=full_path, expansion='.json')
-                    name_shifted = True
+                    shifted_path = self.name_shifting(full_path=full_path, expansion='.json')
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
 
             # пишем
             try:
-                with open(full_path, mode='w', encoding=encoding) as file:
-                    json.dump(file_data, file)
-                    file.flush()
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as writer:
+                    with writer.open(mode='w', encoding=encoding) as file:
+                        file.write(self.codec.dumps(file_data))
+                        file.flush()
             except BaseException as miss:
                 raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
 
@@ -125,5 +207,71 @@ class JSON(CommonMethods):
         else:
             return True
 
+    def write_array(self, iterable: object, full_path: str, shift_name: bool or None = True,
+                    encoding: str = 'utf-8',
+                    chunk_size: int = 10000,
+                    atomic: bool = False,
+                    durability: str or SyncGroup = 'none') -> bool or tuple:
+        '''
+        Функция потоково записывает элементы итерируемого объекта (списка, генератора) в json файл как массив
+            (по элементу на строке). Элементы сериализуются пачками по chunk_size, весь массив в памяти не собирается.
+            Файл читается read_array() или read().
+
+        :param iterable: итерируемый объект с элементами
+        :param full_path: полное имя файла
+        :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
+            False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
+        :param encoding: кодировка
+        :param chunk_size: количество элементов в пачке
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :return: False - отказ от экспорта
+            (status, records, bytes) - status: True - имя уникально, str - имя изменено; records - количество
+            элементов; bytes - количество записанных байт
+        '''
+        if not full_path.endswith('.json'):
+            raise ValidationError("Incorrect file extension. Only '.json' is available.")
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValidationError(f'chunk_size must be positive int. {chunk_size} was passed.')
+
+        with self.write_lock(full_path=full_path):
+            name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
+            if self.check_access(path=full_path):
+                if shift_name is None:
+                    return False
+                elif shift_name is True:
+                    shifted_path = self.name_shifting(full_path=full_path, expansion='.json')
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
 
+            records = 0
+            written = 0
+            # пишем
+            try:
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as writer:
+                    with writer.open(mode='wb') as file:
+                        dumps = self.codec.dumps
+                        iterator = iter(iterable)
+                        separator = '[\n'
+                        while True:
+                            chunk = list(islice(iterator, chunk_size))
+                            if not chunk:
+                                break
+                            block = (separator + ',\n'.join(map(dumps, chunk))).encode(encoding)
+                            separator = ',\n'
+                            file.write(block)
+                            records += len(chunk)
+                            written += len(block)
+                        block = ('[]\n' if not records else '\n]\n').encode(encoding)
+                        file.write(block)
+                        written += len(block)
+                        file.flush()
+
+            except BaseException as miss:
+                raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
 
+        return full_path if name_shifted else True, records, written
@@ -0,0 +1,203 @@
+import json
+import threading
+
+from Exceptions.ExceptionTypes import ValidationError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONCodec:
+    '''
+    Кодек json на стандартной библиотеке - кодек по умолчанию. Базовый класс для быстрых кодеков.
+
+    Быстрые кодеки (orjson, ujson) включаются явно (codec='auto', 'orjson', 'ujson' или set_default_codec()): их
+        вывод НЕ совпадает с json.dumps побайтно, а часть значений они обрабатывают иначе (см. описание кодеков).
+        Общее у всех кодеков:
+        ensure_ascii=True (по умолчанию, как у json.dumps) - не-ASCII символы экранируются (\\uXXXX);
+        ошибка декодирования - ValueError (json.JSONDecodeError).
+
+    Объекты кодеков можно передавать в другие процессы.
+
+    Методы и свойства:
+        name - имя кодека
+
+        ensure_ascii - экранировать ли не-ASCII символы
+
+        dumps() - сериализовать объект в строку
+
+        loads() - десериализовать строку или байты
+    '''
+
+    name = 'json'
+
+    def __init__(self, ensure_ascii: bool = True):
+        '''
+
+        :param ensure_ascii: экранировать ли не-ASCII символы
+        '''
+        self.__ensure_ascii = ensure_ascii
+
+    @property
+    def ensure_ascii(self) -> bool:
+        return self.__ensure_ascii
+
+    def dumps(self, data: object) -> str:
+        return json.dumps(data, ensure_ascii=self.__ensure_ascii)
+
+    def loads(self, data: str or bytes) -> object:
+        return json.loads(data)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(ensure_ascii={self.__ensure_ascii})'
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self.ensure_ascii == other.ensure_ascii
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.ensure_ascii))
+
+
+class OrjsonCodec(JSONCodec):
+    '''
+    Кодек на orjson. Отличия от стандартной библиотеки:
+        разделители без пробелов: {"a":1} вместо {"a": 1} (значения при чтении те же, текст файла - другой);
+        NaN и Infinity записываются как null (данные теряются);
+        datetime, date, time, UUID, dataclass и numpy массивы сериализуются, а не вызывают TypeError;
+        целые больше 64 бит при чтении становятся float (потеря точности).
+    orjson не экранирует не-ASCII символы, поэтому при ensure_ascii=True такие записи сериализуются стандартной
+        библиотекой. Объекты, которые orjson не поддерживает, но поддерживает json (нестроковые ключи словарей, целые
+        больше 64 бит), тоже сериализуются стандартной библиотекой. При декодировании json с NaN/Infinity
+        используется стандартная библиотека.
+    '''
+
+    name = 'orjson'
+
+    def __init__(self, ensure_ascii: bool = True):
+        if orjson is None:
+            raise ValidationError('orjson is not installed.')
+        JSONCodec.__init__(self, ensure_ascii=ensure_ascii)
+
+    def dumps(self, data: object) -> str:
+        try:
+            result = orjson.dumps(data).decode('utf-8')
+        except TypeError:  # orjson.JSONEncodeError
+            return JSONCodec.dumps(self, data)
+        if self.ensure_ascii and not result.isascii():
+            return JSONCodec.dumps(self, data)
+        return result
+
+    def loads(self, data: str or bytes) -> object:
+        try:
+            return orjson.loads(data)
+        except ValueError:  # NaN/Infinity или ошибка - решает стандартная библиотека
+            return json.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    '''
+    Кодек на ujson. Отличия от стандартной библиотеки: разделители без пробелов ({"a":1}), "/" экранируется ("\\/").
+        Объекты, которые ujson не смог сериализовать, сериализуются стандартной библиотекой.
+    '''
+
+    name = 'ujson'
+
+    def __init__(self, ensure_ascii: bool = True):
+        if ujson is None:
+            raise ValidationError('ujson is not installed.')
+        JSONCodec.__init__(self, ensure_ascii=ensure_ascii)
+
+    def dumps(self, data: object) -> str:
+        try:
+            return ujson.dumps(data, ensure_ascii=self.ensure_ascii)
+        except (TypeError, OverflowError):
+            return JSONCodec.dumps(self, data)
+
+    def loads(self, data: str or bytes) -> object:
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+
+codecs_classes = {JSONCodec.name: JSONCodec,
+                  OrjsonCodec.name: OrjsonCodec,
+                  UjsonCodec.name: UjsonCodec}
+
+_default_codec = None
+_default_mutex = threading.Lock()
+
+
+def available_codecs() -> list:
+    '''
+    Функция отдаёт имена доступных кодеков, от быстрого к медленному.
+
+    :return: список имён
+    '''
+    names = []
+    if orjson is not None:
+        names.append(OrjsonCodec.name)
+    if ujson is not None:
+        names.append(UjsonCodec.name)
+    names.append(JSONCodec.name)
+    return names
+
+
+def get_codec(codec: str or JSONCodec = None, ensure_ascii: bool = True) -> JSONCodec:
+    '''
+    Функция отдаёт кодек.
+
+    :param codec: None - кодек по умолчанию (set_default_codec, изначально 'json'); 'auto' - самый быстрый из
+        установленных (с отличиями вывода, см. OrjsonCodec, UjsonCodec);
+        'json', 'orjson', 'ujson' - кодек по имени; объект JSONCodec - он же
+    :param ensure_ascii: экранировать ли не-ASCII символы (для codec, заданного именем)
+    :return: JSONCodec
+    '''
+    if codec is None:
+        return get_default_codec()
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec == 'auto':
+        codec = available_codecs()[0]
+    if codec not in codecs_classes:
+        raise ValidationError(f"codec must be 'auto', one of {tuple(codecs_classes)} or JSONCodec. " +
+                              f'{codec} was passed.')
+    return codecs_classes[codec](ensure_ascii=ensure_ascii)
+
+
+def get_default_codec() -> JSONCodec:
+    '''
+    Функция отдаёт кодек по умолчанию. Если он не задан - стандартная библиотека ('json'): вывод и поведение
+        совпадают с json.dumps/json.loads. Быстрые кодеки включаются явно через set_default_codec().
+
+    :return: JSONCodec
+    '''
+    global _default_codec
+    with _default_mutex:
+        if _default_codec is None:
+            _default_codec = JSONCodec()
+        return _default_codec
+
+
+def set_default_codec(codec: str or JSONCodec, ensure_ascii: bool = True):
+    '''
+    Функция задаёт кодек по умолчанию для всех объектов чтения/записи, у которых кодек не задан явно.
+
+    :param codec: 'auto', 'json', 'orjson', 'ujson' или объект JSONCodec
+    :param ensure_ascii: экранировать ли не-ASCII символы (для codec, заданного именем)
+    :return: ничего
+    '''
+    global _default_codec
+    if codec is None:
+        raise ValidationError('codec must not be None.')
+    codec = get_codec(codec=codec, ensure_ascii=ensure_ascii)
+    with _default_mutex:
+        _default_codec = codec
+    return
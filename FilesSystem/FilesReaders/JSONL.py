@@ -1,7 +1,203 @@
-from .Common import CommonMethods, FileIterator
+from .Common import CommonMethods, FileIterator, FileBatchIterator, split_file_ranges, skip_line
+from .DurableWriting import DurableWriter, SyncGroup
+from .JSONLAppender import JSONLAppender
+from .JSONCodec import JSONCodec, get_codec
+from .FileFollower import FileFollower
+from .Compression import compressed_expansion, open_stream, resolve_compression, strip_compression
 from Exceptions.ExceptionTypes import ProcessingError, ValidationError
 
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from functools import partial
+from itertools import islice
 import json
+import os
+import re
+
+# Строки, у которых в json единственная запись: печатные ASCII символы без '"', '\' и '/'
+_escape_free = re.compile(r'[ !#-.0-\[\]-~]*')
+
+
+def loads_batch(lines: list, codec: JSONCodec = None) -> list:
+    '''
+    Функция декодирует пачку строк jsonl: каждая строка декодируется отдельно, поэтому некорректная строка не может
+        "склеиться" с соседней, а ошибка указывает на строку. Скорость даёт кодек (orjson/ujson).
+
+    :param lines: список строк
+    :param codec: кодек json. None - кодек по умолчанию
+    :return: список объектов
+    '''
+    loads = get_codec(codec=codec).loads
+    return [loads(line) for line in lines]
+
+
+def loads_range(full_path: str, start: int, stop: int, encoding: str = 'utf-8', codec: JSONCodec = None) -> list:
+    '''
+    Функция декодирует диапазон байт [start, stop) jsonl файла. Диапазон должен быть выровнен по границам строк
+        (split_file_ranges). Функция выполняется в процессах пула при параллельном чтении.
+
+    :param full_path: полный путь к файлу
+    :param start: начало диапазона
+    :param stop: конец диапазона
+    :param encoding: кодировка
+    :param codec: кодек json. None - кодек по умолчанию
+    :return: список объектов
+    '''
+    with open(full_path, mode='rb') as file:
+        file.seek(start)
+        data = file.read(stop - start)
+
+    lines = data.decode(encoding).split('\n')
+    if not lines[-1].strip():  # Хвост после последнего '\n'
+        lines.pop()
+    return loads_batch(lines, codec=codec)
+
+
+class RecordsFilter:
+    '''
+    Фильтрация и проекция записей jsonl при чтении.
+
+    Строка сначала проверяется дешёвым поиском подстрок в исходном тексте (префильтр) и декодируется, только если
+        все подстроки найдены. Затем декодированная запись проверяется условием where, и в ней остаются только поля
+        fields.
+
+    Условие where:
+        словарь {ключ: значение} - записи-словари, у которых все ключи верхнего уровня равны значениям (true/false не
+            равны 1/0). Префильтр строится автоматически: true/false/null, целые и строки из печатных ASCII символов
+            без '"', '\\' и '/' ищутся в тексте строки как есть. Строки с остальными символами в префильтр не
+            попадают: в json их можно записать по-разному ("a/b" и "a\\/b", "é" и "\\u00e9");
+        функция func(record)->bool - префильтр задаётся явно параметром prefilter.
+
+    Методы и свойства:
+        check() - префильтр строки
+
+        process() - отбор и проекция декодированной записи
+
+        line() - обработать одну строку
+
+        batch() - обработать пачку строк
+    '''
+
+    def __init__(self, where: dict or object = None,
+                 fields: list or tuple = None,
+                 prefilter: bool or str or tuple = True,
+                 codec: JSONCodec = None):
+        '''
+
+        :param where: условие отбора: словарь {ключ: значение} или функция func(record)->bool. None - без отбора
+        :param fields: ключи верхнего уровня, которые остаются в записях-словарях. None - все
+        :param prefilter: True - префильтр по словарю where; False - без префильтра; строка или кортеж строк -
+            подстроки, которые обязательно есть в исходной строке подходящей записи
+        :param codec: кодек json. None - кодек по умолчанию
+        '''
+        if where is not None and not isinstance(where, dict) and not callable(where):
+            raise ValidationError(f'where must be dict or callable. {type(where)} was passed.')
+        if fields is not None and (isinstance(fields, str) or
+                                   not all(isinstance(field, str) for field in fields)):
+            raise ValidationError(f'fields must be list or tuple of str. {fields} was passed.')
+
+        self.__where = where
+        self.__fields = None if fields is None else tuple(fields)
+        self.__codec = get_codec(codec=codec)
+
+        if prefilter is True:
+            self.__prefilter = self.__build_prefilter(where)
+        elif prefilter is False or prefilter is None:
+            self.__prefilter = ()
+        elif isinstance(prefilter, str):
+            self.__prefilter = ((prefilter,),)
+        else:
+            self.__prefilter = tuple((substring,) for substring in prefilter)
+
+    @staticmethod
+    def __build_prefilter(where: dict or object) -> tuple:
+        '''
+        Префильтр по словарю where: для каждого значения с единственной записью в json - эта запись. В строке должны
+            быть записи всех значений. Строки, которые можно записать с экранированием, пропускаются.
+
+        :param where: условие отбора
+        :return: кортеж кортежей подстрок
+        '''
+        if not isinstance(where, dict):
+            return ()
+
+        prefilter = []
+        for value in where.values():
+            if isinstance(value, str) and _escape_free.fullmatch(value) or value is None or isinstance(value, bool):
+                prefilter.append((json.dumps(value),))
+            elif isinstance(value, int):  # 5 может быть записано и как 5.0 - подстрока "5" есть в обоих
+                prefilter.append((str(value),))
+        return tuple(prefilter)
+
+    def check(self, line: str) -> bool:
+        '''
+        Префильтр строки.
+
+        :param line: исходная строка
+        :return: False - запись точно не подходит; True - запись нужно декодировать и проверить
+        '''
+        for variants in self.__prefilter:
+            for variant in variants:
+                if variant in line:
+                    break
+            else:
+                return False
+        return True
+
+    def process(self, record: object) -> object:
+        '''
+        Проверка условия where и проекция декодированной записи.
+
+        :param record: запись
+        :return: запись или skip_line, если запись не подходит
+        '''
+        where = self.__where
+        if where is not None:
+            if isinstance(where, dict):
+                if not isinstance(record, dict):
+                    return skip_line
+                for key, value in where.items():
+                    if key not in record:
+                        return skip_line
+                    current = record[key]  # true/false не равны 1/0, как в json
+                    if current != value or isinstance(current, bool) != isinstance(value, bool):
+                        return skip_line
+            elif not where(record):
+                return skip_line
+
+        if self.__fields is not None and isinstance(record, dict):
+            record = {field: record[field] for field in self.__fields if field in record}
+        return record
+
+    def line(self, line: str) -> object:
+        '''
+        Обработка одной строки.
+
+        :param line: исходная строка
+        :return: запись или skip_line, если запись не подходит
+        '''
+        if not self.check(line):
+            return skip_line
+        return self.process(self.__codec.loads(line))
+
+    def batch(self, lines: list) -> list:
+        '''
+        Обработка пачки строк: префильтр, декодирование оставшихся строк (loads_batch), отбор и проекция.
+
+        :param lines: исходные строки
+        :return: список подходящих записей
+        '''
+        if self.__prefilter:
+            lines = [line for line in lines if self.check(line)]
+        if not lines:
+            return []
+
+        result = []
+        for record in loads_batch(lines, codec=self.__codec):
+            record = self.process(record)
+            if record is not skip_line:
+                result.append(record)
+        return result
 
 
 class JSONL(CommonMethods):
@@ -23,6 +219,11 @@ class JSONL(CommonMethods):
 
             get_encoding() - получить кодировку файла
 
+        Индекс строк
+            get_lines_index() - получить индекс смещений строк файла
+
+            get_lines_count() - получить количество строк файла
+
         Настройки считывания
             save_loaded - сохранять ли считанные файлы?
 
@@ -30,30 +231,63 @@ class JSONL(CommonMethods):
 
             _reset_loaded - обновить словарь сохранённых файлов
 
+            codec - кодек json (JSONCodec)
+
         Чтение - запись
             read() - чтение
 
             read_by_lines() - возвращает итерратор для чтения по строкам
 
+            read_parallel() - параллельное чтение в нескольких процессах
+
+            read_chunks() - параллельное чтение с выдачей результата частями
+
             write() - запись
 
             write_line() - добавить строку
+
+            write_lines() - потоковая запись записей из итерируемого объекта
+
+            appender() - долгоживущий объект для частого добавления строк
+
+            follower() - чтение новых строк растущего файла
     '''
 
-    def __init__(self, save_loaded: bool = False):
+    def __init__(self, save_loaded: bool = False,
+                 loaded_max_bytes: int or None = 256 << 20,
+                 codec: str or JSONCodec = None):
         '''
 
         :param save_loaded: сохоанять ли считанные файлы?
+        :param loaded_max_bytes: бюджет памяти для сохранённых файлов в байтах. None - без ограничения
+        :param codec: кодек json: None - кодек по умолчанию (JSONCodec.set_default_codec, изначально 'json'),
+            'auto', 'json', 'orjson', 'ujson' или объект JSONCodec. Быстрые кодеки меняют вывод (см. JSONCodec)
         '''
 
         # Выполним стандартный init
-        CommonMethods.__init__(self, save_loaded=save_loaded)
+        CommonMethods.__init__(self, save_loaded=save_loaded, loaded_max_bytes=loaded_max_bytes)
+
+        self.__codec = None if codec is None else get_codec(codec=codec)
+
+    @property
+    def codec(self) -> JSONCodec:
+        return get_codec(codec=self.__codec)
+
+    @codec.setter
+    def codec(self, value: str or JSONCodec or None):
+        self.__codec = None if value is None else get_codec(codec=value)
 
     # ------------------------------------------------------------------------------------------------
     # Чтение -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
     def read(self, full_path: str, save_loaded: bool = None,
-             encoding: str = 'utf-8') -> object:
+             encoding: str = 'utf-8',
+             compression: str or None = 'infer',
+             check_magic: bool = False,
+             background: bool = False,
+             fields: list or tuple = None,
+             where: dict or object = None,
+             prefilter: bool or str or tuple = True) -> object:
         '''
         Функция считывания jsonl файла
 
@@ -61,37 +295,78 @@ class JSONL(CommonMethods):
         :param save_loaded: сохранить ли загруженный файл? True - да, False - нет, None - использовать стандартную
             настройку (save_loaded)
         :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'
+        :param check_magic: при compression='infer' определять сжатие файла без суффикса по сигнатуре в первых байтах
+            (например, gzip в файле без ".gz")
+        :param background: распаковывать сжатый файл в отдельном потоке
+        :param fields: ключи верхнего уровня, которые останутся в записях. None - все (RecordsFilter)
+        :param where: условие отбора записей: словарь {ключ: значение} или функция func(record)->bool. Неподходящие
+            строки по возможности отбрасываются до декодирования (RecordsFilter)
+        :param prefilter: префильтр строк до декодирования: True - по словарю where, False - без префильтра, строка
+            или кортеж строк - обязательные подстроки
         :return: считанный файл в виде JSON объекта
         '''
-        if not full_path.endswith('.jsonl'):
-            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+        if not strip_compression(full_path).endswith('.jsonl'):
+            raise ValidationError("Incorrect file extension. Only '.jsonl' (also '.jsonl.gz', '.jsonl.xz', " +
+                                  "'.jsonl.bz2') is available.")
+
+        records_filter = None
+        if fields is not None or where is not None:
+            records_filter = RecordsFilter(where=where, fields=fields, prefilter=prefilter, codec=self.codec)
 
-        with self.mutex:
+        read_tag = ('read', encoding, fields, where, prefilter)  # параметры чтения для кэша loaded
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
+
+        with self.read_lock(full_path=full_path):
+            state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
             if not self.check_access(path=full_path):
                 raise ProcessingError('No access to file')
 
+            compression = resolve_compression(full_path=full_path, compression=compression, check_magic=check_magic)
+
             # определим кодировку файла
             if encoding is None:
-                encoding = self.get_encoding(full_path=full_path)
+                encoding = self.get_encoding(full_path=full_path, compression=compression)
 
             # читаем
+            loads = self.codec.loads
             try:
-                with open(full_path, mode='r', encoding=encoding) as file:
+                with open_stream(full_path, mode='r', encoding=encoding, compression=compression,
+                                 background=background) as file:
                     result = []
-                    for data_string in file:
-                        result.append(json.loads(data_string))
+                    if records_filter is not None:
+                        for lines in iter(lambda: file.readlines(1 << 20), []):
+                            result.extend(records_filter.batch(lines))
+                    else:
+                        for data_string in file:
+                            result.append(loads(data_string))
             except BaseException as miss:  # Если не получилось считать файл
                 raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
 
         if (save_loaded is None and self.save_loaded) or save_loaded is True:
             self._ad_loaded(full_path=full_path,
-                            data=result)
+                            data=result,
+                            tag=read_tag,
+                            state=state)
 
         return result
 
     def read_by_lines(self, full_path: str,
                       encoding: str = 'utf-8',
-                      start: int = 0, stop: int = None) -> FileIterator:
+                      start: int = 0, stop: int = None,
+                      use_index: bool = False,
+                      batch_size: int = None,
+                      compression: str or None = 'infer',
+                      check_magic: bool = False,
+                      background: bool = False,
+                      fields: list or tuple = None,
+                      where: dict or object = None,
+                      prefilter: bool or str or tuple = True) -> FileIterator or FileBatchIterator:
         '''
         Функция отдаёт иттератор для чтения по строкам.
 
@@ -99,28 +374,200 @@ class JSONL(CommonMethods):
         :param encoding: строка, явно указывающая кодировку или None для её автоопределения
         :param start: первая строка
         :param stop: последняя строка. None - читать до конца.
-        :return: итератор по строкам FileIterator
+        :param use_index: использовать индекс строк (LinesIndex): чтение начнётся сразу со строки start, а
+            количество строк не будет пересчитываться. Индекс строится при первом обращении и хранится рядом с файлом.
+        :param batch_size: размер пачки строк. None - итератор отдаёт по одной строке (FileIterator), иначе - списки
+            из batch_size строк (FileBatchIterator).
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'. Сжатый файл читается потоково, use_index для него недоступен.
+        :param check_magic: при compression='infer' определять сжатие файла без суффикса по сигнатуре в первых байтах
+            (например, gzip в файле без ".gz")
+        :param background: распаковывать сжатый файл в отдельном потоке
+        :param fields: ключи верхнего уровня, которые останутся в записях. None - все (RecordsFilter)
+        :param where: условие отбора записей: словарь {ключ: значение} или функция func(record)->bool. Неподходящие
+            записи пропускаются, start и stop считаются по строкам файла (RecordsFilter)
+        :param prefilter: префильтр строк до декодирования: True - по словарю where, False - без префильтра, строка
+            или кортеж строк - обязательные подстроки
+        :return: итератор по строкам FileIterator или по пачкам строк FileBatchIterator
         '''
-        if not full_path.endswith('.jsonl'):
-            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+        if not strip_compression(full_path).endswith('.jsonl'):
+            raise ValidationError("Incorrect file extension. Only '.jsonl' (also '.jsonl.gz', '.jsonl.xz', " +
+                                  "'.jsonl.bz2') is available.")
 
-        with self.mutex:
+        with self.read_lock(full_path=full_path):
             if not self.check_access(path=full_path):
                 raise ProcessingError('No access to file')
 
+            if use_index and compression is not None:
+                raise ValidationError('Lines index is not available for compressed files.')
+
+            compression = resolve_compression(full_path=full_path, compression=compression, check_magic=check_magic)
+
             # определим кодировку файла
             if encoding is None:
-                encoding = self.get_encoding(full_path=full_path)
+                encoding = self.get_encoding(full_path=full_path, compression=compression)
+
+            lines_index = self.get_lines_index(full_path=full_path) if use_index else None
+
+            records_filter = None
+            if fields is not None or where is not None:
+                records_filter = RecordsFilter(where=where, fields=fields, prefilter=prefilter, codec=self.codec)
+
+            if batch_size is not None:
+                return FileBatchIterator(full_path=full_path, batch_size=batch_size, encoding=encoding,
+                                         start=start, stop=stop,
+                                         post_process_function=partial(loads_batch, codec=self.codec)
+                                         if records_filter is None else records_filter.batch,
+                                         lines_index=lines_index,
+                                         compression=compression, background=background)
 
             return FileIterator(full_path=full_path, encoding=encoding,
                                 start=start, stop=stop,
-                                post_process_function=json.loads)
+                                post_process_function=self.codec.loads
+                                if records_filter is None else records_filter.line,
+                                lines_index=lines_index,
+                                compression=compression, background=background)
+
+    def read_parallel(self, full_path: str, save_loaded: bool = None,
+                      encoding: str = 'utf-8',
+                      max_workers: int = None,
+                      chunk_size: int = 64 << 20) -> list:
+        '''
+        Функция параллельного считывания jsonl файла: файл делится на диапазоны байт по границам строк, каждый
+            диапазон декодируется в отдельном процессе, результаты собираются в исходном порядке.
+
+        :param full_path: полный путь к файлу
+        :param save_loaded: сохранить ли загруженный файл? True - да, False - нет, None - использовать стандартную
+            настройку (save_loaded)
+        :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param max_workers: количество процессов. None - по количеству ядер
+        :param chunk_size: примерный размер диапазона в байтах
+        :return: считанный файл в виде списка JSON объектов
+        '''
+        read_tag = ('read', encoding)  # параметры чтения для кэша loaded
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
+
+        state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
+        result = []
+        for chunk in self.read_chunks(full_path=full_path, encoding=encoding,
+                                      max_workers=max_workers, chunk_size=chunk_size):
+            result.extend(chunk)
+
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            self._ad_loaded(full_path=full_path,
+                            data=result,
+                            tag=read_tag,
+                            state=state)
+
+        return result
+
+    def read_chunks(self, full_path: str,
+                    encoding: str = 'utf-8',
+                    max_workers: int = None,
+                    chunk_size: int = 64 << 20):
+        '''
+        Генератор параллельного считывания jsonl файла: отдаёт списки объектов по диапазонам файла в исходном порядке.
+            Одновременно в работе находится не более 2 * max_workers диапазонов, поэтому память ограничена.
+            Сжатый файл нельзя разделить на диапазоны: он распаковывается потоково в текущем процессе, а части
+            примерно по chunk_size байт декодируются пачками.
+
+        :param full_path: полный путь к файлу
+        :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param max_workers: количество процессов. None - по количеству ядер
+        :param chunk_size: примерный размер диапазона в байтах
+        :return: генератор списков JSON объектов
+        '''
+        if not strip_compression(full_path).endswith('.jsonl'):
+            raise ValidationError("Incorrect file extension. Only '.jsonl' (also '.jsonl.gz', '.jsonl.xz', " +
+                                  "'.jsonl.bz2') is available.")
+
+        with self.read_lock(full_path=full_path):
+            if not self.check_access(path=full_path):
+                raise ProcessingError('No access to file')
+
+            # определим кодировку файла
+            if encoding is None:
+                encoding = self.get_encoding(full_path=full_path)
+
+            compression = resolve_compression(full_path=full_path, compression='infer')
+            if compression is None:
+                ranges = split_file_ranges(full_path=full_path, chunk_size=chunk_size)
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        codec = self.codec
+
+        try:
+            if compression is not None:
+                with open_stream(full_path, mode='r', encoding=encoding, compression=compression,
+                                 background=max_workers > 1) as file:
+                    while True:
+                        lines = file.readlines(chunk_size)
+                        if not lines:
+                            return
+                        yield loads_batch(lines, codec=codec)
+
+            if len(ranges) < 2 or max_workers < 2:  # Процессы не нужны
+                for start, stop in ranges:
+                    yield loads_range(full_path, start, stop, encoding, codec)
+                return
+
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(ranges))) as executor:
+                pending = deque()
+                ranges = iter(ranges)
+                for start, stop in ranges:
+                    pending.append(executor.submit(loads_range, full_path, start, stop, encoding, codec))
+                    if len(pending) >= 2 * max_workers:
+                        break
+
+                while pending:
+                    chunk = pending.popleft().result()
+                    for start, stop in ranges:  # Подкинем следующий диапазон
+                        pending.append(executor.submit(loads_range, full_path, start, stop, encoding, codec))
+                        break
+                    yield chunk
+
+        except GeneratorExit:
+            raise
+        except BaseException as miss:  # Если не получилось считать файл
+            raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+
+    def follower(self, full_path: str,
+                 encoding: str = 'utf-8',
+                 checkpoint_path: str = None,
+                 start: str = 'begin') -> FileFollower:
+        '''
+        Функция отдаёт объект для чтения растущего файла (FileFollower): он запоминает смещение, отдаёт только новые
+            полностью дописанные записи (JSON объекты), отслеживает усечение и ротацию файла и может сохранять контрольную
+            точку, чтобы после перезапуска продолжить с того же места.
+            Пример: for line in reader.follower(path, checkpoint_path=path + '.offset').follow(): ...
+
+        :param full_path: полный путь к файлу
+        :param encoding: кодировка (совместимая с ASCII)
+        :param checkpoint_path: путь к файлу контрольной точки. None - позиция не сохраняется
+        :param start: откуда читать, если контрольной точки нет: 'begin' - с начала файла, 'end' - только новые
+            строки
+        :return: FileFollower
+        '''
+        if not full_path.endswith('.jsonl'):
+            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+
+        return FileFollower(full_path=full_path, encoding=encoding,
+                            checkpoint_path=checkpoint_path, start=start,
+                            post_process_function=self.codec.loads)
 
     # ------------------------------------------------------------------------------------------------
     # Запись -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
     def write(self, file_data: object, full_path: str, shift_name: bool or None = True,
-              encoding: str = 'utf-8') -> bool or str:
+              encoding: str = 'utf-8',
+              atomic: bool = False,
+              durability: str or SyncGroup = 'none',
+              compression: str or None = 'infer') -> bool or str:
         '''
         Фнукия записывает данные в файл jsonl
 
@@ -129,28 +576,42 @@ class JSONL(CommonMethods):
         :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
             False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
         :param encoding: кодировка
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"), None - без сжатия, 'gz',
+            'xz', 'bz2'
         :return: True - успешно экспортнуто, имя уникально
             False - отказ от экспорта
             str - успешно экспортнуто, имя изменено
         '''
-        if not full_path.endswith('.jsonl'):
-            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+        if not strip_compression(full_path).endswith('.jsonl'):
+            raise ValidationError("Incorrect file extension. Only '.jsonl' (also '.jsonl.gz', '.jsonl.xz', " +
+                                  "'.jsonl.bz2') is available.")
 
-        with self.mutex:
+        compression = resolve_compression(full_path=full_path, compression=compression)
+
+        with self.write_lock(full_path=full_path):
             name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
             if self.check_access(path=full_path):  # если есть файл и мы не дописываем в конец
                 if shift_name is None:
                     return False
                 elif shift_name is True:
-                    full_path = self.name_shifting(full_path=full_path, expansion='.json')
-                    name_shifted = True
+                    shifted_path = self.name_shifting(full_path=full_path,
+                                                      expansion=compressed_expansion(full_path, '.jsonl'))
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
 
             # пишем
             try:
-                with open(full_path, mode='w', encoding=encoding) as file:
-                    json.dump(file_data, file)
-                    file.write('\n')
-                    file.flush()
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as writer:
+                    with open_stream(writer.path, mode='w', encoding=encoding, compression=compression) as file:
+                        file.write(self.codec.dumps(file_data))
+                        file.write('\n')
+                        file.flush()
 
             except BaseException as miss:
                 raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
@@ -160,28 +621,132 @@ class JSONL(CommonMethods):
         else:
             return True
 
+    def write_lines(self, iterable: object, full_path: str, shift_name: bool or None = True,
+                    encoding: str = 'utf-8',
+                    chunk_size: int = 10000,
+                    atomic: bool = False,
+                    durability: str or SyncGroup = 'none',
+                    compression: str or None = 'infer') -> bool or tuple:
+        '''
+        Функция потоково записывает записи из итерируемого объекта (списка, генератора) в файл jsonl: каждая запись -
+            отдельная строка. Записи сериализуются пачками по chunk_size и пишутся одним блоком, весь набор записей в
+            памяти не собирается.
+
+        :param iterable: итерируемый объект с записями
+        :param full_path: полное имя файла
+        :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
+            False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
+        :param encoding: кодировка
+        :param chunk_size: количество записей в пачке
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"), None - без сжатия, 'gz',
+            'xz', 'bz2'
+        :return: False - отказ от экспорта
+            (status, records, bytes) - status: True - имя уникально, str - имя изменено; records - количество записей;
+            bytes - количество записанных байт (до сжатия)
+        '''
+        if not strip_compression(full_path).endswith('.jsonl'):
+            raise ValidationError("Incorrect file extension. Only '.jsonl' (also '.jsonl.gz', '.jsonl.xz', " +
+                                  "'.jsonl.bz2') is available.")
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValidationError(f'chunk_size must be positive int. {chunk_size} was passed.')
+
+        compression = resolve_compression(full_path=full_path, compression=compression)
+
+        with self.write_lock(full_path=full_path):
+            name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
+            if self.check_access(path=full_path):  # если есть файл
+                if shift_name is None:
+                    return False
+                elif shift_name is True:
+                    shifted_path = self.name_shifting(full_path=full_path,
+                                                      expansion=compressed_expansion(full_path, '.jsonl'))
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
+
+            records = 0
+            written = 0
+            # пишем
+            try:
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as writer:
+                    with open_stream(writer.path, mode='wb', compression=compression) as file:
+                        dumps = self.codec.dumps
+                        iterator = iter(iterable)
+                        while True:
+                            chunk = list(islice(iterator, chunk_size))
+                            if not chunk:
+                                break
+                            block = ('\n'.join(map(dumps, chunk)) + '\n').encode(encoding)
+                            file.write(block)
+                            records += len(chunk)
+                            written += len(block)
+                        file.flush()
+
+            except BaseException as miss:
+                raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+
+        return full_path if name_shifted else True, records, written
+
     def write_line(self, file_data: object, full_path: str,
-                   encoding: str = 'utf-8'):
+                   encoding: str = 'utf-8',
+                   compression: str or None = 'infer'):
         '''
         Фнукия записывает строку в файл. Если файл отсутствовал, он будет создан.
+        В сжатый файл каждый вызов дописывает отдельный сжатый блок (gzip member, xz/bz2 stream): файл остаётся
+            корректным, но при частой записи лучше использовать appender().
 
         :param file_data: данные для экспорта в файл
         :param full_path: полное имя файла
         :param encoding: кодировка
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'
         :return:
         '''
-        if not full_path.endswith('.jsonl'):
-            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+        if not strip_compression(full_path).endswith('.jsonl'):
+            raise ValidationError("Incorrect file extension. Only '.jsonl' (also '.jsonl.gz', '.jsonl.xz', " +
+                                  "'.jsonl.bz2') is available.")
 
-        with self.mutex:
+        with self.write_lock(full_path=full_path):
             # пишем
             try:
-                with open(full_path, mode='a', encoding=encoding) as file:  # Делаем экспорт
-                    json.dump(file_data, file)
-                    file.write('\n')
+                with open_stream(full_path, mode='a', encoding=encoding, compression=compression) as file:
+                    file.write(self.codec.dumps(file_data) + '\n')
                     file.flush()
 
             except BaseException as miss:
                 raise ProcessingError(f'Line export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
 
-        return
\ No newline at end of file
+        return
+
+    def appender(self, full_path: str,
+                 encoding: str = 'utf-8',
+                 flush_bytes: int = 1 << 20,
+                 flush_interval: float = 1.0,
+                 max_queue: int = 100000,
+                 compression: str or None = 'infer') -> JSONLAppender:
+        '''
+        Функция отдаёт долгоживущий объект для добавления строк в файл (JSONLAppender): файл открывается один раз,
+            записи из разных потоков собираются в большие блоки. Подходит вместо write_line() при большом потоке
+            записей. Объект нужно закрыть (close() или with).
+
+        :param full_path: полное имя файла. Если файл отсутствовал, он будет создан.
+        :param encoding: кодировка
+        :param flush_bytes: сбрасывать буфер на диск после стольких записанных байт
+        :param flush_interval: сбрасывать буфер на диск не реже, чем раз в столько секунд
+        :param max_queue: максимальное количество записей в очереди
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'
+        :return: JSONLAppender
+        '''
+        if not strip_compression(full_path).endswith('.jsonl'):
+            raise ValidationError("Incorrect file extension. Only '.jsonl' (also '.jsonl.gz', '.jsonl.xz', " +
+                                  "'.jsonl.bz2') is available.")
+
+        return JSONLAppender(full_path=full_path, encoding=encoding,
+                             flush_bytes=flush_bytes, flush_interval=flush_interval, max_queue=max_queue,
+                             path_locks=self.path_locks, codec=self.codec, compression=compression)
@@ -0,0 +1,238 @@
+import atexit
+import queue
+import threading
+import time
+
+from .Compression import open_stream
+from .JSONCodec import JSONCodec, get_codec
+from .PathLocks import PathLocks, default_path_locks
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+
+class JSONLAppender:
+    '''
+    Долгоживущий "дописыватель" jsonl файла для большого потока записей (group commit).
+
+    Файл открывается один раз. Потоки-источники отдают записи в submit(): запись сразу сериализуется (поэтому её
+        можно менять после вызова) и попадает в очередь. Поток-писатель забирает из очереди всё накопленное, пишет
+        одним блоком и сбрасывает буфер на диск (flush), когда накопилось flush_bytes байт или прошло
+        flush_interval секунд с прошлого сброса.
+
+    Очередь ограничена max_queue записями: при переполнении submit() ждёт (обратное давление). Ошибка записи
+        запоминается и вызывается при следующем submit(), flush() или close().
+
+    Незакрытый "дописыватель" закрывается при завершении интерпретатора (atexit): остаток очереди записывается.
+        При аварийном завершении процесса (os._exit, сигнал) записи из очереди теряются, поэтому close() лучше
+        вызывать явно.
+
+    Методы и свойства:
+        full_path - путь к файлу
+
+        queue_depth - количество записей в очереди
+
+        written - количество записанных записей
+
+        submit() - добавить запись
+
+        flush() - дождаться записи всех отданных записей и сбросить буфер
+
+        close() - записать остаток и закрыть файл
+    '''
+
+    __close_marker = object()
+
+    def __init__(self, full_path: str,
+                 encoding: str = 'utf-8',
+                 flush_bytes: int = 1 << 20,
+                 flush_interval: float = 1.0,
+                 max_queue: int = 100000,
+                 path_locks: PathLocks = None,
+                 codec: str or JSONCodec = None,
+                 compression: str or None = 'infer'):
+        '''
+
+        :param full_path: полный путь к файлу. Если файла нет, он будет создан.
+        :param encoding: кодировка
+        :param flush_bytes: сбрасывать буфер на диск после стольких записанных байт
+        :param flush_interval: сбрасывать буфер на диск не реже, чем раз в столько секунд
+        :param max_queue: максимальное количество записей в очереди
+        :param path_locks: блокировки файлов. None - общие блокировки объектов чтения/записи
+        :param codec: кодек json. None - кодек по умолчанию
+        :param compression: сжатие файла: 'infer' - по суффиксу, None - без сжатия, 'gz',
+            'xz', 'bz2'. В сжатый файл сессия дописывает один сжатый блок, flush() сбрасывает и сжатый поток.
+        '''
+        if flush_bytes < 1 or flush_interval <= 0 or max_queue < 1:
+            raise ValidationError('flush_bytes, flush_interval and max_queue must be positive.')
+
+        self.__full_path = full_path
+        self.__encoding = encoding
+        self.__flush_bytes = flush_bytes
+        self.__flush_interval = flush_interval
+        self.__path_locks = default_path_locks if path_locks is None else path_locks
+        self.__dumps = get_codec(codec=codec).dumps
+
+        self.__queue = queue.Queue(maxsize=max_queue)
+        self.__closed = False
+        self.__error = None
+        self.__written = 0
+        self.__mutex = threading.Lock()
+
+        try:
+            self.__file = open_stream(full_path, mode='a', encoding=encoding, compression=compression,
+                                      buffer_size=flush_bytes)
+        except BaseException as miss:
+            raise ProcessingError(f'Appender opening failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+
+        self.__thread = threading.Thread(target=self.__work, name=f'JSONLAppender({full_path})', daemon=True)
+        self.__thread.start()
+        atexit.register(self.close)  # Поток-писатель - демон: без close() очередь пропала бы при выходе
+
+    # ------------------------------------------------------------------------------------------------
+    # Свойства ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @property
+    def full_path(self) -> str:
+        return self.__full_path
+
+    @property
+    def queue_depth(self) -> int:
+        return self.__queue.qsize()
+
+    @property
+    def written(self) -> int:
+        return self.__written
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    # ------------------------------------------------------------------------------------------------
+    # Запись -----------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def submit(self, file_data: object):
+        '''
+        Добавление записи в очередь.
+
+        :param file_data: данные для экспорта в файл
+        :return: ничего
+        '''
+        self.__check()
+        try:
+            line = self.__dumps(file_data) + '\n'
+        except BaseException as miss:
+            raise ProcessingError('Record serialization failed.') from miss
+        # Проверка и постановка в очередь атомарны относительно close(): после маркера закрытия в очереди ничего не
+        # окажется. Поток-писатель разбирает очередь без мьютекса, поэтому ожидание места в очереди не блокирует его.
+        with self.__mutex:
+            self.__check()
+            self.__queue.put(line)
+        return
+
+    def flush(self, timeout: float = None):
+        '''
+        Ожидание записи всех отданных до вызова записей и сброс буфера на диск.
+
+        :param timeout: максимальное время ожидания в секундах. None - без ограничения
+        :return: ничего
+        '''
+        done = threading.Event()
+        with self.__mutex:
+            self.__check()
+            self.__queue.put(done)
+        if not done.wait(timeout):
+            raise ProcessingError(f'Appender flush timeout.\nfull_path: {self.__full_path}')
+        self.__check()
+        return
+
+    def close(self):
+        '''
+        Запись остатка очереди и закрытие файла. Повторный вызов ничего не делает.
+
+        :return: ничего
+        '''
+        with self.__mutex:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__queue.put(self.__close_marker)
+        atexit.unregister(self.close)
+
+        self.__thread.join()
+        if self.__error is not None:
+            raise ProcessingError(f'Line export failed.\nfull_path: {self.__full_path}') from self.__error
+        return
+
+    def __check(self):
+        if self.__error is not None:
+            raise ProcessingError(f'Line export failed.\nfull_path: {self.__full_path}') from self.__error
+        if self.__closed:
+            raise ProcessingError(f'Appender is closed.\nfull_path: {self.__full_path}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ------------------------------------------------------------------------------------------------
+    # Поток-писатель ---------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def __work(self):
+        '''
+        Цикл потока-писателя: забирает из очереди всё накопленное и пишет одним блоком.
+
+        :return: ничего
+        '''
+        unflushed = 0  # байт записано с прошлого сброса
+        last_flush = time.monotonic()
+        running = True
+
+        while running:
+            timeout = max(0.0, self.__flush_interval - (time.monotonic() - last_flush))
+            try:
+                items = [self.__queue.get(timeout=timeout if unflushed else None)]
+            except queue.Empty:
+                items = []
+
+            while True:  # Заберём всё, что накопилось
+                try:
+                    items.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            events = []
+            for item in items:
+                if isinstance(item, str):
+                    lines.append(item)
+                elif item is self.__close_marker:
+                    running = False
+                else:
+                    events.append(item)
+
+            try:
+                if lines and self.__error is None:
+                    block = ''.join(lines)
+                    with self.__path_locks.write(full_path=self.__full_path):
+                        self.__file.write(block)
+                    self.__written += len(lines)
+                    unflushed += len(block)
+
+                if unflushed and (events or not running or unflushed >= self.__flush_bytes or
+                                  time.monotonic() - last_flush >= self.__flush_interval):
+                    with self.__path_locks.write(full_path=self.__full_path):
+                        self.__file.flush()
+                    unflushed = 0
+                    last_flush = time.monotonic()
+            except BaseException as miss:
+                self.__error = miss
+            finally:
+                for event in events:
+                    event.set()
+
+        try:
+            self.__file.close()
+        except BaseException as miss:
+            if self.__error is None:
+                self.__error = miss
+        return
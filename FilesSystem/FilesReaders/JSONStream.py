@@ -0,0 +1,210 @@
+import json
+import re
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+_structure = re.compile(r'["\[\]{}]')  # Символы, меняющие вложенность, и начало строки
+_string_end = re.compile(r'["\\]')
+
+
+class JSONArrayStream:
+    '''
+    Потоковый разбор большого json массива: элементы массива верхнего уровня (или массива по пути path)
+        декодируются по одному из скользящего буфера фиксированного размера, поэтому память не зависит от размера
+        файла, а определяется размером одного элемента.
+
+    Элементы декодируются json.JSONDecoder.raw_decode. Значения вне пути (соседние ключи объектов) не
+        декодируются, а пропускаются сканированием скобок.
+
+    Методы и свойства:
+        path - путь к массиву
+
+        elements - количество отданных элементов
+
+        __iter__() - итератор по элементам
+    '''
+
+    def __init__(self, file: object,
+                 path: str or list or tuple = None,
+                 buffer_size: int = 1 << 16):
+        '''
+
+        :param file: файл, открытый в текстовом режиме
+        :param path: путь к массиву: None - массив верхнего уровня; строка "data.items" или список ключей
+            ["data", "items"] - массив внутри вложенных объектов
+        :param buffer_size: размер блока чтения в символах
+        '''
+        if buffer_size < 1:
+            raise ValidationError(f'buffer_size must be positive int. {buffer_size} was passed.')
+        if path is None:
+            path = ()
+        elif isinstance(path, str):
+            path = tuple(path.split('.')) if path else ()
+        else:
+            path = tuple(path)
+
+        self.__file = file
+        self.__path = path
+        self.__buffer_size = buffer_size
+        self.__decoder = json.JSONDecoder()
+
+        self.__buffer = ''
+        self.__position = 0
+        self.__eof = False
+        self.__elements = 0
+
+    @property
+    def path(self) -> tuple:
+        return self.__path
+
+    @property
+    def elements(self) -> int:
+        return self.__elements
+
+    # ------------------------------------------------------------------------------------------------
+    # Буфер ------------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def __fill(self, size: int = None) -> bool:
+        '''
+        Дочитывание блока в буфер. Прочитанная часть буфера отбрасывается.
+
+        :param size: сколько символов дочитать. None - buffer_size
+        :return: False - файл закончился
+        '''
+        if self.__eof:
+            return False
+        block = self.__file.read(size or self.__buffer_size)
+        self.__buffer = self.__buffer[self.__position:] + block
+        self.__position = 0
+        if not block:
+            self.__eof = True
+            return False
+        return True
+
+    def __peek(self) -> str:
+        '''
+        Пропуск пробелов и просмотр следующего символа.
+
+        :return: символ или '' - конец файла
+        '''
+        while True:
+            self.__position = _whitespace.match(self.__buffer, self.__position).end()
+            if self.__position < len(self.__buffer):
+                return self.__buffer[self.__position]
+            if not self.__fill():
+                return ''
+
+    def __expect(self, characters: str) -> str:
+        character = self.__peek()
+        if not character or character not in characters:
+            raise ProcessingError(f'JSON array parsing failed: expected one of {characters!r}, got {character!r} ' +
+                                  f'after {self.__elements} elements.')
+        self.__position += 1
+        return character
+
+    def __decode(self) -> object:
+        '''
+        Декодирование значения с текущей позиции. Если значение не помещается в буфер (или может продолжаться за
+            его концом, как число), буфер увеличивается.
+
+        :return: значение
+        '''
+        self.__peek()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+                if end < len(self.__buffer) or self.__eof:
+                    self.__position = end
+                    return value
+            except ValueError as miss:
+                if self.__eof:
+                    raise ProcessingError(f'JSON array parsing failed after {self.__elements} elements.') from miss
+            self.__fill(max(self.__buffer_size, len(self.__buffer) - self.__position))
+
+    def __skip(self):
+        '''
+        Пропуск значения без декодирования: для объектов и массивов сканируются скобки с учётом строк.
+
+        :return: ничего
+        '''
+        if self.__peek() not in ('{', '['):
+            self.__decode()  # Скаляр - небольшой
+            return
+
+        depth = 0
+        while True:
+            match = _structure.search(self.__buffer, self.__position)
+            if match is None:
+                self.__position = len(self.__buffer)
+                if not self.__fill():
+                    raise ProcessingError('JSON array parsing failed: unexpected end of file.')
+                continue
+
+            self.__position = match.end()
+            character = match.group()
+            if character == '"':
+                self.__skip_string()
+            elif character in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def __skip_string(self):
+        '''
+        Пропуск строки (позиция - сразу после открывающей кавычки).
+
+        :return: ничего
+        '''
+        while True:
+            match = _string_end.search(self.__buffer, self.__position)
+            if match is None or (match.group() == '\\' and match.end() >= len(self.__buffer)):
+                if match is None:
+                    self.__position = len(self.__buffer)
+                if not self.__fill():
+                    raise ProcessingError('JSON array parsing failed: unexpected end of file.')
+                continue
+
+            if match.group() == '"':
+                self.__position = match.end()
+                return
+            self.__position = match.end() + 1  # Экранированный символ
+
+    # ------------------------------------------------------------------------------------------------
+    # Разбор -----------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def __descend(self):
+        '''
+        Переход к массиву по пути path.
+
+        :return: ничего
+        '''
+        for key in self.__path:
+            self.__expect('{')
+            while True:
+                if self.__peek() == '}':
+                    raise ProcessingError(f'JSON array parsing failed: key {key!r} of path {self.__path} not found.')
+                name = self.__decode()
+                self.__expect(':')
+                if name == key:
+                    break
+                self.__skip()
+                if self.__expect(',}') == '}':
+                    raise ProcessingError(f'JSON array parsing failed: key {key!r} of path {self.__path} not found.')
+        self.__expect('[')
+
+    def __iter__(self):
+        self.__descend()
+
+        if self.__peek() == ']':
+            self.__position += 1
+            return
+
+        while True:
+            value = self.__decode()
+            self.__elements += 1
+            yield value
+            if self.__expect(',]') == ']':
+                return
@@ -0,0 +1,158 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+
+class LinesCounter:
+    '''
+    Движок подсчёта строк в файле. Файл читается в бинарном режиме крупными блоками, в каждом блоке считается
+        количество b'\\n' без декодирования текста. Большие файлы делятся на диапазоны, которые считаются в нескольких
+        потоках (чтение с диска в потоках выполняется параллельно). Результаты кэшируются по
+        (устройство, inode, размер, mtime), поэтому повторный подсчёт для неизменённого файла не читает его.
+
+    Последняя строка без завершающего '\\n' тоже считается строкой, то есть результат совпадает с количеством строк,
+        которое отдаёт итерация по текстовому файлу (для кодировок, совместимых с ASCII).
+
+    Методы и свойства:
+        chunk_size - размер блока чтения
+
+        workers - количество потоков для больших файлов
+
+        parallel_threshold - размер файла, начиная с которого подсчёт идёт в несколько потоков
+
+        count() - посчитать строки
+
+        reset_cache() - сбросить кэш
+    '''
+
+    def __init__(self,
+                 chunk_size: int = 1 << 20,
+                 workers: int = 4,
+                 parallel_threshold: int = 64 << 20,
+                 cache_size: int = 1024):
+        '''
+
+        :param chunk_size: размер блока чтения в байтах
+        :param workers: количество потоков для подсчёта в больших файлах
+        :param parallel_threshold: размер файла в байтах, начиная с которого подсчёт идёт в несколько потоков
+        :param cache_size: максимальное количество файлов в кэше
+        '''
+        if chunk_size < 1 or workers < 1 or cache_size < 0:
+            raise ValidationError('chunk_size and workers must be positive, cache_size must be non-negative.')
+
+        self.__chunk_size = chunk_size
+        self.__workers = workers
+        self.__parallel_threshold = parallel_threshold
+        self.__cache_size = cache_size
+
+        self.__cache = {}
+        self.__mutex = threading.Lock()
+
+    # ------------------------------------------------------------------------------------------------
+    # Свойства ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @property
+    def chunk_size(self) -> int:
+        return self.__chunk_size
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    @property
+    def parallel_threshold(self) -> int:
+        return self.__parallel_threshold
+
+    def reset_cache(self):
+        '''
+        Сброс кэша результатов.
+
+        :return: ничего
+        '''
+        with self.__mutex:
+            self.__cache = {}
+        return
+
+    # ------------------------------------------------------------------------------------------------
+    # Подсчёт ----------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def count(self, full_path: str) -> int:
+        '''
+        Функция считает количество строк в файле.
+
+        :param full_path: полный путь к файлу
+        :return: количество строк
+        '''
+        try:
+            stat = os.stat(full_path)
+        except OSError as miss:
+            raise ProcessingError(f'Lines counting failed.\nfull_path: {full_path}') from miss
+
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self.__mutex:
+            if key in self.__cache:
+                return self.__cache[key]
+
+        size = stat.st_size
+        try:
+            if size >= self.__parallel_threshold and self.__workers > 1:
+                newlines = self.__count_parallel(full_path=full_path, size=size)
+            else:
+                newlines = self.__count_range(full_path=full_path, start=0, stop=size)
+
+            lines = newlines
+            if size:  # Последняя строка без '\n'
+                with open(full_path, mode='rb') as file:
+                    file.seek(size - 1)
+                    if file.read(1) != b'\n':
+                        lines += 1
+        except BaseException as miss:
+            raise ProcessingError(f'Lines counting failed.\nfull_path: {full_path}') from miss
+
+        if self.__cache_size:
+            with self.__mutex:
+                if len(self.__cache) >= self.__cache_size:  # Выкинем самый старый результат
+                    self.__cache.pop(next(iter(self.__cache)))
+                self.__cache[key] = lines
+        return lines
+
+    def __count_range(self, full_path: str, start: int, stop: int) -> int:
+        '''
+        Подсчёт b'\\n' в диапазоне байт файла [start, stop).
+
+        :param full_path: полный путь к файлу
+        :param start: начало диапазона
+        :param stop: конец диапазона
+        :return: количество b'\\n'
+        '''
+        newlines = 0
+        chunk_size = self.__chunk_size
+        with open(full_path, mode='rb', buffering=0) as file:
+            file.seek(start)
+            left = stop - start
+            while left > 0:
+                chunk = file.read(min(chunk_size, left))
+                if not chunk:
+                    break
+                newlines += chunk.count(b'\n')
+                left -= len(chunk)
+        return newlines
+
+    def __count_parallel(self, full_path: str, size: int) -> int:
+        '''
+        Подсчёт b'\\n' в файле несколькими потоками: файл делится на равные диапазоны.
+
+        :param full_path: полный путь к файлу
+        :param size: размер файла
+        :return: количество b'\\n'
+        '''
+        part = -(-size // self.__workers)  # деление с округлением вверх
+        bounds = [(start, min(start + part, size)) for start in range(0, size, part)]
+        with ThreadPoolExecutor(max_workers=len(bounds)) as executor:
+            results = executor.map(lambda bound: self.__count_range(full_path, *bound), bounds)
+            return sum(results)
+
+
+default_counter = LinesCounter()
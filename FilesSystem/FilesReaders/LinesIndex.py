@@ -0,0 +1,267 @@
+import os
+import struct
+import threading
+from array import array
+from itertools import accumulate
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+
+class LinesIndex:
+    '''
+    Индекс смещений строк файла. Хранит байтовое смещение начала каждой step-ой строки и общее количество строк,
+        что позволяет переходить к строке N без чтения файла с начала и получать количество строк за O(1).
+
+    Индекс строится за один проход по файлу (в бинарном режиме, без декодирования) и сохраняется рядом с файлом
+        в виде "sidecar" файла (по умолчанию full_path + '.lidx'). При загрузке индекс проверяется по размеру и
+        времени модификации файла: если файл изменился, индекс будет перестроен.
+
+    Строки разделяются по b'\\n', поэтому индекс корректен для кодировок, совместимых с ASCII (utf-8, cp1251 и т.п.).
+
+    Методы и свойства:
+        full_path - путь к индексируемому файлу
+
+        index_path - путь к файлу индекса
+
+        step - шаг индекса (каждая какая строка сохраняется)
+
+        lines_count - количество строк в файле
+
+        locate() - получить смещение ближайшей сохранённой строки и количество строк, которые надо пропустить
+
+        seek() - установить бинарный файл на начало строки
+
+        check_actual() - проверить, что индекс соответствует файлу
+
+        build() - построить индекс
+    '''
+
+    __magic = b'MLIDX001'
+    __header = struct.Struct('<8sQqQQ')  # magic, размер файла, mtime_ns, шаг, количество строк
+    __chunk_size = 1 << 20  # размер блока при построении индекса
+
+    def __init__(self, full_path: str,
+                 step: int = 1000,
+                 index_path: str = None,
+                 persist: bool = True):
+        '''
+
+        :param full_path: полный путь к файлу
+        :param step: шаг индекса: сохраняется смещение каждой step-ой строки. Чем меньше шаг, тем быстрее переход к
+            строке и тем больше размер индекса.
+        :param index_path: путь к файлу индекса. None - full_path + '.lidx'
+        :param persist: сохранять ли индекс на диск и пытаться ли его считать оттуда
+        '''
+        if not isinstance(step, int) or step < 1:
+            raise ValidationError(f'step must be positive int. {step} was passed.')
+
+        self.__full_path = full_path
+        self.__step = step
+        self.__index_path = full_path + '.lidx' if index_path is None else index_path
+        self.__persist = persist
+
+        self.__size = None
+        self.__mtime = None
+        self.__lines_count = 0
+        self.__offsets = array('Q')
+
+        if not (persist and self.__load()):  # Если не удалось взять сохранённый индекс - строим
+            self.build()
+
+    # ------------------------------------------------------------------------------------------------
+    # Свойства ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @property
+    def full_path(self) -> str:
+        return self.__full_path
+
+    @property
+    def index_path(self) -> str:
+        return self.__index_path
+
+    @property
+    def step(self) -> int:
+        return self.__step
+
+    @property
+    def lines_count(self) -> int:
+        '''
+        Количество строк в файле на момент построения индекса.
+
+        :return: количество строк
+        '''
+        return self.__lines_count
+
+    def __len__(self) -> int:
+        return self.__lines_count
+
+    # ------------------------------------------------------------------------------------------------
+    # Позиционирование -------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def locate(self, line: int) -> tuple:
+        '''
+        Функция отдаёт смещение ближайшей сохранённой строки, не превышающей line.
+
+        :param line: номер строки (с нулевой)
+        :return: кортеж (смещение в байтах, количество строк, которые надо пропустить от смещения)
+        '''
+        if line < 0:
+            raise ValidationError(f'line must be non-negative. {line} was passed.')
+        if line >= self.__lines_count:  # За концом файла
+            return self.__size, 0
+
+        checkpoint = line // self.__step
+        return self.__offsets[checkpoint], line - checkpoint * self.__step
+
+    def seek(self, file: object, line: int) -> int:
+        '''
+        Функция устанавливает файл, открытый в бинарном режиме, на начало строки line.
+
+        :param file: файл, открытый в режиме 'rb'
+        :param line: номер строки (с нулевой)
+        :return: смещение начала строки в байтах
+        '''
+        offset, skip = self.locate(line=line)
+        file.seek(offset)
+        for _ in range(skip):
+            file.readline()
+        return file.tell()
+
+    # ------------------------------------------------------------------------------------------------
+    # Построение и проверка --------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def check_actual(self) -> bool:
+        '''
+        Проверка соответствия индекса файлу по размеру и времени модификации.
+
+        :return: True - индекс актуален
+        '''
+        try:
+            stat = os.stat(self.__full_path)
+        except OSError:
+            return False
+        return stat.st_size == self.__size and stat.st_mtime_ns == self.__mtime
+
+    def build(self):
+        '''
+        Функция строит индекс за один проход по файлу и, если разрешено, сохраняет его на диск.
+
+        :return: ничего
+        '''
+        step = self.__step
+        offsets = array('Q', [0])  # Строка 0 всегда начинается с начала файла
+        newlines = 0  # количество найденных b'\n'
+        base = 0  # смещение начала текущего блока
+        last_byte = b''
+
+        try:
+            stat = os.stat(self.__full_path)
+            with open(self.__full_path, mode='rb') as file:
+                while True:
+                    chunk = file.read(self.__chunk_size)
+                    if not chunk:
+                        break
+
+                    parts = chunk.split(b'\n')
+                    chunk_newlines = len(parts) - 1
+                    if chunk_newlines:
+                        # Номера строк, начинающихся после каждого '\n' блока: newlines + 1 ... newlines + chunk_newlines
+                        first = (-(newlines + 1)) % step  # первый '\n', после которого начинается "шаговая" строка
+                        if first < chunk_newlines:
+                            ends = list(accumulate(map(len, parts)))  # длины частей без '\n' нарастающим итогом
+                            for k in range(first, chunk_newlines, step):
+                                offsets.append(base + ends[k] + k + 1)
+
+                    newlines += chunk_newlines
+                    base += len(chunk)
+                    last_byte = chunk[-1:]
+        except BaseException as miss:
+            raise ProcessingError(f'Lines index building failed.\nfull_path: {self.__full_path}') from miss
+
+        lines_count = newlines + (1 if last_byte and last_byte != b'\n' else 0)
+        if len(offsets) > 1 and offsets[-1] >= base:  # Уберём "строку" за последним '\n'
+            offsets.pop()
+
+        self.__size = stat.st_size
+        self.__mtime = stat.st_mtime_ns
+        self.__lines_count = lines_count
+        self.__offsets = offsets
+
+        if self.__persist:
+            self.__save()
+        return
+
+    def __save(self) -> bool:
+        '''
+        Сохранение индекса на диск. Ошибка сохранения (например, каталог только для чтения) не является критической.
+
+        :return: статус сохранения
+        '''
+        temp_path = f'{self.__index_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, mode='wb') as file:
+                file.write(self.__header.pack(self.__magic, self.__size, self.__mtime,
+                                              self.__step, self.__lines_count))
+                self.__offsets.tofile(file)
+            os.replace(temp_path, self.__index_path)
+            return True
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+    def __load(self) -> bool:
+        '''
+        Загрузка индекса с диска.
+
+        :return: True - индекс загружен и актуален; False - индекс надо построить
+        '''
+        try:
+            stat = os.stat(self.__full_path)
+            with open(self.__index_path, mode='rb') as file:
+                header = file.read(self.__header.size)
+                if len(header) != self.__header.size:
+                    return False
+                magic, size, mtime, step, lines_count = self.__header.unpack(header)
+                if (magic != self.__magic or step != self.__step or
+                        size != stat.st_size or mtime != stat.st_mtime_ns):
+                    return False
+
+                offsets = array('Q')
+                offsets.frombytes(file.read())
+        except (OSError, ValueError, struct.error):
+            return False
+
+        self.__size = size
+        self.__mtime = mtime
+        self.__lines_count = lines_count
+        self.__offsets = offsets
+        return True
+
+
+_indexes = {}
+_indexes_mutex = threading.Lock()
+
+
+def get_lines_index(full_path: str, step: int = 1000, persist: bool = True) -> LinesIndex:
+    '''
+    Функция отдаёт актуальный индекс строк файла. Индексы кэшируются в памяти процесса, при изменении файла индекс
+        перестраивается.
+
+    :param full_path: полный путь к файлу
+    :param step: шаг индекса
+    :param persist: сохранять ли индекс на диск
+    :return: LinesIndex
+    '''
+    key = (os.path.abspath(full_path), step)
+    with _indexes_mutex:
+        index = _indexes.get(key)
+    if index is not None and index.check_actual():
+        return index
+
+    index = LinesIndex(full_path=full_path, step=step, persist=persist)
+    with _indexes_mutex:
+        _indexes[key] = index
+    return index
@@ -0,0 +1,281 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from Exceptions.ExceptionTypes import ValidationError
+
+
+def estimate_size(data: object, sample: int = 100) -> int:
+    '''
+    Функция оценивает объём памяти, занимаемый объектом, в байтах. Для DataFrame/Series используется
+        memory_usage(deep=True), для контейнеров - сумма размеров элементов; у больших контейнеров размер
+        элементов оценивается по выборке из sample первых элементов.
+
+    :param data: объект
+    :param sample: размер выборки для больших контейнеров
+    :return: оценка размера в байтах
+    '''
+    memory_usage = getattr(data, 'memory_usage', None)
+    if callable(memory_usage):  # pandas
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+        except BaseException:
+            pass
+
+    size = sys.getsizeof(data)
+    if isinstance(data, (str, bytes, bytearray)):
+        return size
+
+    if isinstance(data, dict):
+        items = data.items()
+        length = len(data)
+        measure = lambda item: estimate_size(item[0], sample) + estimate_size(item[1], sample)
+    elif isinstance(data, (list, tuple, set, frozenset)):
+        items = data
+        length = len(data)
+        measure = lambda item: estimate_size(item, sample)
+    else:
+        return size
+
+    if not length:
+        return size
+
+    measured = 0
+    count = 0
+    for item in items:
+        measured += measure(item)
+        count += 1
+        if count >= sample:
+            break
+    return size + measured * length // count
+
+
+any_tag = object()  # Метка для LoadedCache.get(): запись отдаётся независимо от параметров чтения
+
+
+class LoadedCache:
+    '''
+    Кэш считанных файлов с вытеснением давно не использованных записей (LRU) по бюджету памяти.
+
+    Каждая запись проверяется по размеру и времени модификации файла: если файл изменился, запись считается
+        устаревшей, удаляется и не отдаётся. Запись может содержать метку (tag) - параметры чтения; запись с другой
+        меткой считается промахом.
+
+    Методы и свойства:
+        max_bytes - бюджет памяти в байтах (None - без ограничения)
+
+        max_items - максимальное количество записей (None - без ограничения)
+
+        size_bytes - текущий оценочный размер кэша
+
+        get() - получить актуальную запись
+
+        put() - добавить запись
+
+        file_state() - состояние файла (размер, mtime) для put()
+
+        pop() - удалить запись
+
+        clear() - очистить кэш
+
+        snapshot() - словарь {путь: данные} по всем записям
+
+        statistics - счётчики попаданий, промахов, вытеснений и устаревших записей
+    '''
+
+    def __init__(self,
+                 max_bytes: int or None = 256 << 20,
+                 max_items: int or None = None,
+                 validate: bool = True):
+        '''
+
+        :param max_bytes: бюджет памяти в байтах. None - без ограничения
+        :param max_items: максимальное количество записей. None - без ограничения
+        :param validate: проверять ли записи по размеру и времени модификации файла
+        '''
+        self.__entries = OrderedDict()  # {путь: (данные, метка, (размер, mtime), размер записи)}
+        self.__mutex = threading.RLock()
+        self.__size_bytes = 0
+        self.__validate = validate
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__stale = 0
+
+        self.__max_bytes = None
+        self.__max_items = None
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+
+    # ------------------------------------------------------------------------------------------------
+    # Настройки --------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @property
+    def max_bytes(self) -> int or None:
+        return self.__max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int or None):
+        if value is not None and (not isinstance(value, int) or value < 0):
+            raise ValidationError(f'max_bytes must be non-negative int or None. {value} was passed.')
+        with self.__mutex:
+            self.__max_bytes = value
+            self.__evict()
+
+    @property
+    def max_items(self) -> int or None:
+        return self.__max_items
+
+    @max_items.setter
+    def max_items(self, value: int or None):
+        if value is not None and (not isinstance(value, int) or value < 0):
+            raise ValidationError(f'max_items must be non-negative int or None. {value} was passed.')
+        with self.__mutex:
+            self.__max_items = value
+            self.__evict()
+
+    @property
+    def size_bytes(self) -> int:
+        return self.__size_bytes
+
+    @property
+    def statistics(self) -> dict:
+        '''
+        Счётчики кэша.
+
+        :return: словарь {hits, misses, evictions, stale, items, size_bytes}
+        '''
+        with self.__mutex:
+            return {'hits': self.__hits,
+                    'misses': self.__misses,
+                    'evictions': self.__evictions,
+                    'stale': self.__stale,
+                    'items': len(self.__entries),
+                    'size_bytes': self.__size_bytes}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, full_path: str) -> bool:
+        return full_path in self.__entries
+
+    # ------------------------------------------------------------------------------------------------
+    # Работа с записями ------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @staticmethod
+    def file_state(full_path: str) -> tuple or None:
+        '''
+        Состояние файла для проверки записей: размер и время модификации.
+
+        :param full_path: полный путь к файлу
+        :return: (размер, mtime) или None - файла нет
+        '''
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, full_path: str, tag: object = any_tag) -> object:
+        '''
+        Функция отдаёт актуальную запись. Устаревшая запись удаляется.
+
+        :param full_path: полный путь к файлу
+        :param tag: метка записи (параметры чтения). any_tag - метка не проверяется
+        :return: данные; KeyError, если актуальной записи нет
+        '''
+        with self.__mutex:
+            entry = self.__entries.get(full_path)
+            if entry is None or (tag is not any_tag and entry[1] != tag):
+                self.__misses += 1
+                raise KeyError(full_path)
+
+            if self.__validate and entry[2] != self.file_state(full_path):
+                self.__remove(full_path)
+                self.__stale += 1
+                self.__misses += 1
+                raise KeyError(full_path)
+
+            self.__entries.move_to_end(full_path)
+            self.__hits += 1
+            return entry[0]
+
+    def put(self, full_path: str, data: object, tag: object = None, state: tuple or None = False) -> bool:
+        '''
+        Добавление записи. Запись больше бюджета памяти не сохраняется.
+
+        :param full_path: полный путь к файлу
+        :param data: данные
+        :param tag: метка записи (параметры чтения)
+        :param state: состояние файла (file_state()), снятое до чтения под блокировкой чтения. False - снять сейчас:
+            если файл заменили между чтением и put(), старые данные получат состояние нового файла
+        :return: True - запись для пути была добавлена впервые; False - существующая запись заменена
+        '''
+        size = estimate_size(data)
+        if not self.__validate:
+            state = None
+        elif state is False:
+            state = self.file_state(full_path)
+
+        with self.__mutex:
+            is_new = full_path not in self.__entries
+            if not is_new:
+                self.__remove(full_path)
+
+            if self.__max_bytes is not None and size > self.__max_bytes:
+                self.__evictions += 1
+                return is_new
+
+            self.__entries[full_path] = (data, tag, state, size)
+            self.__size_bytes += size
+            self.__evict()
+        return is_new
+
+    def pop(self, full_path: str) -> object:
+        '''
+        Удаление записи.
+
+        :param full_path: полный путь к файлу
+        :return: данные; KeyError, если записи нет
+        '''
+        with self.__mutex:
+            if full_path not in self.__entries:
+                raise KeyError(full_path)
+            return self.__remove(full_path)[0]
+
+    def clear(self):
+        with self.__mutex:
+            self.__entries.clear()
+            self.__size_bytes = 0
+        return
+
+    def snapshot(self) -> dict:
+        '''
+        Словарь {путь: данные} по всем записям (без проверки актуальности и без изменения порядка вытеснения).
+
+        :return: словарь
+        '''
+        with self.__mutex:
+            return {full_path: entry[0] for full_path, entry in self.__entries.items()}
+
+    def __remove(self, full_path: str) -> tuple:
+        entry = self.__entries.pop(full_path)
+        self.__size_bytes -= entry[3]
+        return entry
+
+    def __evict(self):
+        '''
+        Вытеснение давно не использованных записей до соблюдения бюджета.
+
+        :return: ничего
+        '''
+        while self.__entries and (
+                (self.__max_bytes is not None and self.__size_bytes > self.__max_bytes) or
+                (self.__max_items is not None and len(self.__entries) > self.__max_items)):
+            full_path = next(iter(self.__entries))
+            self.__remove(full_path)
+            self.__evictions += 1
+        return
@@ -0,0 +1,235 @@
+import mmap
+import re
+
+from .LinesIndex import LinesIndex
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+
+class MappedText:
+    '''
+    "Ленивый" текстовый файл, отображённый в память (mmap). Файл не считывается в str целиком: данные подгружаются
+        операционной системой по мере обращения, а декодирование выполняется только для запрошенных строк или
+        диапазонов байт. Поэтому пиковое потребление памяти не зависит от размера файла.
+
+    Строки разделяются по b'\\n' и отдаются вместе с завершающим '\\n' (как при чтении по строкам). Индекс строк
+        (LinesIndex) строится при первом обращении к строке по номеру.
+
+    Методы и свойства:
+        full_path - путь к файлу
+
+        encoding - кодировка
+
+        size - размер файла в байтах
+
+        view - memoryview над отображённым файлом (без копирования)
+
+        lines_count - количество строк
+
+        line() - получить строку по номеру; также доступно индексирование и срезы: text[5], text[10:20]
+
+        decode() - декодировать диапазон байт
+
+        find() - найти подстроку (bytes) в файле
+
+        grep() - отдать строки, в которых есть совпадение с регулярным выражением (bytes)
+
+        close() - закрыть отображение
+    '''
+
+    def __init__(self, full_path: str,
+                 encoding: str = 'utf-8',
+                 errors: str = 'strict',
+                 index_step: int = 256):
+        '''
+
+        :param full_path: полный путь к файлу
+        :param encoding: кодировка, используемая при декодировании
+        :param errors: обработка ошибок декодирования (как в bytes.decode)
+        :param index_step: шаг индекса строк (LinesIndex)
+        '''
+        self.__full_path = full_path
+        self.__encoding = encoding
+        self.__errors = errors
+        self.__index_step = index_step
+        self.__index = None
+
+        try:
+            with open(full_path, mode='rb') as file:
+                try:
+                    self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # Пустой файл отобразить нельзя
+                    self.__map = b''
+        except BaseException as miss:
+            raise ProcessingError(f'File mapping failed.\nfull_path: {full_path}') from miss
+
+    # ------------------------------------------------------------------------------------------------
+    # Свойства ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @property
+    def full_path(self) -> str:
+        return self.__full_path
+
+    @property
+    def encoding(self) -> str:
+        return self.__encoding
+
+    @property
+    def size(self) -> int:
+        return len(self.__map)
+
+    @property
+    def view(self) -> memoryview:
+        '''
+        memoryview над отображённым файлом. Срезы view не копируют данные.
+        Перед close() все полученные view надо освободить (memoryview.release()).
+
+        :return: memoryview
+        '''
+        return memoryview(self.__map)
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.__map)
+
+    @property
+    def lines_count(self) -> int:
+        return self.__get_index().lines_count
+
+    def __len__(self) -> int:
+        return self.lines_count
+
+    # ------------------------------------------------------------------------------------------------
+    # Доступ к строкам -------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def __get_index(self) -> LinesIndex:
+        if self.__index is None:
+            self.__index = LinesIndex(full_path=self.__full_path, step=self.__index_step, persist=False)
+        return self.__index
+
+    def __line_bounds(self, number: int) -> tuple:
+        '''
+        Границы строки в байтах.
+
+        :param number: номер строки (с нулевой)
+        :return: кортеж (начало, конец) - конец включает '\\n'
+        '''
+        start, skip = self.__get_index().locate(line=number)
+        for _ in range(skip):
+            start = self.__map.find(b'\n', start) + 1
+        stop = self.__map.find(b'\n', start)
+        return start, len(self.__map) if stop == -1 else stop + 1
+
+    def line(self, number: int) -> str:
+        '''
+        Функция отдаёт строку по номеру.
+
+        :param number: номер строки (с нулевой, допускаются отрицательные)
+        :return: строка
+        '''
+        lines_count = self.lines_count
+        if number < 0:
+            number += lines_count
+        if not 0 <= number < lines_count:
+            raise IndexError(f'Line number out of range: {number}')
+
+        start, stop = self.__line_bounds(number=number)
+        return self.decode(start=start, stop=stop)
+
+    def __getitem__(self, item: int or slice) -> str or list:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.lines_count)
+            if step != 1:
+                return [self.line(number) for number in range(start, stop, step)]
+            return list(self.__iter_lines(start=start, stop=stop))
+        return self.line(number=item)
+
+    def __iter__(self):
+        return self.__iter_lines(start=0, stop=None)
+
+    def __iter_lines(self, start: int, stop: int or None):
+        '''
+        Последовательная выдача строк с start по stop без повторного обращения к индексу.
+
+        :param start: первая строка
+        :param stop: последняя строка (не включительно). None - до конца файла
+        :return: генератор строк
+        '''
+        if stop is not None and start >= stop:
+            return
+        position = self.__line_bounds(number=start)[0] if start else 0
+        size = len(self.__map)
+        number = start
+        while position < size and (stop is None or number < stop):
+            end = self.__map.find(b'\n', position)
+            end = size if end == -1 else end + 1
+            yield self.decode(start=position, stop=end)
+            position = end
+            number += 1
+
+    def decode(self, start: int = 0, stop: int = None) -> str:
+        '''
+        Декодирование диапазона байт [start, stop).
+
+        :param start: начало диапазона
+        :param stop: конец диапазона. None - до конца файла
+        :return: строка
+        '''
+        return self.__map[start:stop].decode(self.__encoding, self.__errors)
+
+    def find(self, sub: bytes, start: int = 0, stop: int = None) -> int:
+        '''
+        Поиск подстроки в файле без декодирования.
+
+        :param sub: искомые байты
+        :param start: начало поиска
+        :param stop: конец поиска
+        :return: смещение или -1
+        '''
+        if not isinstance(sub, bytes):
+            raise ValidationError(f'sub must be bytes. {type(sub)} was passed.')
+        if stop is None:
+            return self.__map.find(sub, start)
+        return self.__map.find(sub, start, stop)
+
+    def grep(self, pattern: bytes or re.Pattern):
+        '''
+        Генератор строк, в которых найдено совпадение с регулярным выражением. Поиск идёт по байтам, декодируются
+            только найденные строки.
+
+        :param pattern: регулярное выражение над bytes (строка bytes или скомпилированный шаблон)
+        :return: генератор строк
+        '''
+        if isinstance(pattern, bytes):
+            pattern = re.compile(pattern)
+        elif not isinstance(pattern, re.Pattern) or not isinstance(pattern.pattern, bytes):
+            raise ValidationError('pattern must be bytes or compiled bytes pattern.')
+
+        size = len(self.__map)
+        position = 0
+        while position < size:
+            match = pattern.search(self.__map, position)
+            if match is None:
+                return
+            start = self.__map.rfind(b'\n', 0, match.start()) + 1
+            stop = self.__map.find(b'\n', match.start())
+            stop = size if stop == -1 else stop + 1
+            yield self.decode(start=start, stop=stop)
+            position = stop
+
+    # ------------------------------------------------------------------------------------------------
+    # Закрытие ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def close(self):
+        '''
+        Закрытие отображения.
+
+        :return: ничего
+        '''
+        if isinstance(self.__map, mmap.mmap):
+            self.__map.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,123 @@
+import os
+import re
+import threading
+
+from Exceptions.ExceptionTypes import ProcessingError
+
+
+class NamesAllocator:
+    '''
+    Выделение уникальных имён файлов вида "name (N).ext".
+
+    Вместо проверки "name (1)", "name (2)", ... по одному имени каталог сканируется один раз, после чего номер для
+        каждой пары (каталог, имя, расширение) хранится в счётчике. Имя занимается атомарно: файл создаётся с флагом
+        O_EXCL, поэтому два потока или процесса не могут получить одно и то же имя. Если имя успели занять снаружи,
+        берётся следующий номер.
+
+    Номера не переиспользуются: после "name (5)" будет выдано "name (6)", даже если "name (2)" удалён.
+
+    Методы и свойства:
+        claim() - занять уникальное имя
+
+        shift() - сформировать имя с номером
+
+        reset() - сбросить счётчики
+    '''
+
+    def __init__(self):
+        self.__counters = {}  # {(каталог, имя без расширения, расширение): следующий номер}
+        self.__mutex = threading.Lock()
+
+    @staticmethod
+    def shift(full_path: str, expansion: str, number: int) -> str:
+        '''
+        Функция формирует имя файла с номером: "name.ext" -> "name (N).ext". При number=0 имя не меняется.
+
+        :param full_path: полный путь файла
+        :param expansion: расширение файла (с точкой)
+        :param number: номер
+        :return: путь
+        '''
+        if not number:
+            return full_path
+        if full_path.endswith(expansion):
+            return f'{full_path[:len(full_path) - len(expansion)]} ({number}){expansion}'
+        return f'{full_path} ({number})'
+
+    def reset(self):
+        with self.__mutex:
+            self.__counters = {}
+        return
+
+    def claim(self, full_path: str, expansion: str) -> str:
+        '''
+        Функция занимает уникальное имя: сначала исходное, если оно свободно, иначе - "name (N).ext".
+            Занятое имя создаётся на диске пустым файлом, который затем перезаписывается экспортом.
+
+        :param full_path: полный путь файла
+        :param expansion: расширение файла
+        :return: занятый путь
+        '''
+        if not expansion.startswith('.'):  # Если расширение без точки
+            expansion = '.' + expansion
+
+        if self.__try_create(full_path):
+            return full_path
+
+        directory, file_name = os.path.split(os.path.abspath(full_path))
+        stem = file_name[:len(file_name) - len(expansion)] if file_name.endswith(expansion) else file_name
+        key = (directory, stem, expansion)
+
+        with self.__mutex:
+            number = self.__counters.get(key)
+            if number is None:
+                number = self.__scan(directory=directory, stem=stem, expansion=expansion)
+
+            while True:
+                shifted = self.shift(full_path=full_path, expansion=expansion, number=number)
+                number += 1
+                if self.__try_create(shifted):
+                    self.__counters[key] = number
+                    return shifted
+
+    @staticmethod
+    def __try_create(full_path: str) -> bool:
+        '''
+        Атомарное создание файла.
+
+        :param full_path: путь
+        :return: True - файл создан; False - файл уже существует
+        '''
+        try:
+            descriptor = os.open(full_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+        except FileExistsError:
+            return False
+        except OSError as miss:
+            raise ProcessingError(f'File name claiming failed.\nfull_path: {full_path}') from miss
+        os.close(descriptor)
+        return True
+
+    @staticmethod
+    def __scan(directory: str, stem: str, expansion: str) -> int:
+        '''
+        Однократное сканирование каталога: поиск наибольшего занятого номера.
+
+        :param directory: каталог
+        :param stem: имя без расширения
+        :param expansion: расширение
+        :return: следующий свободный номер
+        '''
+        pattern = re.compile(re.escape(stem) + r' \((\d+)\)' + re.escape(expansion))
+        number = 0
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    match = pattern.fullmatch(entry.name)
+                    if match:
+                        number = max(number, int(match.group(1)))
+        except OSError as miss:
+            raise ProcessingError(f'Directory scanning failed.\ndirectory: {directory}') from miss
+        return number + 1
+
+
+default_allocator = NamesAllocator()
@@ -1,4 +1,5 @@
 from .Common import CommonMethods
+from .DurableWriting import DurableWriter, SyncGroup
 from Exceptions.ExceptionTypes import ProcessingError, ValidationError
 
 import pickle
@@ -55,7 +56,7 @@ class PICKLE(CommonMethods):
         '''
         if not full_path.endswith('.pickle'):
             raise ValidationError("Incorrect file extension. Only '.pickle' is available.")
-        with self.mutex:
+        with self.read_lock(full_path=full_path):
             try:
                 if not self.check_access(path=full_path):
                     raise ProcessingError('No access to file')
@@ -71,7 +72,9 @@ class PICKLE(CommonMethods):
     # ------------------------------------------------------------------------------------------------
     # Запись -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
-    def write(self, file_data: object, full_path: str, shift_name: bool or None = True) -> bool or str:
+    def write(self, file_data: object, full_path: str, shift_name: bool or None = True,
+              atomic: bool = False,
+              durability: str or SyncGroup = 'none') -> bool or str:
         '''
         Фнукия записывает данные в json файл
 
@@ -79,6 +82,9 @@ class PICKLE(CommonMethods):
         :param full_path: полное имя файла
         :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
             False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
         :return: True - успешно экспортнуто, имя уникально
             False - отказ от экспорта
             str - успешно экспортнуто, имя изменено
@@ -86,20 +92,25 @@ class PICKLE(CommonMethods):
         if not full_path.endswith('.pickle'):
             raise ValidationError("Incorrect file extension. Only '.pickle' is available.")
 
-        with self.mutex:
+        with self.write_lock(full_path=full_path):
             name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
             if self.check_access(path=full_path):
                 if shift_name is None:
                     return False
                 elif shift_name is True:
-                    full_path = self.name_shifting(full_path=full_path, expansion='.json')
-                    name_shifted = True
+                    shifted_path = self.name_shifting(full_path=full_path, expansion='.pickle')
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
 
             # пишем
             try:
-                with open(full_path, mode='wb') as file:
-                    pickle.dump(file_data, file, pickle.HIGHEST_PROTOCOL)
-                    file.flush()
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as writer:
+                    with writer.open(mode='wb') as file:
+                        pickle.dump(file_data, file, pickle.HIGHEST_PROTOCOL)
+                        file.flush()
             except BaseException as miss:
                 raise ProcessingError(f'File export failed. full_path: {full_path}') from miss
 
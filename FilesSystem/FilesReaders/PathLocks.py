@@ -0,0 +1,190 @@
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+
+class ReadWriteLock:
+    '''
+    Блокировка "читатели - писатель": читать одновременно могут несколько потоков, писать - только один, и на время
+        записи чтение запрещено. Ожидающий писатель имеет приоритет перед новыми читателями.
+
+    Блокировка реентерабельна в пределах потока: поток может повторно взять чтение, повторно взять запись или взять
+        чтение, удерживая запись. Повышение чтения до записи не поддерживается (приводит к взаимной блокировке), в
+        этом случае вызывается ProcessingError.
+
+    Методы и свойства:
+        acquire_read() / release_read() - взять/отпустить блокировку на чтение
+
+        acquire_write() / release_write() - взять/отпустить блокировку на запись
+
+        read_locked() - контекстный менеджер чтения
+
+        write_locked() - контекстный менеджер записи
+    '''
+
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = {}  # {ident потока: количество взятий чтения}
+        self.__writer = None  # ident потока-писателя
+        self.__writer_count = 0
+        self.__writers_waiting = 0
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me or me in self.__readers:  # Повторное взятие
+                self.__readers[me] = self.__readers.get(me, 0) + 1
+                return
+
+            while self.__writer is not None or self.__writers_waiting:
+                self.__condition.wait()
+            self.__readers[me] = 1
+        return
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self.__condition:
+            count = self.__readers.get(me, 0)
+            if not count:
+                raise ProcessingError('Read lock release without acquire.')
+            if count > 1:
+                self.__readers[me] = count - 1
+            else:
+                del self.__readers[me]
+                if not self.__readers:
+                    self.__condition.notify_all()
+        return
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:  # Повторное взятие
+                self.__writer_count += 1
+                return
+            if me in self.__readers:
+                raise ProcessingError('Read lock upgrade to write lock is not supported.')
+
+            self.__writers_waiting += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__writers_waiting -= 1
+            self.__writer = me
+            self.__writer_count = 1
+        return
+
+    def release_write(self):
+        with self.__condition:
+            if self.__writer != threading.get_ident():
+                raise ProcessingError('Write lock release without acquire.')
+            self.__writer_count -= 1
+            if not self.__writer_count:
+                self.__writer = None
+                self.__condition.notify_all()
+        return
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
+
+
+class PathLocks:
+    '''
+    Блокировки "читатели - писатель" по путям файлов: у каждого нормализованного пути своя блокировка, поэтому
+        операции с разными файлами идут параллельно и не влияют друг на друга (в том числе поток, читающий один
+        файл, может писать другой), чтение одного файла несколькими потоками тоже идёт параллельно.
+
+    Блокировки создаются при первом обращении к пути и удаляются, когда их никто не использует (слабые ссылки).
+        Реестр блокировок разбит на stripes частей со своими мьютексами (lock striping), чтобы потоки не
+        соперничали за один мьютекс при получении блокировки.
+
+    Методы и свойства:
+        stripes - количество частей реестра блокировок
+
+        normalize() - нормализовать путь
+
+        get_lock() - получить блокировку пути
+
+        read() - контекстный менеджер чтения файла
+
+        write() - контекстный менеджер записи файла
+    '''
+
+    def __init__(self, stripes: int = 64):
+        '''
+
+        :param stripes: количество частей реестра блокировок. Больше частей - меньше соперничества за мьютексы
+            реестра.
+        '''
+        if not isinstance(stripes, int) or stripes < 1:
+            raise ValidationError(f'stripes must be positive int. {stripes} was passed.')
+        self.__stripes = tuple((threading.Lock(), weakref.WeakValueDictionary()) for _ in range(stripes))
+
+    @property
+    def stripes(self) -> int:
+        return len(self.__stripes)
+
+    @staticmethod
+    def normalize(full_path: str) -> str:
+        '''
+        Нормализация пути: абсолютный путь без '..' и с регистром, принятым в ОС.
+
+        :param full_path: путь
+        :return: нормализованный путь
+        '''
+        return os.path.normcase(os.path.abspath(full_path))
+
+    def get_lock(self, full_path: str) -> ReadWriteLock:
+        '''
+        Функция отдаёт блокировку пути. Блокировка живёт, пока на неё есть ссылки: пока она взята или пока
+            вызывающий хранит объект.
+
+        :param full_path: путь
+        :return: ReadWriteLock
+        '''
+        full_path = self.normalize(full_path)
+        mutex, locks = self.__stripes[hash(full_path) % len(self.__stripes)]
+        with mutex:
+            lock = locks.get(full_path)
+            if lock is None:
+                lock = ReadWriteLock()
+                locks[full_path] = lock
+        return lock
+
+    def read(self, full_path: str):
+        '''
+        Контекстный менеджер чтения файла.
+
+        :param full_path: путь
+        :return: контекстный менеджер
+        '''
+        return self.get_lock(full_path).read_locked()
+
+    def write(self, full_path: str):
+        '''
+        Контекстный менеджер записи файла.
+
+        :param full_path: путь
+        :return: контекстный менеджер
+        '''
+        return self.get_lock(full_path).write_locked()
+
+
+# Общие блокировки для всех объектов чтения/записи: разные объекты, работающие с одним файлом, тоже согласованы.
+default_path_locks = PathLocks()
@@ -1,5 +1,7 @@
 from Exceptions.ExceptionTypes import ProcessingError
 from .Common import CommonMethods
+from .DurableWriting import DurableWriter, SyncGroup
+from .MappedText import MappedText
 
 class StandartReader(CommonMethods):
     '''
@@ -29,20 +31,23 @@ class StandartReader(CommonMethods):
 
     '''
 
-    def __init__(self, save_loaded: bool = False):
+    def __init__(self, save_loaded: bool = False,
+                 loaded_max_bytes: int or None = 256 << 20):
         '''
 
         :param save_loaded: сохоанять ли считанные файлы?
+        :param loaded_max_bytes: бюджет памяти для сохранённых файлов в байтах. None - без ограничения
         '''
 
         # Выполним стандартный init
-        CommonMethods.__init__(self, save_loaded=save_loaded)
+        CommonMethods.__init__(self, save_loaded=save_loaded, loaded_max_bytes=loaded_max_bytes)
 
     # ------------------------------------------------------------------------------------------------
     # Чтение -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
     def read(self, full_path: str, save_loaded: bool = None,
-             encoding: str = None) -> object:
+             encoding: str = None,
+             mapped: bool = False) -> str or MappedText:
         '''
         Функция считывания файла
 
@@ -50,16 +55,29 @@ class StandartReader(CommonMethods):
         :param save_loaded: сохранить ли загруженный файл? True - да, False - нет, None - использовать стандартную
             настройку (save_loaded)
         :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param mapped: отобразить файл в память и вернуть "ленивый" объект MappedText вместо str. Файл не
+            считывается целиком, декодируются только запрошенные строки. Такой объект не сохраняется в loaded.
         :return: контент файла
         '''
+        read_tag = ('read', encoding)  # параметры чтения для кэша loaded
+        if ((save_loaded is None and self.save_loaded) or save_loaded is True) and not mapped:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
+
         if not self.check_access(path=full_path):
             raise ProcessingError('No access to file')
 
-        with self.mutex:
+        with self.read_lock(full_path=full_path):
+            state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
             # определим кодировку файла
             if encoding is None:
                 encoding = self.get_encoding(full_path=full_path)
 
+            if mapped:
+                return MappedText(full_path=full_path, encoding=encoding)
+
             # читаем
             try:
                 with open(full_path, mode='r', encoding=encoding) as file:
@@ -69,7 +87,9 @@ class StandartReader(CommonMethods):
 
         if (save_loaded is None and self.save_loaded) or save_loaded is True:
             self._ad_loaded(full_path=full_path,
-                            data=result)
+                            data=result,
+                            tag=read_tag,
+                            state=state)
 
         return result
 
@@ -77,7 +97,9 @@ class StandartReader(CommonMethods):
     # Запись -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
     def write(self, file_data: object, full_path: str, shift_name: bool or None = True,
-              encoding: str = 'utf-8') -> bool or str:
+              encoding: str = 'utf-8',
+              atomic: bool = False,
+              durability: str or SyncGroup = 'none') -> bool or str:
         '''
         Фнукия записывает данные в файл
 
@@ -86,24 +108,32 @@ class StandartReader(CommonMethods):
         :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
             False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
         :param encoding: кодировка
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
         :return: True - успешно экспортнуто, имя уникально
             False - отказ от экспорта
             str - успешно экспортнуто, имя изменено
         '''
-        with self.mutex:
+        with self.write_lock(full_path=full_path):
             name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
             if self.check_access(path=full_path):  # если есть файл и мы не дописываем в конец
                 if shift_name is None:
                     return False
                 elif shift_name is True:
-                    full_path = self.name_shifting(full_path=full_path, expansion='.json')
-                    name_shifted = True
+                    shifted_path = self.name_shifting(full_path=full_path, expansion=self.extract_extension(full_path=full_path))
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
 
             # пишем
             try:
-                with open(full_path, mode='w', encoding=encoding) as file:
-                    file.write(file_data)
-                    file.flush()
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as writer:
+                    with writer.open(mode='w', encoding=encoding) as file:
+                        file.write(file_data)
+                        file.flush()
 
             except BaseException as miss:
                 raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
@@ -1,4 +1,8 @@
-from .Common import CommonMethods, FileIterator
+from .Common import CommonMethods, FileIterator, FileBatchIterator
+from .DurableWriting import DurableWriter, SyncGroup
+from .MappedText import MappedText
+from .FileFollower import FileFollower
+from .Compression import compressed_expansion, open_stream, resolve_compression, strip_compression
 from Exceptions.ExceptionTypes import ProcessingError, ValidationError
 
 
@@ -21,6 +25,11 @@ class TXT(CommonMethods):
 
             get_encoding() - получить кодировку файла
 
+        Индекс строк
+            get_lines_index() - получить индекс смещений строк файла
+
+            get_lines_count() - получить количество строк файла
+
         Настройки считывания
             save_loaded - сохранять ли считанные файлы?
 
@@ -36,20 +45,28 @@ class TXT(CommonMethods):
             write() - запись
 
             write_line() - добавить строку
+
+            follower() - чтение новых строк растущего файла
     '''
 
-    def __init__(self, save_loaded: bool = False):
+    def __init__(self, save_loaded: bool = False,
+                 loaded_max_bytes: int or None = 256 << 20):
         '''
         :param save_loaded: сохоанять ли считанные файлы?
+        :param loaded_max_bytes: бюджет памяти для сохранённых файлов в байтах. None - без ограничения
         '''
         # Выполним стандартный init
-        CommonMethods.__init__(self, save_loaded=save_loaded)
+        CommonMethods.__init__(self, save_loaded=save_loaded, loaded_max_bytes=loaded_max_bytes)
 
     # ------------------------------------------------------------------------------------------------
     # Чтение -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
     def read(self, full_path: str, save_loaded: bool = None,
-             encoding: str = 'utf-8') -> object:
+             encoding: str = 'utf-8',
+             mapped: bool = False,
+             compression: str or None = 'infer',
+             check_magic: bool = False,
+             background: bool = False) -> str or MappedText:
         '''
         Функция считывания txt файла
 
@@ -57,35 +74,67 @@ class TXT(CommonMethods):
         :param save_loaded: сохранить ли загруженный файл? True - да, False - нет, None - использовать стандартную
             настройку (save_loaded)
         :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param mapped: отобразить файл в память и вернуть "ленивый" объект MappedText вместо str. Файл не
+            считывается целиком, декодируются только запрошенные строки. Такой объект не сохраняется в loaded.
+            Для сжатых файлов недоступно.
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'
+        :param check_magic: при compression='infer' определять сжатие файла без суффикса по сигнатуре в первых байтах
+            (например, gzip в файле без ".gz")
+        :param background: распаковывать сжатый файл в отдельном потоке
         :return: считанный файл в виде JSON объекта
         '''
-        if not full_path.endswith('.txt'):
-            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+        if not strip_compression(full_path).endswith('.txt'):
+            raise ValidationError("Incorrect file extension. Only '.txt' (also '.txt.gz', '.txt.xz', '.txt.bz2') " +
+                                  "is available.")
+
+        read_tag = ('read', encoding)  # параметры чтения для кэша loaded
+        if ((save_loaded is None and self.save_loaded) or save_loaded is True) and not mapped:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
 
-        with self.mutex:
+        with self.read_lock(full_path=full_path):
+            state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
             if not self.check_access(path=full_path):
                 raise ProcessingError('No access to file')
 
+            compression = resolve_compression(full_path=full_path, compression=compression, check_magic=check_magic)
+
             # определим кодировку файла
             if encoding is None:
-                encoding = self.get_encoding(full_path=full_path)
+                encoding = self.get_encoding(full_path=full_path, compression=compression)
+
+            if mapped:
+                if compression is not None:
+                    raise ValidationError('Mapped reading is not available for compressed files.')
+                return MappedText(full_path=full_path, encoding=encoding)
 
             # читаем
             try:
-                with open(full_path, mode='r', encoding=encoding) as file:
+                with open_stream(full_path, mode='r', encoding=encoding, compression=compression,
+                                 background=background) as file:
                     result = file.read()
             except BaseException as miss:
                 raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
 
         if (save_loaded is None and self.save_loaded) or save_loaded is True:
             self._ad_loaded(full_path=full_path,
-                            data=result)
+                            data=result,
+                            tag=read_tag,
+                            state=state)
 
         return result
 
     def read_by_lines(self, full_path: str,
                       encoding: str = 'utf-8',
-                      start: int = 0, stop: int = None) -> FileIterator:
+                      start: int = 0, stop: int = None,
+                      use_index: bool = False,
+                      batch_size: int = None,
+                      compression: str or None = 'infer',
+                      check_magic: bool = False,
+                      background: bool = False) -> FileIterator or FileBatchIterator:
         '''
         Функция отдаёт иттератор для чтения по строкам.
 
@@ -93,27 +142,79 @@ class TXT(CommonMethods):
         :param encoding: строка, явно указывающая кодировку или None для её автоопределения
         :param start: первая строка
         :param stop: последняя строка. None - считать все
-        :return: итератор по строкам FileIterator
+        :param use_index: использовать индекс строк (LinesIndex): чтение начнётся сразу со строки start, а
+            количество строк не будет пересчитываться. Индекс строится при первом обращении и хранится рядом с файлом.
+        :param batch_size: размер пачки строк. None - итератор отдаёт по одной строке (FileIterator), иначе - списки
+            из batch_size строк (FileBatchIterator).
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'. Сжатый файл читается потоково, use_index для него недоступен.
+        :param check_magic: при compression='infer' определять сжатие файла без суффикса по сигнатуре в первых байтах
+            (например, gzip в файле без ".gz")
+        :param background: распаковывать сжатый файл в отдельном потоке
+        :return: итератор по строкам FileIterator или по пачкам строк FileBatchIterator
         '''
-        if not full_path.endswith('.txt'):
-            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+        if not strip_compression(full_path).endswith('.txt'):
+            raise ValidationError("Incorrect file extension. Only '.txt' (also '.txt.gz', '.txt.xz', '.txt.bz2') " +
+                                  "is available.")
 
-        with self.mutex:
+        with self.read_lock(full_path=full_path):
             if not self.check_access(path=full_path):
                 raise ProcessingError('No access to file')
 
+            compression = resolve_compression(full_path=full_path, compression=compression, check_magic=check_magic)
+
             # определим кодировку файла
             if encoding is None:
-                encoding = self.get_encoding(full_path=full_path)
+                encoding = self.get_encoding(full_path=full_path, compression=compression)
+
+            if use_index and compression is not None:
+                raise ValidationError('Lines index is not available for compressed files.')
+
+            lines_index = self.get_lines_index(full_path=full_path) if use_index else None
+
+            if batch_size is not None:
+                return FileBatchIterator(full_path=full_path, batch_size=batch_size, encoding=encoding,
+                                         start=start, stop=stop,
+                                         lines_index=lines_index,
+                                         compression=compression, background=background)
 
             return FileIterator(full_path=full_path, encoding=encoding,
-                                start=start, stop=stop)
+                                start=start, stop=stop,
+                                lines_index=lines_index,
+                                compression=compression, background=background)
+
+    def follower(self, full_path: str,
+                 encoding: str = 'utf-8',
+                 checkpoint_path: str = None,
+                 start: str = 'begin') -> FileFollower:
+        '''
+        Функция отдаёт объект для чтения растущего файла (FileFollower): он запоминает смещение, отдаёт только новые
+            полностью дописанные строки, отслеживает усечение и ротацию файла и может сохранять контрольную
+            точку, чтобы после перезапуска продолжить с того же места.
+            Пример: for line in reader.follower(path, checkpoint_path=path + '.offset').follow(): ...
+
+        :param full_path: полный путь к файлу
+        :param encoding: кодировка (совместимая с ASCII)
+        :param checkpoint_path: путь к файлу контрольной точки. None - позиция не сохраняется
+        :param start: откуда читать, если контрольной точки нет: 'begin' - с начала файла, 'end' - только новые
+            строки
+        :return: FileFollower
+        '''
+        if not full_path.endswith('.txt'):
+            raise ValidationError("Incorrect file extension. Only '.txt' is available.")
+
+        return FileFollower(full_path=full_path, encoding=encoding,
+                            checkpoint_path=checkpoint_path, start=start,
+                            post_process_function=None)
 
     # ------------------------------------------------------------------------------------------------
     # Запись -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
     def write(self, file_data: object, full_path: str, shift_name: bool or None = True,
-              encoding: str = 'utf-8') -> True or str:
+              encoding: str = 'utf-8',
+              atomic: bool = False,
+              durability: str or SyncGroup = 'none',
+              compression: str or None = 'infer') -> True or str:
         '''
         Фнукия записывает данные в файл txt
 
@@ -122,27 +223,41 @@ class TXT(CommonMethods):
         :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
             False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
         :param encoding: кодировка
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"), None - без сжатия, 'gz',
+            'xz', 'bz2'
         :return: True - успешно экспортнуто, имя уникально
             False - отказ от экспорта
             str - успешно экспортнуто, имя изменено
         '''
-        if not full_path.endswith('.txt'):
-            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+        if not strip_compression(full_path).endswith('.txt'):
+            raise ValidationError("Incorrect file extension. Only '.txt' (also '.txt.gz', '.txt.xz', '.txt.bz2') " +
+                                  "is available.")
+
+        compression = resolve_compression(full_path=full_path, compression=compression)
 
-        with self.mutex:
+        with self.write_lock(full_path=full_path):
             name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
             if self.check_access(path=full_path):  # если есть файл и мы не дописываем в конец
                 if shift_name is None:
                     return False
                 elif shift_name is True:
-                    full_path = self.name_shifting(full_path=full_path, expansion='.json')
-                    name_shifted = True
+                    shifted_path = self.name_shifting(full_path=full_path,
+                                                      expansion=compressed_expansion(full_path, '.txt'))
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
 
             # пишем
             try:
-                with open(full_path, mode='w', encoding=encoding) as file:
-                    file.write(file_data)
-                    file.flush()
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as writer:
+                    with open_stream(writer.path, mode='w', encoding=encoding, compression=compression) as file:
+                        file.write(file_data)
+                        file.flush()
 
             except BaseException as miss:
                 raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
@@ -154,26 +269,31 @@ class TXT(CommonMethods):
 
     def write_at_the_end(self, file_data: object, full_path: str,
                          encoding: str = 'utf-8',
-                         new_string: bool = False):
+                         new_string: bool = False,
+                         compression: str or None = 'infer'):
         '''
         Фнукия дозаписывает данные в файл. Если файл отсутствовал, он будет создан.
+        В сжатый файл каждый вызов дописывает отдельный сжатый блок (gzip member, xz/bz2 stream).
 
         :param file_data: данные для экспорта в файл
         :param full_path: полное имя файла
         :param encoding: кодировка
         :param new_string: писать с новой строки
+        :param compression: сжатие файла: 'infer' - по суффиксу (".gz", ".xz", ".bz2"),
+            None - без сжатия, 'gz', 'xz', 'bz2'
         :return:
         '''
-        if not full_path.endswith('.txt'):
-            raise ValidationError("Incorrect file extension. Only '.jsonl' is available.")
+        if not strip_compression(full_path).endswith('.txt'):
+            raise ValidationError("Incorrect file extension. Only '.txt' (also '.txt.gz', '.txt.xz', '.txt.bz2') " +
+                                  "is available.")
 
-        with self.mutex:
+        with self.write_lock(full_path=full_path):
             if not self.check_access(path=full_path):
                 raise ProcessingError('No access to file')
 
             # пишем
             try:
-                with open(full_path, mode='a', encoding=encoding) as file:  # Делаем экспорт
+                with open_stream(full_path, mode='a', encoding=encoding, compression=compression) as file:
                     if new_string:
                         file.write('\n')
                     file.write(file_data)
@@ -1,6 +1,11 @@
 from .Common import CommonMethods
+from .ColumnarCache import ColumnarCache
+from .XLSXWorkbook import XLSXWorkbook
+from .XLSXStreamWriter import XLSXStreamWriter
+from .DurableWriting import DurableWriter, SyncGroup
 from Exceptions.ExceptionTypes import ProcessingError, ValidationError
 
+import os
 import pandas as pd
 from warnings import warn
 
@@ -27,6 +32,8 @@ class XLSX(CommonMethods):
         Настройки считывания
             save_loaded - сохранять ли считанные файлы?
 
+            columnar_cache - колоночный кэш разобранных листов (ColumnarCache)
+
             loaded - словарь сохранённых файлов
 
             _reset_loaded - обновить словарь сохранённых файлов
@@ -36,18 +43,41 @@ class XLSX(CommonMethods):
 
             write_sheet() - добавить лист в конец файла
 
+            write_sheets() - добавить несколько листов за одно открытие файла
+
+            write_stream() - потоковая запись листов
+
+            stream_writer() - открыть книгу для потоковой записи листов
+
             read() - чтение
 
             read_sheet() - считать лист
+
+            workbook() - открыть книгу для потокового чтения листов
     '''
 
-    def __init__(self):
+    def __init__(self, columnar_cache: ColumnarCache = None):
         '''
+
+        :param columnar_cache: колоночный кэш для read_sheet(columnar_cache=True). None - ColumnarCache() рядом с
+            файлами
         '''
 
         # Выполним стандартный init
         CommonMethods.__init__(self, save_loaded=False)
 
+        self.__columnar_cache = ColumnarCache() if columnar_cache is None else columnar_cache
+
+    @property
+    def columnar_cache(self) -> ColumnarCache:
+        return self.__columnar_cache
+
+    @columnar_cache.setter
+    def columnar_cache(self, new_value: ColumnarCache):
+        if not isinstance(new_value, ColumnarCache):
+            raise ValidationError(f'columnar_cache must be ColumnarCache. {type(new_value)} was passed.')
+        self.__columnar_cache = new_value
+
     # ------------------------------------------------------------------------------------------------
     # Чтение -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
@@ -57,12 +87,12 @@ class XLSX(CommonMethods):
              sheets_names: int or str or list = None
              ) -> pd.core.frame.DataFrame or dict:
         '''
-        Функция считывания xlsx файла
+        Функция считывания xlsx файла. Книга открывается один раз (XLSXWorkbook), все листы читаются за эту сессию.
 
         :param full_path: полный путь к файлу
         :param save_loaded: сохранить ли загруженный файл? True - да, False - нет, None - использовать стандартную
             настройку (save_loaded)
-        :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param encoding: не используется: текст в xlsx хранится в utf-8 (оставлен для совместимости)
         :param index_column_number: имя колонки с названием индекса
         :param sheets_names: определяет листы, которые требуется считать:
             str - имя листа;
@@ -75,36 +105,52 @@ class XLSX(CommonMethods):
         if not full_path.endswith('.xlsx'):
             raise ValidationError("Incorrect file extension. Only '.xlsx' is available.")
 
-        with self.mutex:
-            # определим кодировку файла
-            if encoding is None:
-                encoding = self.get_encoding(full_path=full_path)
+        read_tag = ('read', encoding, index_column_number, sheets_names)  # параметры чтения для кэша loaded
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
+
+        with self.read_lock(full_path=full_path):
+            state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
+            if not self.check_access(path=full_path):
+                raise ProcessingError('No access to file')
 
             try:  # Считаем
-                with open(full_path, 'rb') as file:
-                    result = pd.read_excel(io=file,
-                                           sheet_name=sheets_names,
-                                           encoding=encoding,
-                                           index_col=index_column_number,
-                                           engine='xlrd'
-                                           )  # считаем его
+                with XLSXWorkbook(full_path=full_path) as book:
+                    if sheets_names is None:
+                        sheets = book.sheets_names
+                    elif isinstance(sheets_names, list):
+                        sheets = sheets_names
+                    else:
+                        sheets = [sheets_names]
+                    result = {sheet: book.read_sheet(sheet=sheet, index_column_number=index_column_number)
+                              for sheet in sheets}
 
             except BaseException as miss:  # Если не получилось считать файл
-                raise ProcessingError(f'File reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+                raise ProcessingError(f'File reading failed.\nfull_path: {full_path}') from miss
+
+            if not isinstance(sheets_names, list) and sheets_names is not None:  # Один лист
+                result = result[sheets_names]
 
         if (save_loaded is None and self.save_loaded) or save_loaded is True:
             self._ad_loaded(full_path=full_path,
-                            data=result)
+                            data=result,
+                            tag=read_tag,
+                            state=state)
 
         return result
 
     def read_sheet(self, full_path: str, sheet: int or str,
                    save_loaded: bool = None,
                    encoding: str = 'utf-8',
-                   index_column_number: int = None
+                   index_column_number: int = None,
+                   columnar_cache: bool = False
                    ) -> pd.core.frame.DataFrame:
         '''
-        Функция считывания одного листа xlsx файла
+        Функция считывания одного листа xlsx файла: книга открывается только для чтения (XLSXWorkbook), разбирается
+            только этот лист.
 
         :param full_path: полный путь к файлу
         :param sheet: определяет листы, которые требуется считать:
@@ -112,36 +158,73 @@ class XLSX(CommonMethods):
             int - номер листа (с нулевого);
         :param save_loaded: сохранить ли загруженный файл? True - да, False - нет, None - использовать стандартную
             настройку (save_loaded)
-        :param encoding: строка, явно указывающая кодировку или None для её автоопределения
+        :param encoding: не используется: текст в xlsx хранится в utf-8 (оставлен для совместимости)
         :param index_column_number: имя колонки с названием индекса
+        :param columnar_cache: использовать колоночный кэш (columnar_cache): если файл не менялся с прошлого чтения
+            листа с теми же параметрами, лист загружается из бинарного файла рядом с источником без разбора xlsx
         :return: считанный лист в виде pd.core.frame.DataFrame.
         '''
         if not full_path.endswith('.xlsx'):
             raise ValidationError("Incorrect file extension. Only '.xlsx' is available.")
 
-        with self.mutex:
-            # определим кодировку файла
-            if encoding is None:
-                encoding = self.get_encoding(full_path=full_path)
-
-            try:  # Считаем
-                with open(full_path, 'rb') as file:
-                    result = pd.read_excel(io=file,
-                                           sheet_name=sheet,
-                                           encoding=encoding,
-                                           index_col=index_column_number,
-                                           engine='xlrd'
-                                           )  # считаем его
-
-            except BaseException as miss:  # Если не получилось считать файл
-                raise ProcessingError(f'Sheet reading failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+        read_tag = ('read_sheet', sheet, encoding, index_column_number)  # параметры чтения для кэша loaded
+        if (save_loaded is None and self.save_loaded) or save_loaded is True:
+            try:
+                return self._get_loaded(full_path=full_path, tag=read_tag)
+            except KeyError:  # Файла нет в кэше или он изменился
+                pass
+
+        with self.read_lock(full_path=full_path):
+            state = self._loaded_state(full_path=full_path)  # до чтения (кэш loaded)
+            if not self.check_access(path=full_path):
+                raise ProcessingError('No access to file')
+
+            result = None
+            if columnar_cache:
+                cache_tag = ('XLSX.read_sheet', sheet, index_column_number)
+                source_stat = os.stat(full_path)
+                result = self.__columnar_cache.load(full_path=full_path, tag=cache_tag)
+
+            if result is None:
+                try:  # Считаем
+                    with XLSXWorkbook(full_path=full_path) as book:
+                        result = book.read_sheet(sheet=sheet, index_column_number=index_column_number)
+
+                except BaseException as miss:  # Если не получилось считать файл
+                    raise ProcessingError(f'Sheet reading failed.\nfull_path: {full_path}\nsheet: {sheet}') from miss
+
+                if columnar_cache:
+                    try:
+                        self.__columnar_cache.save(full_path=full_path, tag=cache_tag, data=result, stat=source_stat)
+                    except ProcessingError as miss:  # Без кэша лист всё равно считан
+                        warn(f'Columnar cache saving failed: {miss.args[0]}', RuntimeWarning)
 
         if (save_loaded is None and self.save_loaded) or save_loaded is True:
             self._ad_loaded(full_path=full_path,
-                            data=result)
+                            data=result,
+                            tag=read_tag,
+                            state=state)
 
         return result
 
+    def workbook(self, full_path: str, data_only: bool = True) -> XLSXWorkbook:
+        '''
+        Функция открывает книгу для чтения (XLSXWorkbook): файл открывается один раз в режиме только для чтения,
+            листы перечисляются без разбора ячеек, строки листов читаются потоково, в том числе окнами строк и колонок.
+            Пример: with reader.workbook(path) as book: for chunk in book.read_chunks(book.sheets_names[0]): ...
+
+        :param full_path: полный путь к файлу
+        :param data_only: True - значения формул (последние сохранённые), False - сами формулы
+        :return: XLSXWorkbook
+        '''
+        if not full_path.endswith('.xlsx'):
+            raise ValidationError("Incorrect file extension. Only '.xlsx' is available.")
+
+        with self.read_lock(full_path=full_path):
+            if not self.check_access(path=full_path):
+                raise ProcessingError('No access to file')
+            return XLSXWorkbook(full_path=full_path, data_only=data_only)
+
     # ------------------------------------------------------------------------------------------------
     # Запись -----------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------
@@ -150,7 +233,9 @@ class XLSX(CommonMethods):
               shift_name: bool or None = True,
               with_index: bool = True,
               one_list_name: str = 'List1',
-              encoding: str = 'utf-8') -> bool or str:
+              encoding: str = 'utf-8',
+              atomic: bool = False,
+              durability: str or SyncGroup = 'none') -> bool or str:
         '''
         Фнукия записывает данные в файл ".xlsx".
         https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.to_excel.html
@@ -164,7 +249,10 @@ class XLSX(CommonMethods):
         :param with_index: экспортировать ли индекс?
         :param one_list_name: имя "одного" листа. Если подан DataFrame или Series, а не словарь, то лист надо
             как-то назвать. Это его имя. Если подан словарь, в качестви имён листов будет взят индекс.
-        :param encoding: кодировка файла
+        :param encoding: не используется: текст в xlsx хранится в utf-8 (оставлен для совместимости)
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
         :return: True - успешно экспортнуто, имя уникально
             False - отказ от экспорта
             str - успешно экспортнуто, имя изменено
@@ -183,23 +271,22 @@ class XLSX(CommonMethods):
                 raise ProcessingError('Series to DataFrame conversion failed. File export failed.') from miss
 
         elif isinstance(file_data, dict):
-            for key in file_data.keys():  # Проверим, что каждый элемент является фреймом
+            frames = {}  # Исходный словарь не меняем: собираем новый из годных элементов
+            for key, value in file_data.items():  # Проверим, что каждый элемент является фреймом
 
-                if isinstance(file_data[key], pd.core.frame.DataFrame):  # Если фрейм
-                    pass
-                elif isinstance(file_data[key], pd.core.series.Series):  # Если Series - конвертнём
+                if isinstance(value, pd.core.frame.DataFrame):  # Если фрейм
+                    frames[key] = value
+                elif isinstance(value, pd.core.series.Series):  # Если Series - конвертнём
                     try:
-                        new_data = pd.DataFrame(data=file_data[key].tolist(), index=file_data[key].index)
-                        file_data[key] = new_data
+                        frames[key] = pd.DataFrame(data=value.tolist(), index=value.index)
                     except BaseException as miss:
-                        file_data.pop(file_data[key])
-                        warn(f'Element "{key}" conversion Series to DataFrame failed. Error: {miss.args[0]}\nValue excluded.',
+                        warn(f'Element "{key}" conversion Series to DataFrame failed. Error: {miss}\nValue excluded.',
                              DeprecationWarning)
                 else:  # Если говнотип
-                    warn((f'Element "{key}" have wrong type: {type(file_data[key])}. Value excluded.' +
+                    warn((f'Element "{key}" have wrong type: {type(value)}. Value excluded.' +
                           'Element must be Series or DataFrame.')
                          , DeprecationWarning)
-                    file_data.pop(file_data[key])
+            file_data = frames
 
             if file_data == {}:  # если словарь опустел
                 raise ProcessingError('All dictionary elements were excluded due to errors.')
@@ -208,32 +295,35 @@ class XLSX(CommonMethods):
             raise ValidationError(f'file_data type must be Series or DataFrame. {type(file_data)} was passed. ' +
                                   'File export failed.')
 
-        with self.mutex:
+        with self.write_lock(full_path=full_path):
             name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
             if self.check_access(path=full_path):
                 if shift_name is None:
                     return False
                 elif shift_name is True:
-                    full_path = self.name_shifting(full_path=full_path, expansion='.json')
-                    name_shifted = True
+                    shifted_path = self.name_shifting(full_path=full_path, expansion='.xlsx')
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
 
             # Выполним экспорт
             try:
-                with pd.ExcelWriter(full_path, mode='w') as writer:  # Делаем "писатель файла"
-                    for frame_key in file_data.keys():  # Пошли по индексу в словаре
-                        if with_index:
-                            if file_data[frame_key].index.name is None:
-                                file_data[frame_key] = file_data[
-                                    frame_key].copy()  # берём ссылку, чтобы не изменить объект
-                                file_data[
-                                    frame_key].index.name = 'index'  # ставим имя индекса (чтобы оно не было пустым)
-
-                        file_data[frame_key].to_excel(writer, sheet_name=frame_key, encoding=encoding, index=with_index)
-                    writer.save()
-                    writer.close()
+                with DurableWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                   claimed=claimed) as durable_writer:
+                    with pd.ExcelWriter(durable_writer.path, mode='w', engine='openpyxl') as writer:  # "писатель файла"
+                        for frame_key in file_data.keys():  # Пошли по индексу в словаре
+                            if with_index:
+                                if file_data[frame_key].index.name is None:
+                                    file_data[frame_key] = file_data[
+                                        frame_key].copy()  # берём ссылку, чтобы не изменить объект
+                                    file_data[
+                                        frame_key].index.name = 'index'  # ставим имя индекса (чтобы оно не было пустым)
+
+                            file_data[frame_key].to_excel(writer, sheet_name=frame_key, index=with_index)
 
             except BaseException as miss:
-                raise ProcessingError(f'File export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+                raise ProcessingError(f'File export failed.\nfull_path: {full_path}') from miss
 
         if name_shifted:
             return full_path
@@ -255,8 +345,8 @@ class XLSX(CommonMethods):
         :param with_index: экспортировать ли индекс?
         :param one_list_name: имя "одного" листа. Если подан DataFrame или Series, а не словарь, то лист надо
             как-то назвать. Это его имя. Если подан словарь, в качестви имён листов будет взят индекс.
-        :param encoding: кодировка файла
-        :return:
+        :param encoding: не используется: текст в xlsx хранится в utf-8 (оставлен для совместимости)
+        :return: True - лист записан
         '''
         if not full_path.endswith('.xlsx'):
             raise ValidationError("Incorrect file extension. Only '.xlsx' is available.")
@@ -274,10 +364,10 @@ class XLSX(CommonMethods):
 
         file_data = {sheet_name: file_data}
 
-        with self.mutex:
+        with self.write_lock(full_path=full_path):
             # Выполним экспорт
             try:
-                with pd.ExcelWriter(full_path, mode='a') as writer:  # Делаем "писатель файла"
+                with pd.ExcelWriter(full_path, mode='a', engine='openpyxl') as writer:  # Делаем "писатель файла"
                     for frame_key in file_data.keys():  # Пошли по индексу в словаре
                         if with_index:
                             if file_data[frame_key].index.name is None:
@@ -286,11 +376,142 @@ class XLSX(CommonMethods):
                                 file_data[
                                     frame_key].index.name = 'index'  # ставим имя индекса (чтобы оно не было пустым)
 
-                        file_data[frame_key].to_excel(writer, sheet_name=frame_key, encoding=encoding, index=with_index)
-                    writer.save()
-                    writer.close()
+                        file_data[frame_key].to_excel(writer, sheet_name=frame_key, index=with_index)
 
             except BaseException as miss:
-                raise ProcessingError(f'Sheet export failed.\nfull_path: {full_path}\nencoding: {encoding}') from miss
+                raise ProcessingError(f'Sheet export failed.\nfull_path: {full_path}') from miss
+
+        return True
+
+    def write_sheets(self, file_data: dict,
+                     full_path: str,
+                     with_index: bool = True) -> bool:
+        '''
+        Фнукия добавляет в файл ".xlsx" несколько листов за одно открытие и сохранение книги (write_sheet() открывает и
+            сохраняет книгу на каждый лист). Существующие листы с теми же именами заменяются.
 
-        return
+        :param file_data: словарь {имя листа: DataFrame или Series}
+        :param full_path: полное имя файла
+        :param with_index: экспортировать ли индекс?
+        :return: True - листы записаны (книга дописывается на месте, имя файла не меняется)
+        '''
+        if not full_path.endswith('.xlsx'):
+            raise ValidationError("Incorrect file extension. Only '.xlsx' is available.")
+        if not isinstance(file_data, dict) or not file_data:
+            raise ValidationError(f'file_data must be non-empty dict. {type(file_data)} was passed.')
+
+        frames = {}
+        for key, value in file_data.items():
+            if isinstance(value, pd.core.series.Series):  # Если Series - конвертнём
+                try:
+                    value = pd.DataFrame(data=value.tolist(), index=value.index)
+                except BaseException as miss:
+                    raise ProcessingError(f'Element "{key}" conversion Series to DataFrame failed. ' +
+                                          'Sheets export failed.') from miss
+            elif not isinstance(value, pd.core.frame.DataFrame):
+                raise ValidationError(f'Element "{key}" have wrong type: {type(value)}. ' +
+                                      'Element must be Series or DataFrame.')
+            if with_index and value.index.name is None:
+                value = value.rename_axis('index')  # ставим имя индекса (чтобы оно не было пустым)
+            frames[key] = value
+
+        with self.write_lock(full_path=full_path):
+            try:
+                with pd.ExcelWriter(full_path, mode='a', engine='openpyxl', if_sheet_exists='replace') as writer:
+                    for frame_key, frame in frames.items():
+                        frame.to_excel(writer, sheet_name=frame_key, index=with_index)
+
+            except BaseException as miss:
+                raise ProcessingError(f'Sheets export failed.\nfull_path: {full_path}') from miss
+
+        return True
+
+    def stream_writer(self, full_path: str,
+                      shift_name: bool or None = True,
+                      atomic: bool = False,
+                      durability: str or SyncGroup = 'none') -> XLSXStreamWriter or bool:
+        '''
+        Функция открывает книгу для потоковой записи (XLSXStreamWriter): листы пишутся по очереди из DataFrame или
+            итерируемых объектов строк, память ограничена пачкой строк, книга сохраняется при закрытии.
+            Пример: with reader.stream_writer(path) as book: book.write_sheet('data', cursor, columns=names)
+            Блокировка записи удерживается только при выборе имени (сдвинутое имя занимается заглушкой) и при
+            сохранении книги в close(), но не во время записи листов.
+
+        :param full_path: полное имя файла
+        :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
+            False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :return: XLSXStreamWriter (итоговый путь - full_path объекта) или False - отказ от экспорта
+        '''
+        if not full_path.endswith('.xlsx'):
+            raise ValidationError("Incorrect file extension. Only '.xlsx' is available.")
+
+        with self.write_lock(full_path=full_path):
+            claimed = False  # имя занято заглушкой (name_shifting)
+            if self.check_access(path=full_path):
+                if shift_name is None:
+                    return False
+                elif shift_name is True:
+                    shifted_path = self.name_shifting(full_path=full_path, expansion='.xlsx')
+                    claimed = True
+                    full_path = shifted_path
+
+        return XLSXStreamWriter(full_path=full_path, atomic=atomic, durability=durability,
+                                path_locks=self.path_locks, claimed=claimed)
+
+    def write_stream(self, file_data: object,
+                     full_path: str,
+                     shift_name: bool or None = True,
+                     with_index: bool = True,
+                     one_list_name: str = 'List1',
+                     columns: list or tuple = None,
+                     atomic: bool = False,
+                     durability: str or SyncGroup = 'none') -> bool or str:
+        '''
+        Фнукия потоково записывает данные в файл ".xlsx" (openpyxl write_only): все листы за один проход, объекты
+            ячеек не накапливаются в памяти. Формат - как у write(). Количество строк отдаёт stream_writer()
+            (XLSXStreamWriter.rows).
+
+        :param file_data: данные для экспорта: DataFrame, Series или итерируемый объект строк (частей DataFrame)
+            экспортнутся на лист one_list_name; словарь {имя листа: данные} - каждый элемент на свой лист
+        :param full_path: полное имя файла
+        :param shift_name: разрешена ди замена имени: True - сдвинуть имя при совпадении на "(N)",
+            False - заменить файл, None - отказаться от экспорта в случае совпадения имён.
+        :param with_index: экспортировать ли индекс?
+        :param one_list_name: имя листа, если подан не словарь
+        :param columns: колонки для строк-списков (для всех листов). None - из первого элемента листа
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :return: True - успешно экспортнуто, имя уникально
+            False - отказ от экспорта
+            str - успешно экспортнуто, имя изменено
+        '''
+        if not full_path.endswith('.xlsx'):
+            raise ValidationError("Incorrect file extension. Only '.xlsx' is available.")
+        if not isinstance(file_data, dict):
+            file_data = {one_list_name: file_data}
+
+        with self.write_lock(full_path=full_path):
+            name_shifted = False
+            claimed = False  # имя занято заглушкой (name_shifting)
+            if self.check_access(path=full_path):
+                if shift_name is None:
+                    return False
+                elif shift_name is True:
+                    shifted_path = self.name_shifting(full_path=full_path, expansion='.xlsx')
+                    name_shifted = shifted_path != full_path
+                    claimed = True
+                    full_path = shifted_path
+
+        with XLSXStreamWriter(full_path=full_path, atomic=atomic, durability=durability,
+                              path_locks=self.path_locks, claimed=claimed) as writer:
+            for sheet_name, data in file_data.items():
+                writer.write_sheet(sheet_name=sheet_name, data=data, columns=columns, with_index=with_index)
+
+        if name_shifted:
+            return full_path
+        else:
+            return True
@@ -0,0 +1,244 @@
+from itertools import chain
+
+import pandas as pd
+from openpyxl import Workbook
+
+from .DurableWriting import DurableWriter, SyncGroup, remove_file
+from .PathLocks import PathLocks, default_path_locks
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+
+class XLSXStreamWriter:
+    '''
+    Потоковая запись xlsx файла (openpyxl write_only): строки листа сразу сериализуются во временный файл листа, объекты
+        ячеек не накапливаются, поэтому память ограничена размером пачки строк, а стоимость строки постоянна. Все
+        листы пишутся за один проход, книга собирается в close().
+
+    Формат - как у XLSX.write(): заголовок из имён колонок, индекс (with_index) - первыми колонками, по колонке на
+        уровень, с именами уровней (безымянный индекс - "index", безымянный уровень MultiIndex - "level_N");
+        пропуски (NaN, None, NaT) - пустые ячейки.
+
+    Лист пишется целиком одним вызовом write_sheet(); к записанному листу вернуться нельзя.
+    Если в контекстном менеджере возникло исключение или запись листа не удалась, файл не сохраняется (заглушка
+        занятого имени удаляется): после сбоя write_sheet() и close() отказываются работать.
+
+    Методы и свойства:
+        full_path - путь к файлу
+
+        sheets_names - имена записанных листов
+
+        rows - количество записанных строк данных (по всем листам)
+
+        write_sheet() - записать лист
+
+        close() - собрать и сохранить книгу
+
+        discard() - отказаться от записи
+    '''
+
+    def __init__(self, full_path: str,
+                 atomic: bool = False,
+                 durability: str or SyncGroup = 'none',
+                 path_locks: PathLocks = None,
+                 claimed: bool = False):
+        '''
+
+        :param full_path: полное имя файла
+        :param atomic: писать через временный файл с переименованием: при сбое прежний файл не будет испорчен
+        :param durability: политика сброса на диск: 'none' - без fsync, 'file' - fsync файла, SyncGroup - отложенный
+            групповой fsync (файлы группы сбрасываются в SyncGroup.commit())
+        :param path_locks: блокировки файлов. None - общие блокировки объектов чтения/записи
+        :param claimed: full_path занят пустой заглушкой (name_shifting): при отказе от записи или сбое она удаляется
+        '''
+        if not full_path.endswith('.xlsx'):
+            raise ValidationError("Incorrect file extension. Only '.xlsx' is available.")
+
+        self.__full_path = full_path
+        self.__atomic = atomic
+        self.__durability = durability
+        self.__path_locks = default_path_locks if path_locks is None else path_locks
+        self.__claimed = claimed
+
+        self.__workbook = Workbook(write_only=True)
+        self.__sheets_names = []
+        self.__rows = 0
+        self.__closed = False
+        self.__failed = False  # запись листа не удалась: книга недописана
+
+    @property
+    def full_path(self) -> str:
+        return self.__full_path
+
+    @property
+    def sheets_names(self) -> list:
+        return list(self.__sheets_names)
+
+    @property
+    def rows(self) -> int:
+        return self.__rows
+
+    # ------------------------------------------------------------------------------------------------
+    # Запись листов ----------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @staticmethod
+    def __index_labels(index: pd.Index) -> list:
+        '''
+        Заголовки колонок индекса: имена уровней; безымянный индекс - "index", безымянный уровень MultiIndex -
+            "level_N".
+
+        :param index: индекс DataFrame
+        :return: список заголовков
+        '''
+        if index.nlevels == 1:
+            return ['index' if index.name is None else index.name]
+        return [f'level_{level}' if name is None else name for level, name in enumerate(index.names)]
+
+    @staticmethod
+    def __frame_rows(frame: pd.core.frame.DataFrame, with_index: bool) -> object:
+        '''
+        Строки DataFrame для записи: пропуски заменяются на None (openpyxl записал бы NaN как недопустимое число).
+
+        :param frame: DataFrame
+        :param with_index: добавлять ли индекс первыми колонками (по колонке на уровень)
+        :return: итератор кортежей
+        '''
+        rows = frame.astype(object)
+        rows = rows.where(rows.notna(), None).itertuples(index=False, name=None)
+        if not with_index:
+            return rows
+
+        levels = []
+        for level in range(frame.index.nlevels):
+            values = pd.Series(frame.index.get_level_values(level), dtype=object)
+            levels.append(values.where(values.notna(), None))
+        return (index + row for index, row in zip(zip(*levels), rows))
+
+    def write_sheet(self, sheet_name: str, data: object,
+                    columns: list or tuple = None,
+                    with_index: bool = True,
+                    chunk_size: int = 10000) -> int:
+        '''
+        Функция записывает лист.
+
+        :param sheet_name: имя листа
+        :param data: DataFrame, Series или итерируемый объект (генератор, курсор) с элементами:
+            DataFrame - часть листа (колонки приводятся к columns);
+            dict или Series - строка {колонка: значение};
+            list или tuple - строка значений в порядке columns.
+        :param columns: колонки. None - из первого элемента (колонки части, ключи словаря; у строк-списков - без
+            заголовка)
+        :param with_index: записывать ли индекс DataFrame (у строк - сквозной номер строки)?
+        :param chunk_size: количество строк DataFrame, преобразуемых за раз
+        :return: количество записанных строк данных
+        '''
+        if self.__closed:
+            raise ProcessingError(f'Writer is closed.\nfull_path: {self.__full_path}')
+        if self.__failed:
+            raise ProcessingError(f'Writer failed on a previous sheet.\nfull_path: {self.__full_path}')
+        if sheet_name in self.__sheets_names:
+            raise ValidationError(f'Sheet "{sheet_name}" is already written.')
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValidationError(f'chunk_size must be positive int. {chunk_size} was passed.')
+
+        if isinstance(data, pd.core.series.Series):
+            data = data.to_frame()
+        if isinstance(data, pd.core.frame.DataFrame):
+            iterator = iter([data])
+        else:
+            iterator = iter(data)
+
+        first = next(iterator, None)
+        if first is not None:
+            iterator = chain((first,), iterator)
+        if columns is None and isinstance(first, pd.core.frame.DataFrame):
+            columns = list(first.columns)
+        elif columns is None and isinstance(first, (dict, pd.core.series.Series)):
+            columns = list(first.keys())
+        index_labels = ['index']
+        if isinstance(first, pd.core.frame.DataFrame):
+            index_labels = self.__index_labels(first.index)
+
+        try:
+            worksheet = self.__workbook.create_sheet(title=sheet_name)
+            if columns is not None:
+                worksheet.append((index_labels if with_index else []) + [str(column) for column in columns])
+
+            position = 0
+            for item in iterator:
+                if isinstance(item, pd.core.frame.DataFrame):
+                    if columns is not None and list(item.columns) != list(columns):
+                        item = item[list(columns)]
+                    if with_index and item.index.nlevels != len(index_labels):
+                        raise ValidationError(f'All parts must have {len(index_labels)} index levels. ' +
+                                              f'{item.index.nlevels} was passed.')
+                    for start in range(0, len(item), chunk_size):
+                        for row in self.__frame_rows(item.iloc[start:start + chunk_size], with_index=with_index):
+                            worksheet.append(row)
+                    position += len(item)
+                    continue
+
+                if isinstance(item, pd.core.series.Series):
+                    item = item.to_dict()
+                if isinstance(item, dict):
+                    item = [item.get(column) for column in columns]
+                worksheet.append([position] + list(item) if with_index else item)
+                position += 1
+
+        except BaseException as miss:
+            self.__failed = True  # Лист уже в книге, но недописан
+            raise ProcessingError(f'Sheet export failed.\nfull_path: {self.__full_path}\nsheet: {sheet_name}') \
+                from miss
+
+        self.__sheets_names.append(sheet_name)
+        self.__rows += position
+        return position
+
+    # ------------------------------------------------------------------------------------------------
+    # Завершение -------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def close(self):
+        '''
+        Сборка и сохранение книги. Повторный вызов ничего не делает. Если запись листа не удалась, книга не
+            сохраняется (discard()) и возникает ProcessingError.
+
+        :return: ничего
+        '''
+        if self.__closed:
+            return
+        if self.__failed:
+            self.discard()
+            raise ProcessingError(f'Workbook is not saved: a sheet export failed.\nfull_path: {self.__full_path}')
+        self.__closed = True
+        if not self.__sheets_names:  # В книге должен быть хотя бы один лист
+            self.__workbook.create_sheet(title='List1')
+
+        with self.__path_locks.write(full_path=self.__full_path):
+            try:
+                with DurableWriter(full_path=self.__full_path, atomic=self.__atomic,
+                                   durability=self.__durability, claimed=self.__claimed) as durable_writer:
+                    self.__workbook.save(durable_writer.path)
+            except BaseException as miss:
+                raise ProcessingError(f'File export failed.\nfull_path: {self.__full_path}') from miss
+        return
+
+    def discard(self):
+        '''
+        Отказ от записи: книга не сохраняется, заглушка занятого имени удаляется.
+
+        :return: ничего
+        '''
+        if self.__closed:
+            return
+        self.__closed = True
+        if self.__claimed:
+            remove_file(self.__full_path)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
@@ -0,0 +1,235 @@
+from itertools import islice
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from Exceptions.ExceptionTypes import ProcessingError, ValidationError
+
+
+class XLSXWorkbook:
+    '''
+    Сессия чтения xlsx файла: книга открывается один раз в режиме только для чтения (openpyxl read_only), список
+        листов берётся из описания книги без разбора ячеек, строки листа разбираются потоково по мере чтения,
+        поэтому память не зависит от размера листа. Листы можно читать по очереди без повторного открытия файла.
+
+    Окна строк и колонок задаются кортежем (начало, конец) с нуля, конец не включается, None - до конца:
+        rows=(0, 1000) - первые 1000 строк листа, columns=(2, None) - колонки начиная с "C".
+    Если чтение с заголовком, заголовок - первая строка окна строк.
+
+    Сессию нужно закрыть (close() или контекстный менеджер): файл остаётся открытым до закрытия.
+    Объект не потокобезопасен.
+
+    Методы и свойства:
+        full_path - путь к файлу
+
+        sheets_names - имена листов
+
+        dimensions() - размеры листа по описанию листа
+
+        iter_rows() - генератор строк листа (кортежи значений)
+
+        read_sheet() - считать лист (окно листа) в DataFrame
+
+        read_chunks() - генератор DataFrame по частям листа
+
+        close() - закрыть файл
+    '''
+
+    def __init__(self, full_path: str, data_only: bool = True):
+        '''
+
+        :param full_path: полный путь к файлу
+        :param data_only: True - значения формул (последние сохранённые), False - сами формулы
+        '''
+        self.__full_path = full_path
+        try:
+            self.__workbook = load_workbook(filename=full_path, read_only=True, data_only=data_only)
+        except BaseException as miss:
+            raise ProcessingError(f'Workbook opening failed.\nfull_path: {full_path}') from miss
+        self.__closed = False
+
+    # ------------------------------------------------------------------------------------------------
+    # Свойства ---------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    @property
+    def full_path(self) -> str:
+        return self.__full_path
+
+    @property
+    def sheets_names(self) -> list:
+        self.__check_open()
+        return list(self.__workbook.sheetnames)
+
+    def close(self):
+        if not self.__closed:
+            self.__closed = True
+            self.__workbook.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ------------------------------------------------------------------------------------------------
+    # Листы ------------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def __check_open(self):
+        if self.__closed:
+            raise ProcessingError(f'Workbook is closed.\nfull_path: {self.__full_path}')
+
+    def __sheet(self, sheet: int or str) -> object:
+        '''
+        Лист по имени или номеру (с нулевого).
+
+        :param sheet: имя или номер листа
+        :return: лист openpyxl
+        '''
+        self.__check_open()
+        names = self.__workbook.sheetnames
+        if isinstance(sheet, int) and not isinstance(sheet, bool):
+            if not -len(names) <= sheet < len(names):
+                raise ValidationError(f'Sheet number {sheet} is out of range. Workbook has {len(names)} sheets.')
+            return self.__workbook[names[sheet]]
+        if sheet not in names:
+            raise ValidationError(f'Sheet "{sheet}" not found. Available sheets: {names}.')
+        return self.__workbook[sheet]
+
+    @staticmethod
+    def __window(window: tuple or None, name: str) -> tuple:
+        '''
+        Перевод окна (начало, конец) с нуля в границы openpyxl (с единицы, конец включается).
+
+        :param window: окно или None
+        :param name: имя параметра для сообщения об ошибке
+        :return: (min, max); max - None, если до конца
+        '''
+        if window is None:
+            return 1, None
+        start, stop = window
+        start = start or 0
+        if start < 0 or (stop is not None and stop < start):
+            raise ValidationError(f'{name} must be (start, stop) with 0 <= start <= stop. {window} was passed.')
+        return start + 1, stop
+
+    def dimensions(self, sheet: int or str) -> tuple:
+        '''
+        Размеры листа из описания листа (ячейки не разбираются). Размеры записывает программа, сохранившая файл:
+            они могут отсутствовать (None) или быть больше фактических.
+
+        :param sheet: имя или номер листа
+        :return: (количество строк, количество колонок)
+        '''
+        worksheet = self.__sheet(sheet)
+        return worksheet.max_row, worksheet.max_column
+
+    # ------------------------------------------------------------------------------------------------
+    # Чтение -----------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------
+    def iter_rows(self, sheet: int or str,
+                  rows: tuple = None,
+                  columns: tuple = None):
+        '''
+        Генератор строк листа: кортежи значений ячеек. Строки выравниваются по ширине окна колонок (если конец окна
+            задан), иначе - как записаны в файле (пустые хвосты строк могут отсутствовать).
+
+        :param sheet: имя или номер листа
+        :param rows: окно строк (начало, конец) с нуля. None - все
+        :param columns: окно колонок (начало, конец) с нуля. None - все
+        :return: генератор кортежей
+        '''
+        worksheet = self.__sheet(sheet)
+        min_row, max_row = self.__window(rows, 'rows')
+        min_column, max_column = self.__window(columns, 'columns')
+        if (max_row is not None and max_row < min_row) or (max_column is not None and max_column < min_column):
+            return iter(())
+
+        return self.__iter_rows(worksheet=worksheet, full_path=self.__full_path,
+                                min_row=min_row, max_row=max_row, min_column=min_column, max_column=max_column)
+
+    @staticmethod
+    def __iter_rows(worksheet: object, full_path: str, min_row: int, max_row: int or None, min_column: int,
+                    max_column: int or None):
+        try:
+            for row in worksheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_column, max_col=max_column,
+                                           values_only=True):
+                yield row
+        except GeneratorExit:
+            raise
+        except BaseException as miss:
+            raise ProcessingError(f'Sheet reading failed.\nfull_path: {full_path}\nsheet: {worksheet.title}') \
+                from miss
+
+    def read_sheet(self, sheet: int or str,
+                   header: bool = True,
+                   index_column_number: int = None,
+                   rows: tuple = None,
+                   columns: tuple = None) -> pd.core.frame.DataFrame:
+        '''
+        Функция считывания листа (окна листа) в DataFrame. Ячейки не создаются как объекты: в памяти - только
+            значения строк окна.
+
+        :param sheet: имя или номер листа
+        :param header: первая строка окна - заголовок
+        :param index_column_number: номер колонки (в окне) с индексом. None - без индекса
+        :param rows: окно строк (начало, конец) с нуля. None - все
+        :param columns: окно колонок (начало, конец) с нуля. None - все
+        :return: DataFrame
+        '''
+        chunks = list(self.read_chunks(sheet=sheet, chunksize=None, header=header,
+                                       index_column_number=index_column_number, rows=rows, columns=columns))
+        return chunks[0]
+
+    def read_chunks(self, sheet: int or str,
+                    chunksize: int or None = 100000,
+                    header: bool = True,
+                    index_column_number: int = None,
+                    rows: tuple = None,
+                    columns: tuple = None):
+        '''
+        Генератор DataFrame по chunksize строк листа: в памяти одновременно только одна часть. Без индекса части
+            пронумерованы сквозным RangeIndex, как при чтении листа целиком.
+
+        :param sheet: имя или номер листа
+        :param chunksize: количество строк в части. None - весь лист одной частью
+        :param header: первая строка окна - заголовок
+        :param index_column_number: номер колонки (в окне) с индексом. None - без индекса
+        :param rows: окно строк (начало, конец) с нуля. None - все
+        :param columns: окно колонок (начало, конец) с нуля. None - все
+        :return: генератор DataFrame
+        '''
+        if chunksize is not None and (not isinstance(chunksize, int) or chunksize < 1):
+            raise ValidationError(f'chunksize must be positive int or None. {chunksize} was passed.')
+
+        iterator = self.iter_rows(sheet=sheet, rows=rows, columns=columns)
+        return self.__read_chunks(iterator=iterator, chunksize=chunksize, header=header,
+                                  index_column_number=index_column_number)
+
+    @staticmethod
+    def __read_chunks(iterator: object, chunksize: int or None, header: bool, index_column_number: int or None):
+        names = None
+        if header:
+            names = list(next(iterator, ()))
+
+        position = 0
+        while True:
+            chunk = list(iterator if chunksize is None else islice(iterator, chunksize))
+            if not chunk and position:
+                return
+
+            width = max([len(names or ())] + [len(row) for row in chunk])
+            if names is not None and len(names) < width:  # Значения правее заголовка
+                names = names + [None] * (width - len(names))
+            frame = pd.DataFrame([row + (None,) * (width - len(row)) if len(row) < width else row for row in chunk],
+                                 columns=names if names is not None else range(width))
+            frame.index = pd.RangeIndex(position, position + len(frame))
+            position += len(frame)
+            if index_column_number is not None:
+                frame = frame.set_index(frame.columns[index_column_number])
+                if not isinstance(frame.index.name, str) and pd.isna(frame.index.name):  # Пустая ячейка заголовка
+                    frame.index.name = None
+
+            yield frame
+            if chunksize is None or len(chunk) < chunksize:
+                return
@@ -1,5 +1,6 @@
 from Exceptions.ExceptionTypes import MethodPropertyError
 from FilesSystem.FilesReaders.JSONL import JSONL
+from FilesSystem.FilesReaders.JSONCodec import JSONCodec
 
 from ..Message.Message import Message
 from ..AppsExamples import MessagePreparerExample
@@ -20,14 +21,15 @@ class JsonLogger:
     def __init__(self,
                  file_path: str,
                  logging_level: str or int = 'DEBUG',
-                 preparer: MessagePreparerExample = JSONpreparer()):
+                 preparer: MessagePreparerExample = JSONpreparer(),
+                 codec: str or JSONCodec = None):
 
         self.__preparer = preparer
         self.__file_path = file_path
         if not hasattr(preparer, 'prepare'):
             raise MethodPropertyError(f'Worker {type(preparer)} have no "prepare" method.')
 
-        self.__writer = JSONL()
+        self.__writer = JSONL(codec=codec)
 
         self.__mutex = threading.RLock()
 